@@ -0,0 +1,49 @@
+import threading
+import time as reloj
+from collections import OrderedDict
+
+from .config import CACHE_HABILITADO_MAX_PERSONAS, CACHE_HABILITADO_TTL_SEGUNDOS
+
+
+class CacheHabilitado:
+    # Cache en memoria del campo habilitado por persona (LRU con vencimiento), usado al reservar.
+    # Se invalida en deshabilitar_personas, actualizar_persona y eliminar_persona; con varios workers el TTL acota
+    # cuánto puede quedar desactualizado. Con max_personas = 0 queda desactivado.
+
+    def __init__(self, max_personas: int, ttl_segundos: int):
+        self.max_personas = max_personas
+        self.ttl_segundos = ttl_segundos
+        self._estados = OrderedDict()  # persona_id -> (habilitado, momento de carga)
+        self._candado = threading.Lock()
+
+    def obtener(self, persona_id: int):
+        # Devuelve None si la persona no está en cache o venció
+        with self._candado:
+            entrada = self._estados.get(persona_id)
+            if entrada is None:
+                return None
+            if reloj.monotonic() - entrada[1] >= self.ttl_segundos:
+                del self._estados[persona_id]
+                return None
+            self._estados.move_to_end(persona_id)
+            return entrada[0]
+
+    def guardar(self, persona_id: int, habilitado: bool):
+        if self.max_personas <= 0:
+            return
+        with self._candado:
+            self._estados[persona_id] = (habilitado, reloj.monotonic())
+            self._estados.move_to_end(persona_id)
+            while len(self._estados) > self.max_personas:
+                self._estados.popitem(last=False)
+
+    def invalidar(self, persona_id: int):
+        with self._candado:
+            self._estados.pop(persona_id, None)
+
+    def limpiar(self):
+        with self._candado:
+            self._estados.clear()
+
+
+cache_habilitado = CacheHabilitado(CACHE_HABILITADO_MAX_PERSONAS, CACHE_HABILITADO_TTL_SEGUNDOS)
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import threading
+import time as reloj
+import uuid
+from collections import OrderedDict
+from datetime import date
+
+from fastapi import Request, Response
+
+from .config import CACHE_REPORTES_MAX_ENTRADAS, CACHE_REPORTES_TTL_SEGUNDOS, CACHE_REPORTES_ARCHIVO_VERSION
+
+
+class CacheReportes:
+    # Respuestas JSON de reportes ya generadas, guardadas por clave (endpoint + parámetros) y versión
+    # de los datos. La versión es un valor al azar en un archivo compartido por todos los workers:
+    # las funciones de crud que cambian datos de los reportes lo renuevan con invalidar() después del
+    # commit, y cada pedido solo lee ese archivo (no consulta la base).
+    # El TTL (en franjas de tiempo comunes a todos) es opcional. Con max_entradas = 0 queda desactivado.
+
+    def __init__(self, max_entradas: int, ttl_segundos: int, archivo_version: str):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self.archivo_version = archivo_version
+        self._respuestas = OrderedDict()  # clave -> (etag, cuerpo)
+        self._version = None
+        self._candado = threading.Lock()
+
+    @property
+    def activo(self):
+        return self.max_entradas > 0
+
+    def leer_version(self):
+        try:
+            with open(self.archivo_version) as archivo:
+                version = archivo.read().strip()
+        except FileNotFoundError:
+            version = ""
+        with self._candado:
+            # Las respuestas de versiones anteriores ya no se pueden servir
+            if version != self._version:
+                self._version = version
+                self._respuestas.clear()
+        return version
+
+    def invalidar(self):
+        # Un valor nuevo en cada escritura (no un contador): dos workers que escriben a la vez no pueden
+        # dejar la misma versión. El archivo se reemplaza entero, así nunca se lee a medio escribir
+        if not self.activo:
+            return
+        directorio = os.path.dirname(self.archivo_version)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        temporal = f"{self.archivo_version}.{os.getpid()}.{threading.get_ident()}"
+        with open(temporal, "w") as archivo:
+            archivo.write(uuid.uuid4().hex)
+        os.replace(temporal, self.archivo_version)
+
+    def etag(self, clave: str, version: str):
+        # Se calcula sin mirar el cache ni generar el reporte: alcanza para responder 304
+        franja = int(reloj.time() // self.ttl_segundos) if self.ttl_segundos > 0 else 0
+        resumen = hashlib.sha1(clave.encode()).hexdigest()[:16]
+        return f'"{version}-{franja}-{resumen}"'
+
+    def obtener(self, clave: str, etag: str):
+        with self._candado:
+            entrada = self._respuestas.get(clave)
+            if entrada is None or entrada[0] != etag:
+                return None
+            self._respuestas.move_to_end(clave)
+            return entrada[1]
+
+    def guardar(self, clave: str, etag: str, cuerpo: bytes):
+        with self._candado:
+            self._respuestas[clave] = (etag, cuerpo)
+            self._respuestas.move_to_end(clave)
+            while len(self._respuestas) > self.max_entradas:
+                self._respuestas.popitem(last=False)
+
+    async def responder(self, request: Request, generar):
+        # Lo llama cada endpoint después de validar sus parámetros, así un 304 nunca saltea una validación.
+        # generar arma la respuesta del serializador; sin request (llamada directa) no se usa el cache
+        if request is None or not self.activo:
+            return await generar()
+
+        # La fecha entra en la clave porque algunos reportes dependen del día (mes actual, edades)
+        clave = f"{request.url.path}?{sorted(request.query_params.multi_items())}@{date.today()}"
+        etag = self.etag(clave, self.leer_version())
+        encabezados = {"ETag": etag, "Cache-Control": "no-cache"}
+        cuerpo = self.obtener(clave, etag)
+
+        # "*" solo coincide si ya hay una respuesta 200 de esta versión (si no, el reporte podría no existir)
+        etags_cliente = etags_de_if_none_match(request.headers.get("if-none-match", ""))
+        if etag in etags_cliente or ("*" in etags_cliente and cuerpo is not None):
+            return Response(status_code=304, headers=encabezados)
+
+        if cuerpo is None:
+            respuesta = await generar()
+            if respuesta.status_code != 200:
+                return respuesta
+            cuerpo = respuesta.body
+            self.guardar(clave, etag, cuerpo)
+
+        return Response(content=cuerpo, media_type="application/json", headers=encabezados)
+
+
+def etags_de_if_none_match(valor: str):
+    # If-None-Match es una lista separada por comas; las ETags débiles (W/"...") se comparan por su valor
+    etags = set()
+    for etag in valor.split(","):
+        etag = etag.strip()
+        if etag.startswith("W/"):
+            etag = etag[2:]
+        if etag:
+            etags.add(etag)
+    return etags
+
+
+cache_reportes = CacheReportes(CACHE_REPORTES_MAX_ENTRADAS, CACHE_REPORTES_TTL_SEGUNDOS, CACHE_REPORTES_ARCHIVO_VERSION)
@@ -0,0 +1,75 @@
+from datetime import date, timedelta
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as insert_sqlite
+from sqlalchemy.orm import Session
+
+from .models import CancelacionDiaria, Turno
+from .config import DIAS_LIMITE_CANCELACIONES, ESTADO_CANCELADO
+
+
+def cancelaciones_recientes(persona_id, dias_limite: int = DIAS_LIMITE_CANCELACIONES):
+    
+    # Suma de los contadores diarios desde la fecha límite: búsqueda por la clave primaria (persona_id, fecha)
+    fecha_limite = date.today() - timedelta(days=dias_limite)
+    
+    return select(func.coalesce(func.sum(CancelacionDiaria.cantidad), 0)).where(
+        CancelacionDiaria.persona_id == persona_id,
+        CancelacionDiaria.fecha >= fecha_limite
+    ).scalar_subquery()
+
+
+def contar_cancelaciones_recientes(db: Session, persona_ids):
+    
+    # Cancelaciones recientes de varias personas en una consulta sobre los contadores diarios
+    fecha_limite = date.today() - timedelta(days=DIAS_LIMITE_CANCELACIONES)
+    
+    cantidades = db.query(CancelacionDiaria.persona_id, func.sum(CancelacionDiaria.cantidad)).filter(
+        CancelacionDiaria.persona_id.in_(persona_ids),
+        CancelacionDiaria.fecha >= fecha_limite
+    ).group_by(CancelacionDiaria.persona_id).all()
+    
+    return dict(cantidades)
+
+
+def sumar_cancelaciones(db: Session, persona_id: int, fecha: date, diferencia: int):
+    
+    consulta = insert_sqlite(CancelacionDiaria).values(persona_id=persona_id, fecha=fecha, cantidad=diferencia)
+    db.execute(consulta.on_conflict_do_update(
+        index_elements=[CancelacionDiaria.persona_id, CancelacionDiaria.fecha],
+        set_={"cantidad": CancelacionDiaria.cantidad + diferencia}
+    ))
+
+
+def registrar_cambio_turno(db: Session, anterior=None, nuevo=None):
+    
+    # anterior y nuevo son (persona_id, fecha, estado) del turno antes y después del cambio; None si no existe
+    # Se llama antes del commit para que el contador y el turno se guarden juntos
+    if anterior is not None and anterior[2] == ESTADO_CANCELADO:
+        sumar_cancelaciones(db, anterior[0], anterior[1], -1)
+    
+    if nuevo is not None and nuevo[2] == ESTADO_CANCELADO:
+        sumar_cancelaciones(db, nuevo[0], nuevo[1], 1)
+
+
+def reconstruir_contadores_cancelaciones(db: Session):
+    
+    # Recalcula todos los contadores desde la tabla de turnos
+    db.execute(delete(CancelacionDiaria))
+    db.execute(insert(CancelacionDiaria).from_select(
+        ["persona_id", "fecha", "cantidad"],
+        select(Turno.persona_id, Turno.fecha, func.count(Turno.id))
+        .where(Turno.estado == ESTADO_CANCELADO)
+        .group_by(Turno.persona_id, Turno.fecha)
+    ))
+    db.commit()
+    
+    return db.query(func.count()).select_from(CancelacionDiaria).scalar()
+
+
+if __name__ == "__main__":
+    # Reparación: python -m App.cancelaciones
+    from .database import Base, engine, SesionLocal
+    
+    Base.metadata.create_all(bind=engine)
+    with SesionLocal() as db:
+        print(f"Contadores de cancelaciones reconstruidos: {reconstruir_contadores_cancelaciones(db)} filas (persona, fecha)")
@@ -6,6 +6,25 @@ load_dotenv()
 
 # Variables de base de datos
 URL_BASE_DATOS = os.getenv("URL_BASE_DATOS")
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() == "true"
+
+# Modo async: los endpoints usan AsyncSession (aiosqlite) en lugar de Session en el threadpool
+MODO_ASYNC = os.getenv("MODO_ASYNC", "false").lower() == "true"
+URL_BASE_DATOS_ASYNC = os.getenv("URL_BASE_DATOS_ASYNC", URL_BASE_DATOS.replace("sqlite://", "sqlite+aiosqlite://", 1))
+
+# Perfil de SQLite (se aplica a cada conexión nueva)
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-64000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", "268435456"))
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))
+SQLITE_TEMP_STORE = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+
+# Pool de conexiones
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
 
 # Variables de turnos
 HORARIO_INICIO = os.getenv("HORARIO_INICIO")
@@ -15,9 +34,28 @@ INTERVALO_TURNOS_MINUTOS = int(os.getenv("INTERVALO_TURNOS_MINUTOS"))
 MAX_TURNOS_CANCELADOS = int(os.getenv("MAX_TURNOS_CANCELADOS"))
 DIAS_LIMITE_CANCELACIONES = int(os.getenv("DIAS_LIMITE_CANCELACIONES"))
 
+# Días máximos que se pueden pedir en /turnos-disponibles?desde=&hasta=
+MAX_DIAS_CALENDARIO = int(os.getenv("MAX_DIAS_CALENDARIO", "62"))
+
+# Días máximos que se pueden pedir en /reportes/ocupacion?desde=&hasta=
+MAX_DIAS_OCUPACION = int(os.getenv("MAX_DIAS_OCUPACION", "366"))
+
+# Índice de ocupación en memoria (fechas guardadas y vencimiento; 0 = sin vencimiento, solo con un worker)
+OCUPACION_MAX_FECHAS = int(os.getenv("OCUPACION_MAX_FECHAS", "365"))
+OCUPACION_TTL_SEGUNDOS = int(os.getenv("OCUPACION_TTL_SEGUNDOS", "5"))
+
 # Variables de personas
 MAX_EDAD_PERMITIDA = int(os.getenv("MAX_EDAD_PERMITIDA"))
 
+# Importación de personas desde CSV (filas por lote, errores informados y bytes del archivo que se guardan en memoria)
+IMPORTACION_TAMANIO_LOTE = int(os.getenv("IMPORTACION_TAMANIO_LOTE", "1000"))
+IMPORTACION_MAX_ERRORES = int(os.getenv("IMPORTACION_MAX_ERRORES", "1000"))
+IMPORTACION_MAX_MEMORIA_BYTES = int(os.getenv("IMPORTACION_MAX_MEMORIA_BYTES", "1048576"))
+
+# Cache en memoria de personas habilitadas para reservar (0 personas = desactivado)
+CACHE_HABILITADO_MAX_PERSONAS = int(os.getenv("CACHE_HABILITADO_MAX_PERSONAS", "0"))
+CACHE_HABILITADO_TTL_SEGUNDOS = int(os.getenv("CACHE_HABILITADO_TTL_SEGUNDOS", "30"))
+
 # Estados de turnos
 ESTADO_PENDIENTE = os.getenv("ESTADO_PENDIENTE")
 ESTADO_CONFIRMADO = os.getenv("ESTADO_CONFIRMADO")
@@ -28,6 +66,42 @@ ESTADO_ASISTIDO = os.getenv("ESTADO_ASISTIDO")
 MIN_CANCELADOS_DEFAULT = int(os.getenv("MIN_CANCELADOS_DEFAULT", "5"))
 LIMIT_PAGINACION_DEFAULT = int(os.getenv("LIMIT_PAGINACION_DEFAULT", "5"))
 
+# Variables para listados (GET /personas y GET /turnos)
+LIMIT_LISTADO_DEFAULT = int(os.getenv("LIMIT_LISTADO_DEFAULT", "100"))
+LIMIT_LISTADO_MAXIMO = int(os.getenv("LIMIT_LISTADO_MAXIMO", "1000"))
+
+# Cantidad máxima de turnos por pedido en POST /turnos/lote
+MAX_TURNOS_LOTE = int(os.getenv("MAX_TURNOS_LOTE", "1000"))
+
+# Filas que se leen y envían por bloque en los reportes que se transmiten a medida que se generan (CSV y NDJSON)
+FILAS_POR_BLOQUE = int(os.getenv("FILAS_POR_BLOQUE", "1000"))
+
+# Filas por grupo (row group) en los reportes Parquet: cada grupo se arma en memoria y se envía entero
+PARQUET_FILAS_POR_GRUPO = int(os.getenv("PARQUET_FILAS_POR_GRUPO", "10000"))
+
+# Cache de respuestas JSON de /reportes/* con ETag (0 entradas = desactivado; TTL 0 = hasta la próxima escritura en cualquier worker).
+# Las escrituras renuevan la versión de los datos en el archivo, que comparten todos los workers
+CACHE_REPORTES_MAX_ENTRADAS = int(os.getenv("CACHE_REPORTES_MAX_ENTRADAS", "256"))
+CACHE_REPORTES_TTL_SEGUNDOS = int(os.getenv("CACHE_REPORTES_TTL_SEGUNDOS", "0"))
+CACHE_REPORTES_ARCHIVO_VERSION = os.getenv("CACHE_REPORTES_ARCHIVO_VERSION", "./.version_reportes")
+
+# Pool de procesos que arma los PDF: procesos en paralelo, pedidos en espera y Retry-After del 503 cuando la cola está llena
+PDF_MAX_PROCESOS = int(os.getenv("PDF_MAX_PROCESOS", "2"))
+PDF_MAX_COLA = int(os.getenv("PDF_MAX_COLA", "8"))
+PDF_REINTENTAR_SEGUNDOS = int(os.getenv("PDF_REINTENTAR_SEGUNDOS", "5"))
+
+# Renderizador de los PDF cuando el pedido no elige uno (?renderizador=borb|rapido): desde esta cantidad de filas
+# se usa el rápido, que escribe las tablas en una grilla fija en vez de armar el layout de borb celda por celda
+PDF_RENDERIZADOR_UMBRAL_FILAS = int(os.getenv("PDF_RENDERIZADOR_UMBRAL_FILAS", "2000"))
+
+# Reportes en segundo plano (POST /reportes/jobs): carpeta de resultados, cuánto se conservan,
+# cuántos se generan a la vez, cuántos pueden esperar y el Retry-After del 503 cuando se supera
+REPORTES_TRABAJOS_DIRECTORIO = os.getenv("REPORTES_TRABAJOS_DIRECTORIO", "./reportes_generados")
+REPORTES_TRABAJOS_TTL_SEGUNDOS = int(os.getenv("REPORTES_TRABAJOS_TTL_SEGUNDOS", "3600"))
+REPORTES_TRABAJOS_MAX_CONCURRENTES = int(os.getenv("REPORTES_TRABAJOS_MAX_CONCURRENTES", "2"))
+REPORTES_TRABAJOS_MAX_PENDIENTES = int(os.getenv("REPORTES_TRABAJOS_MAX_PENDIENTES", "50"))
+REPORTES_TRABAJOS_REINTENTAR_SEGUNDOS = int(os.getenv("REPORTES_TRABAJOS_REINTENTAR_SEGUNDOS", "30"))
+
 # ==================== Configuración de Reportes ====================
 
 # Encabezados de tablas (usados en PDF y CSV)
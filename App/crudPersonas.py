@@ -1,11 +1,17 @@
+import csv
+from itertools import islice
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import IntegrityError
 from App.schemas import persona_base, actualizar_persona_base
 
-from .utils import validar_fecha_nacimiento
+from .utils import validar_fecha_nacimiento, codificar_cursor, decodificar_cursor_id, version_async, version_threadpool
 from .models import Persona, Turno
-from .config import ESTADO_CANCELADO
+from .cache_personas import cache_habilitado
+from .cache_reportes import cache_reportes
+from .config import ESTADO_CANCELADO, IMPORTACION_TAMANIO_LOTE, IMPORTACION_MAX_ERRORES
 
 
 def crear_persona(db: Session, persona_data: persona_base):
@@ -25,6 +31,7 @@ def crear_persona(db: Session, persona_data: persona_base):
     try:
         db.add(nueva_persona)
         db.commit()
+        cache_reportes.invalidar()
         db.refresh(nueva_persona)
     except IntegrityError as error:
         db.rollback()
@@ -41,8 +48,121 @@ def crear_persona(db: Session, persona_data: persona_base):
     
     return nueva_persona
 
-def obtener_todas_personas(db: Session):
-    return db.query(Persona).all()
+def importar_personas(db: Session, archivo):
+    
+    # Lee el CSV de a lotes: la memoria usada depende del tamaño del lote y no del archivo
+    lector = csv.DictReader(archivo)
+    
+    columnas_faltantes = [campo for campo in persona_base.model_fields if campo not in (lector.fieldnames or [])]
+    if columnas_faltantes:
+        raise HTTPException(status_code=400, detail=f"Faltan columnas en el CSV: {', '.join(columnas_faltantes)}")
+    
+    resultado = {"procesadas": 0, "creadas": 0, "rechazadas": 0, "errores": []}
+    
+    def registrar_error(fila: int, mensaje: str):
+        resultado["rechazadas"] += 1
+        if len(resultado["errores"]) < IMPORTACION_MAX_ERRORES:
+            resultado["errores"].append({"fila": fila, "error": mensaje})
+    
+    while True:
+        lote = list(islice(lector, IMPORTACION_TAMANIO_LOTE))
+        if not lote:
+            break
+        
+        # Número de línea del CSV de cada fila (la 1 es el encabezado)
+        validas = []
+        for fila, datos in enumerate(lote, start=resultado["procesadas"] + 2):
+            try:
+                persona_data = persona_base.model_validate(datos)
+                validar_fecha_nacimiento(persona_data.fecha_nacimiento)
+            except ValidationError as error:
+                registrar_error(fila, "; ".join(f"{'.'.join(str(campo) for campo in detalle['loc'])}: {detalle['msg']}" for detalle in error.errors()))
+                continue
+            except HTTPException as error:
+                registrar_error(fila, error.detail)
+                continue
+            validas.append((fila, persona_data))
+        resultado["procesadas"] += len(lote)
+        
+        validas = descartar_personas_duplicadas(db, validas, registrar_error)
+        
+        # Si otra alta ocupó un DNI, email o teléfono entre la verificación y el insert, se vuelve a verificar el lote
+        while validas:
+            try:
+                db.execute(insert(Persona), [
+                    {**persona_data.model_dump(), "habilitado": True}
+                    for _, persona_data in validas
+                ])
+                db.commit()
+                cache_reportes.invalidar()
+                resultado["creadas"] += len(validas)
+                break
+            except IntegrityError:
+                db.rollback()
+                cantidad_validas = len(validas)
+                validas = descartar_personas_duplicadas(db, validas, registrar_error)
+                if len(validas) == cantidad_validas:
+                    raise
+    
+    # Los duplicados se detectan después de validar el lote: se ordenan los errores por fila
+    resultado["errores"].sort(key=lambda error: error["fila"])
+    
+    return resultado
+
+
+def descartar_personas_duplicadas(db: Session, validas, registrar_error):
+    
+    # Una consulta por campo único para todo el lote, en lugar de esperar el IntegrityError de cada fila
+    campos_unicos = (
+        ("dni", Persona.dni, "Ya existe una persona con este DNI"),
+        ("email", Persona.email, "Ya existe una persona con este email"),
+        ("telefono", Persona.telefono, "Ya existe una persona con este teléfono"),
+    )
+    existentes = {
+        campo: {valor for (valor,) in db.query(columna).filter(columna.in_([getattr(persona_data, campo) for _, persona_data in validas]))}
+        for campo, columna, _ in campos_unicos
+    }
+    
+    sin_duplicados = []
+    for fila, persona_data in validas:
+        duplicado = next((mensaje for campo, _, mensaje in campos_unicos if getattr(persona_data, campo) in existentes[campo]), None)
+        if duplicado:
+            registrar_error(fila, duplicado)
+            continue
+        
+        # Los valores de esta fila pasan a estar ocupados para el resto del lote
+        for campo, _, _ in campos_unicos:
+            existentes[campo].add(getattr(persona_data, campo))
+        sin_duplicados.append((fila, persona_data))
+    
+    return sin_duplicados
+
+
+def obtener_personas_paginadas(db: Session, limite: int, cursor: str = None, habilitado: bool = None, dni_prefijo: str = None):
+    
+    # Filas planas (Row) con las columnas de la tabla: el listado se serializa sin armar objetos del ORM
+    personas_query = db.query(*Persona.__table__.columns)
+    
+    if habilitado is not None:
+        personas_query = personas_query.filter(Persona.habilitado == habilitado)
+    
+    if dni_prefijo:
+        # Rango en lugar de LIKE para que SQLite use el índice único de dni
+        siguiente_prefijo = dni_prefijo[:-1] + chr(ord(dni_prefijo[-1]) + 1)
+        personas_query = personas_query.filter(Persona.dni >= dni_prefijo, Persona.dni < siguiente_prefijo)
+    
+    if cursor is not None:
+        personas_query = personas_query.filter(Persona.id > decodificar_cursor_id(cursor))
+    
+    # Se pide una persona de más para saber si hay una página siguiente
+    personas = personas_query.order_by(Persona.id).limit(limite + 1).all()
+    
+    siguiente_cursor = None
+    if len(personas) > limite:
+        personas = personas[:limite]
+        siguiente_cursor = codificar_cursor(personas[-1].id)
+    
+    return personas, siguiente_cursor
 
 
 def actualizar_persona(db: Session, persona_id: int, persona_data: actualizar_persona_base):
@@ -71,6 +191,7 @@ def actualizar_persona(db: Session, persona_id: int, persona_data: actualizar_pe
     
     try:
         db.commit()
+        cache_reportes.invalidar()
         db.refresh(persona)
     except IntegrityError as error:
         db.rollback()
@@ -85,62 +206,101 @@ def actualizar_persona(db: Session, persona_id: int, persona_data: actualizar_pe
         else:
             raise HTTPException(status_code=400, detail="Ya existe otra persona con estos datos")
     
+    db.info.pop("personas_por_dni", None)
+    cache_habilitado.invalidar(persona_id)
+    
     return persona
 
 
 def buscar_persona(db: Session, persona_id: int):
 
-    persona = db.query(Persona).filter(Persona.id == persona_id).first()
+    # db.get usa primero el identity map: en el mismo request la persona se consulta una sola vez
+    persona = db.get(Persona, persona_id)
     if not persona:
         raise HTTPException(status_code=404, detail="Persona no encontrada")
 
     return persona
 
 
+def eliminar_persona(db: Session, persona_id: int):
+    
+    persona = buscar_persona(db, persona_id)
+    
+    # Verificar si la persona tiene turnos asociados
+    turnos_asociados = db.query(Turno).filter(Turno.persona_id == persona_id).count()
+    
+    if turnos_asociados > 0:
+        return turnos_asociados
+    
+    db.delete(persona)
+    db.commit()
+    cache_habilitado.invalidar(persona_id)
+    cache_reportes.invalidar()
+    return 0
+
+
 def buscar_persona_por_dni(db: Session, dni: str):
 
-    persona = db.query(Persona).filter(Persona.dni == dni).first()
+    # DNI -> id de las personas ya buscadas en esta sesión (un request), para resolverlas con el identity map
+    personas_por_dni = db.info.setdefault("personas_por_dni", {})
+    persona = db.get(Persona, personas_por_dni[dni]) if dni in personas_por_dni else None
+    
+    if persona is None:
+        persona = db.query(Persona).filter(Persona.dni == dni).first()
+        if persona:
+            personas_por_dni[dni] = persona.id
+    
     if not persona:
         raise HTTPException(status_code=404, detail="Persona no encontrada con ese DNI")
 
     return persona
 
 
-def validar_persona_habilitada(db: Session, persona_id: int):
-
-    persona = buscar_persona(db, persona_id)   
-    if not persona.habilitado:
-        raise HTTPException(status_code=400, detail="La persona está deshabilitada")
+def deshabilitar_personas(db: Session, persona_ids):
+    
+    # Único camino que cambia habilitado: deshabilita sin cargar las personas (un UPDATE para todas)
+    # y saca cada una de cache_habilitado después del commit
+    db.query(Persona).filter(Persona.id.in_(persona_ids)).update({Persona.habilitado: False}, synchronize_session=False)
+    db.commit()
+    cache_reportes.invalidar()
+    
+    for persona_id in persona_ids:
+        cache_habilitado.invalidar(persona_id)
 
-def cambiar_estado_persona(db: Session, persona_id: int):
 
-    persona = buscar_persona(db, persona_id)
+def consulta_personas_con_turnos_cancelados(db: Session, min_cancelados: int):
     
-    # si esta habilitada la deshabilita, y viceversa
-    persona.habilitado = not persona.habilitado
+    # Personas con al menos min_cancelados turnos cancelados, resuelto en una sola consulta
+    personas_con_minimo = db.query(Turno.persona_id).filter(
+        Turno.estado == ESTADO_CANCELADO
+    ).group_by(Turno.persona_id).having(func.count(Turno.id) >= min_cancelados).subquery()
     
-    db.commit()
-    db.refresh(persona)
+    return db.query(Turno).join(
+        personas_con_minimo, Turno.persona_id == personas_con_minimo.c.persona_id
+    ).options(joinedload(Turno.persona)).filter(
+        Turno.estado == ESTADO_CANCELADO
+    ).order_by(Turno.persona_id, Turno.id)
 
 
 def obtener_personas_con_turnos_cancelados(db: Session, min_cancelados: int):
-    
-    personas = db.query(Persona).all()
-    
-    todos_turnos_cancelados = []
-    
-    for persona in personas:
-        turnos_cancelados = db.query(Turno).filter(
-            Turno.persona_id == persona.id,
-            Turno.estado == ESTADO_CANCELADO
-        ).all()
-        
-        #Si la persona tiene al menos min_cancelados se agregan a la lista
-        if len(turnos_cancelados) >= min_cancelados:
-            todos_turnos_cancelados.extend(turnos_cancelados)
-    
-    return todos_turnos_cancelados
+    return consulta_personas_con_turnos_cancelados(db, min_cancelados).all()
+
+
+def consulta_personas_por_estado(db: Session, habilitado: bool):
+    return db.query(Persona).filter(Persona.habilitado == habilitado)
 
 
 def obtener_personas_por_estado(db: Session, habilitado: bool):
-    return db.query(Persona).filter(Persona.habilitado == habilitado).all()
\ No newline at end of file
+    return consulta_personas_por_estado(db, habilitado).all()
+
+
+# ==================== Versiones async (ver utils.version_async y utils.version_threadpool) ====================
+
+crear_persona_async = version_async(crear_persona)
+importar_personas_async = version_threadpool(importar_personas)
+obtener_personas_paginadas_async = version_threadpool(obtener_personas_paginadas)
+actualizar_persona_async = version_async(actualizar_persona)
+buscar_persona_async = version_async(buscar_persona)
+eliminar_persona_async = version_async(eliminar_persona)
+buscar_persona_por_dni_async = version_async(buscar_persona_por_dni)
+obtener_personas_por_estado_async = version_threadpool(obtener_personas_por_estado)
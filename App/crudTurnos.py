@@ -1,60 +1,43 @@
+from collections import Counter, defaultdict
 from datetime import date, time, timedelta
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from App.schemas import turno_base, PersonaConTurnos, TurnoReporte
+from typing import List
+from sqlalchemy import insert, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+from App.schemas import turno_base
 
-from .utils import validar_fecha_pasada, validar_turno_modificable, validar_rango_fechas
-from .crudPersonas import validar_persona_habilitada, buscar_persona, cambiar_estado_persona
-from .models import Turno
-from .config import HORARIO_INICIO, HORARIO_FIN, INTERVALO_TURNOS_MINUTOS, MAX_TURNOS_CANCELADOS, DIAS_LIMITE_CANCELACIONES, ESTADO_PENDIENTE, ESTADO_CONFIRMADO, ESTADO_CANCELADO, ESTADO_ASISTIDO, LIMIT_PAGINACION_DEFAULT, HORARIOS_DISPONIBLES
+from .utils import validar_fecha_pasada, validar_turno_modificable, validar_rango_fechas, codificar_cursor, decodificar_cursor_turno, decodificar_cursor_id, version_async, version_threadpool
+from .crudPersonas import deshabilitar_personas, consulta_personas_con_turnos_cancelados
+from .cache_personas import cache_habilitado
+from .cache_reportes import cache_reportes
+from .models import CancelacionDiaria, Persona, Turno
+from .database import explicar_consulta
+from .ocupacion import indice_ocupacion
+from .cancelaciones import cancelaciones_recientes, contar_cancelaciones_recientes, registrar_cambio_turno
+from .turnos_diarios import registrar_turnos_diarios, contar_turnos_diarios, contar_ocupados_por_fecha, consulta_turnos_diarios
+from .config import HORARIO_INICIO, HORARIO_FIN, HORARIOS_DISPONIBLES, MAX_DIAS_CALENDARIO, MAX_DIAS_OCUPACION, INTERVALO_TURNOS_MINUTOS, MAX_TURNOS_CANCELADOS, DIAS_LIMITE_CANCELACIONES, ESTADO_PENDIENTE, ESTADO_CONFIRMADO, ESTADO_CANCELADO, ESTADO_ASISTIDO, LIMIT_PAGINACION_DEFAULT
+
+
+# Estrategia de carga para los reportes: la persona de cada turno viene en la misma consulta
+CARGA_PERSONA = joinedload(Turno.persona)
+
+# Columnas de los listados y reportes JSON: se consultan filas planas (Row) en lugar de objetos del ORM
+# y se serializan sin pasar por modelos intermedios (ver serializacion.py)
+COLUMNAS_TURNO = (Turno.id, Turno.persona_id, Turno.fecha, Turno.hora, Turno.estado)
+COLUMNAS_TURNO_PERSONA = COLUMNAS_TURNO + (Persona.nombre, Persona.dni)
 
 
 def crear_turno(db: Session, turno_data: turno_base):
 
     persona_id = turno_data.persona_id
     
-    validar_persona_habilitada(db, persona_id)
-
-    turnos_cancelados = validar_turnos_cancelados(db, persona_id)
-    if turnos_cancelados:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"No se puede asignar turno: la persona tiene {MAX_TURNOS_CANCELADOS} o más turnos cancelados en los últimos 6 meses."
-        )
+    validar_persona_para_reserva(db, persona_id)
     
     validar_fecha_pasada(turno_data.fecha)
     
-    # Validar que el horario esté dentro del rango de atención
     hora_solicitada = turno_data.hora
-    hora_inicio = time.fromisoformat(HORARIO_INICIO)
-    hora_fin = time.fromisoformat(HORARIO_FIN)
-    
-    if hora_solicitada < hora_inicio or hora_solicitada > hora_fin:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"El horario {hora_solicitada.strftime('%H:%M')} está fuera del horario de atención ({HORARIO_INICIO} - {HORARIO_FIN})"
-        )
-    
-    # Validar que el horario sea un múltiplo del intervalo de turnos
-    minutos_totales = hora_solicitada.hour * 60 + hora_solicitada.minute
-    minutos_inicio = hora_inicio.hour * 60 + hora_inicio.minute
-    diferencia_minutos = minutos_totales - minutos_inicio
-    
-    if diferencia_minutos % INTERVALO_TURNOS_MINUTOS != 0:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"El horario debe ser cada {INTERVALO_TURNOS_MINUTOS} minutos. Horarios válidos: 08:00, 08:30, 09:00, etc."
-        )
-
-    # Verificar que el horario esté disponible (no ocupado)
-    horarios_disponibles = obtener_turnos_disponibles(db, turno_data.fecha)
-    
-    if hora_solicitada not in horarios_disponibles:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"El horario {hora_solicitada.strftime('%H:%M')} del día {turno_data.fecha} ya está ocupado"
-        )
-    
+    validar_horario_turno(hora_solicitada)
     
     nuevo_turno = Turno(
         persona_id=persona_id,
@@ -63,20 +46,132 @@ def crear_turno(db: Session, turno_data: turno_base):
         estado=turno_data.estado
     )
     
-    db.add(nuevo_turno)
-    db.commit()
+    # No se consulta la disponibilidad en la base: el índice único de horarios activos rechaza el insert si está ocupado
+    try:
+        db.add(nuevo_turno)
+        registrar_cambio_turno(db, nuevo=(persona_id, turno_data.fecha, turno_data.estado))
+        registrar_turnos_diarios(db, nuevos=[(turno_data.fecha, hora_solicitada, turno_data.estado)])
+        db.commit()
+    except IntegrityError as error:
+        db.rollback()
+        validar_horario_libre(error, turno_data.fecha, hora_solicitada)
+        raise
+    cache_reportes.invalidar()
     db.refresh(nuevo_turno)
     
+    if nuevo_turno.estado != ESTADO_CANCELADO:
+        indice_ocupacion.marcar_ocupado(nuevo_turno.fecha, nuevo_turno.hora)
+    
     return nuevo_turno
 
-def listar_turnos(db: Session):
-    return db.query(Turno).all()
+def crear_turnos_lote(db: Session, turnos_data: List[turno_base]):
+    
+    # Resultado por ítem, en el orden recibido: (turno creado, None) o (None, motivo del rechazo)
+    resultados = [None] * len(turnos_data)
+    
+    # Una consulta para el estado de todas las personas y otra para la ocupación de todas las fechas
+    estados_personas = obtener_estado_personas_para_reserva(db, {turno_data.persona_id for turno_data in turnos_data})
+    fechas = {turno_data.fecha for turno_data in turnos_data}
+    ocupados = obtener_horarios_ocupados(db, fechas)
+    
+    personas_a_deshabilitar = set()
+    pendientes = []
+    
+    for indice, turno_data in enumerate(turnos_data):
+        try:
+            validar_estado_persona(estados_personas, turno_data.persona_id, personas_a_deshabilitar.add)
+            validar_fecha_pasada(turno_data.fecha)
+            validar_horario_turno(turno_data.hora)
+            validar_horario_disponible(ocupados, turno_data.fecha, turno_data.hora)
+        except HTTPException as error:
+            resultados[indice] = (None, error.detail)
+            continue
+        
+        if turno_data.estado != ESTADO_CANCELADO:
+            ocupados.add((turno_data.fecha, turno_data.hora))
+        pendientes.append(indice)
+    
+    # Igual que en crear_turno, las personas que superan el límite de cancelaciones quedan deshabilitadas aunque el lote falle
+    if personas_a_deshabilitar:
+        deshabilitar_personas(db, personas_a_deshabilitar)
+    
+    # Si otra reserva ocupó un horario entre la lectura y el insert, se rechazan esos ítems y se reintenta
+    while True:
+        try:
+            ids = []
+            if pendientes:
+                filas = [turnos_data[indice].model_dump() for indice in pendientes]
+                ids = db.scalars(insert(Turno).returning(Turno.id, sort_by_parameter_order=True), filas).all()
+                for fila in filas:
+                    registrar_cambio_turno(db, nuevo=(fila["persona_id"], fila["fecha"], fila["estado"]))
+                registrar_turnos_diarios(db, nuevos=[(fila["fecha"], fila["hora"], fila["estado"]) for fila in filas])
+            db.commit()
+            break
+        except IntegrityError:
+            db.rollback()
+            ocupados = obtener_horarios_ocupados(db, fechas)
+            en_conflicto = [
+                indice for indice in pendientes
+                if turnos_data[indice].estado != ESTADO_CANCELADO and (turnos_data[indice].fecha, turnos_data[indice].hora) in ocupados
+            ]
+            if not en_conflicto:
+                raise
+            for indice in en_conflicto:
+                turno_data = turnos_data[indice]
+                resultados[indice] = (None, f"El horario {turno_data.hora.strftime('%H:%M')} del día {turno_data.fecha} ya está ocupado")
+            pendientes = [indice for indice in pendientes if indice not in en_conflicto]
+    
+    if pendientes:
+        cache_reportes.invalidar()
+    
+    for indice, turno_id in zip(pendientes, ids):
+        turno = Turno(id=turno_id, **turnos_data[indice].model_dump())
+        resultados[indice] = (turno, None)
+        
+        if turno.estado != ESTADO_CANCELADO:
+            indice_ocupacion.marcar_ocupado(turno.fecha, turno.hora)
+    
+    return resultados
+
+def listar_turnos_paginados(db: Session, limite: int, cursor: str = None, fecha_desde: date = None, fecha_hasta: date = None, estado: str = None, persona_id: int = None):
+    
+    turnos_query = db.query(*COLUMNAS_TURNO)
+    
+    if fecha_desde is not None:
+        turnos_query = turnos_query.filter(Turno.fecha >= fecha_desde)
+    
+    if fecha_hasta is not None:
+        turnos_query = turnos_query.filter(Turno.fecha <= fecha_hasta)
+    
+    if estado is not None:
+        turnos_query = turnos_query.filter(Turno.estado == estado)
+    
+    if persona_id is not None:
+        turnos_query = turnos_query.filter(Turno.persona_id == persona_id)
+    
+    if cursor is not None:
+        turnos_query = turnos_query.filter(Turno.id > decodificar_cursor_id(cursor))
+    
+    # Se pide un turno de más para saber si hay una página siguiente
+    turnos = turnos_query.order_by(Turno.id).limit(limite + 1).all()
+    
+    siguiente_cursor = None
+    if len(turnos) > limite:
+        turnos = turnos[:limite]
+        siguiente_cursor = codificar_cursor(turnos[-1].id)
+    
+    return turnos, siguiente_cursor
 
 def actualizar_turno(db: Session, turno_id: int, turno_data: turno_base):
 
     turno = buscar_turno(db, turno_id)
     
     validar_turno_modificable(turno)
+    
+    fecha_anterior, hora_anterior = turno.fecha, turno.hora
+    ocupaba_horario = turno.estado != ESTADO_CANCELADO
+    anterior = (turno.persona_id, turno.fecha, turno.estado)
+    anterior_diario = (turno.fecha, turno.hora, turno.estado)
 
     if turno_data.fecha is not None:
         validar_fecha_pasada(turno_data.fecha)
@@ -88,16 +183,39 @@ def actualizar_turno(db: Session, turno_id: int, turno_data: turno_base):
     if turno_data.estado is not None:
         turno.estado = turno_data.estado
     
-    db.commit()
+    fecha_nueva, hora_nueva = turno.fecha, turno.hora
+    
+    try:
+        registrar_cambio_turno(db, anterior, (turno.persona_id, turno.fecha, turno.estado))
+        registrar_turnos_diarios(db, [anterior_diario], [(turno.fecha, turno.hora, turno.estado)])
+        db.commit()
+    except IntegrityError as error:
+        db.rollback()
+        validar_horario_libre(error, fecha_nueva, hora_nueva)
+        raise
+    cache_reportes.invalidar()
     db.refresh(turno)
     
+    if ocupaba_horario:
+        indice_ocupacion.liberar(fecha_anterior, hora_anterior)
+    if turno.estado != ESTADO_CANCELADO:
+        indice_ocupacion.marcar_ocupado(turno.fecha, turno.hora)
+    
     return turno
 
 def eliminar_turno(db: Session, turno_id: int):
 
     turno = buscar_turno(db, turno_id)
+    fecha, hora, ocupaba_horario = turno.fecha, turno.hora, turno.estado != ESTADO_CANCELADO
+    
+    registrar_cambio_turno(db, anterior=(turno.persona_id, turno.fecha, turno.estado))
+    registrar_turnos_diarios(db, anteriores=[(turno.fecha, turno.hora, turno.estado)])
     db.delete(turno)
     db.commit()
+    cache_reportes.invalidar()
+    
+    if ocupaba_horario:
+        indice_ocupacion.liberar(fecha, hora)
 
 
 def buscar_turno(db: Session, turno_id: int):
@@ -116,64 +234,193 @@ def cancelar_turno(db: Session, turno_id: int):
     
     validar_fecha_pasada(turno.fecha)
     
+    registrar_cambio_turno(db, (turno.persona_id, turno.fecha, turno.estado), (turno.persona_id, turno.fecha, ESTADO_CANCELADO))
+    registrar_turnos_diarios(db, [(turno.fecha, turno.hora, turno.estado)], [(turno.fecha, turno.hora, ESTADO_CANCELADO)])
     turno.estado = ESTADO_CANCELADO
     db.commit()
+    cache_reportes.invalidar()
     db.refresh(turno)
+    
+    indice_ocupacion.liberar(turno.fecha, turno.hora)
 
     return turno
     
 
 def contar_turnos_cancelados(db: Session, persona_id: int, dias_limite: int):
+    
+    return db.query(cancelaciones_recientes(persona_id, dias_limite)).scalar()
 
-    fecha_actual = date.today()
-    fecha_limite = fecha_actual - timedelta(days=dias_limite)
+def consulta_turnos_por_fecha(db: Session, fecha: date):
+    return db.query(Turno).options(CARGA_PERSONA).filter(Turno.fecha == fecha)
 
-    turnos_cancelados = db.query(Turno).filter(
-        Turno.persona_id == persona_id,
-        Turno.estado == ESTADO_CANCELADO,
-        Turno.fecha >= fecha_limite
-    ).count()
-    
-    return turnos_cancelados
 
 def obtener_turnos_por_fecha(db: Session, fecha: date):
-    return db.query(Turno).filter(Turno.fecha == fecha).all()
+    return consulta_turnos_por_fecha(db, fecha).all()
+
+
+def consulta_turnos_por_persona(db: Session, persona_id: int):
+    return db.query(Turno).filter(Turno.persona_id == persona_id)
 
 
 def obtener_turnos_por_persona(db: Session, persona_id: int):
-    return db.query(Turno).filter(Turno.persona_id == persona_id).all()
+    # La persona ya está en la sesión (buscar_persona_por_dni): turno.persona se resuelve con el identity map, sin JOIN
+    return consulta_turnos_por_persona(db, persona_id).all()
+
+
+def obtener_filas_turnos_por_persona(db: Session, persona_id: int):
+    return consulta_turnos_por_persona(db, persona_id).with_entities(Turno.id, Turno.fecha, Turno.hora, Turno.estado).all()
 
 
 def obtener_turnos_disponibles(db: Session, fecha: date):
     
     validar_fecha_pasada(fecha)
     
-    turnos_ocupados = db.query(Turno.hora).filter(
-        Turno.fecha == fecha,
-        Turno.estado != ESTADO_CANCELADO
-    ).all()
+    return indice_ocupacion.horarios_libres(db, fecha)
+
+
+def obtener_calendario_disponibilidad(db: Session, fecha_desde: date, fecha_hasta: date, solo_cantidades: bool = False):
+    
+    validar_rango_fechas(fecha_desde, fecha_hasta)
+    validar_fecha_pasada(fecha_desde)
     
-    horas_ocupadas = {turno_ocupado.hora for turno_ocupado in turnos_ocupados}
+    cantidad_dias = (fecha_hasta - fecha_desde).days + 1
+    if cantidad_dias > MAX_DIAS_CALENDARIO:
+        raise HTTPException(status_code=400, detail=f"El rango no puede superar los {MAX_DIAS_CALENDARIO} días")
     
-    return [
-        hora 
-        for hora in HORARIOS_DISPONIBLES 
-        if hora not in horas_ocupadas
-    ]
+    # Una sola consulta para todo el rango; solo cuentan los horarios de la grilla.
+    # Si solo se piden cantidades alcanza con el resumen diario, sin leer los turnos
+    if solo_cantidades:
+        ocupados_por_fecha = contar_ocupados_por_fecha(db, fecha_desde, fecha_hasta)
+    else:
+        turnos_activos = db.query(Turno.fecha, Turno.hora).filter(
+            Turno.fecha >= fecha_desde,
+            Turno.fecha <= fecha_hasta,
+            Turno.estado != ESTADO_CANCELADO,
+            Turno.hora.in_(HORARIOS_DISPONIBLES)
+        )
+        ocupados_por_fecha = {}
+        for fecha, hora in turnos_activos.all():
+            ocupados_por_fecha.setdefault(fecha, set()).add(hora)
+    
+    calendario = []
+    for desplazamiento in range(cantidad_dias):
+        fecha = fecha_desde + timedelta(days=desplazamiento)
+        ocupados = ocupados_por_fecha.get(fecha)
+        
+        if solo_cantidades:
+            calendario.append((fecha, len(HORARIOS_DISPONIBLES) - (ocupados or 0), None))
+        else:
+            horarios_libres = [hora for hora in HORARIOS_DISPONIBLES if not ocupados or hora not in ocupados]
+            calendario.append((fecha, len(horarios_libres), horarios_libres))
+    
+    return calendario
 
 
-def validar_turnos_cancelados(db: Session, persona_id: int):
+def obtener_estado_personas_para_reserva(db: Session, persona_ids):
+    
+    # Las personas con habilitado en cache solo consultan los contadores de cancelaciones
+    habilitados = {persona_id: cache_habilitado.obtener(persona_id) for persona_id in persona_ids}
+    en_cache = [persona_id for persona_id, habilitado in habilitados.items() if habilitado is not None]
+    faltantes = [persona_id for persona_id, habilitado in habilitados.items() if habilitado is None]
+    
+    estados_personas = {}
+    
+    if en_cache:
+        cantidades = contar_cancelaciones_recientes(db, en_cache)
+        for persona_id in en_cache:
+            estados_personas[persona_id] = (habilitados[persona_id], cantidades.get(persona_id, 0))
     
-    turnos_cancelados = contar_turnos_cancelados(db, persona_id, DIAS_LIMITE_CANCELACIONES)
+    if faltantes:
+        # Estado de las personas y cancelaciones recientes (contadores diarios) en una sola consulta
+        estados = db.query(Persona.id, Persona.habilitado, cancelaciones_recientes(Persona.id)).filter(Persona.id.in_(faltantes)).all()
+        for persona_id, habilitado, cantidad_cancelados in estados:
+            cache_habilitado.guardar(persona_id, habilitado)
+            estados_personas[persona_id] = (habilitado, cantidad_cancelados)
+    
+    return estados_personas
+
 
+def validar_estado_persona(estados_personas: dict, persona_id: int, deshabilitar):
+    
+    estado_persona = estados_personas.get(persona_id)
+    
+    if estado_persona is None:
+        raise HTTPException(status_code=404, detail="Persona no encontrada")
+    
+    habilitado, cantidad_cancelados = estado_persona
+    
+    if not habilitado:
+        raise HTTPException(status_code=400, detail="La persona está deshabilitada")
+    
     # Deshabilitar la persona si tiene 5 o más cancelaciones
-    if turnos_cancelados >= MAX_TURNOS_CANCELADOS:
-        persona = buscar_persona(db, persona_id)
-        if persona and persona.habilitado:
-            cambiar_estado_persona(db, persona_id)
-            return True
+    if cantidad_cancelados >= MAX_TURNOS_CANCELADOS:
+        estados_personas[persona_id] = (False, cantidad_cancelados)
+        deshabilitar(persona_id)
+        raise HTTPException(
+            status_code=400, 
+            detail=f"No se puede asignar turno: la persona tiene {MAX_TURNOS_CANCELADOS} o más turnos cancelados en los últimos 6 meses."
+        )
 
-    return False
+
+def validar_persona_para_reserva(db: Session, persona_id: int):
+    
+    estados_personas = obtener_estado_personas_para_reserva(db, [persona_id])
+    
+    validar_estado_persona(estados_personas, persona_id, lambda persona: deshabilitar_personas(db, [persona]))
+
+
+def validar_horario_turno(hora_solicitada: time):
+    
+    # Validar que el horario esté dentro del rango de atención
+    hora_inicio = time.fromisoformat(HORARIO_INICIO)
+    hora_fin = time.fromisoformat(HORARIO_FIN)
+    
+    if hora_solicitada < hora_inicio or hora_solicitada > hora_fin:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"El horario {hora_solicitada.strftime('%H:%M')} está fuera del horario de atención ({HORARIO_INICIO} - {HORARIO_FIN})"
+        )
+    
+    # Validar que el horario sea un múltiplo del intervalo de turnos
+    minutos_totales = hora_solicitada.hour * 60 + hora_solicitada.minute
+    minutos_inicio = hora_inicio.hour * 60 + hora_inicio.minute
+    diferencia_minutos = minutos_totales - minutos_inicio
+    
+    if diferencia_minutos % INTERVALO_TURNOS_MINUTOS != 0:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"El horario debe ser cada {INTERVALO_TURNOS_MINUTOS} minutos. Horarios válidos: 08:00, 08:30, 09:00, etc."
+        )
+
+
+def obtener_horarios_ocupados(db: Session, fechas):
+    
+    ocupados = db.query(Turno.fecha, Turno.hora).filter(
+        Turno.fecha.in_(fechas),
+        Turno.estado != ESTADO_CANCELADO
+    ).all()
+    
+    return {(fecha, hora) for fecha, hora in ocupados}
+
+
+def validar_horario_disponible(ocupados: set, fecha: date, hora: time):
+    
+    if (fecha, hora) in ocupados:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"El horario {hora.strftime('%H:%M')} del día {fecha} ya está ocupado"
+        )
+
+
+def validar_horario_libre(error: IntegrityError, fecha: date, hora: time):
+    
+    # Violación del índice único de horarios activos (fecha, hora)
+    error_msg = str(error.orig).lower()
+    if 'turnos.fecha' in error_msg and 'turnos.hora' in error_msg:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"El horario {hora.strftime('%H:%M')} del día {fecha} ya está ocupado"
+        )
 
 
 def confirmar_turno(db: Session, turno_id: int):
@@ -188,8 +435,10 @@ def confirmar_turno(db: Session, turno_id: int):
             detail="Solo se pueden confirmar turnos pendientes"
         )
     
+    registrar_turnos_diarios(db, [(turno.fecha, turno.hora, turno.estado)], [(turno.fecha, turno.hora, ESTADO_CONFIRMADO)])
     turno.estado = ESTADO_CONFIRMADO
     db.commit()
+    cache_reportes.invalidar()
     db.refresh(turno)
     
     return turno
@@ -205,47 +454,64 @@ def marcar_asistencia_turno(db: Session, turno_id: int):
             detail="Solo se puede marcar asistencia en turnos confirmados"
         )
     
+    registrar_turnos_diarios(db, [(turno.fecha, turno.hora, turno.estado)], [(turno.fecha, turno.hora, ESTADO_ASISTIDO)])
     turno.estado = ESTADO_ASISTIDO
     db.commit()
+    cache_reportes.invalidar()
     db.refresh(turno)
     
     return turno
 
 
-def agrupar_turnos_por_persona(turnos, incluir_fecha=False):
-    
+def proyectar_turnos_con_persona(consulta):
+    # Misma consulta de turnos, pero solo con las columnas de COLUMNAS_TURNO_PERSONA: el joinedload se descarta
+    # y el LEFT JOIN explícito mantiene el plan (y el orden de las filas) de la consulta original
+    return consulta.outerjoin(Turno.persona).with_entities(*COLUMNAS_TURNO_PERSONA)
+
+
+def obtener_filas_turnos_por_fecha(db: Session, fecha: date):
+    return proyectar_turnos_con_persona(consulta_turnos_por_fecha(db, fecha)).all()
+
+
+def obtener_filas_turnos_cancelados_mes_actual(db: Session):
+    return proyectar_turnos_con_persona(consulta_turnos_cancelados_mes_actual(db)).all()
+
+
+def obtener_filas_personas_con_turnos_cancelados(db: Session, min_cancelados: int):
+    return proyectar_turnos_con_persona(consulta_personas_con_turnos_cancelados(db, min_cancelados)).all()
+
+
+def agrupar_turnos_por_persona(filas, incluir_fecha=False):
+    # Recibe filas de COLUMNAS_TURNO_PERSONA y arma los datos de PersonaConTurnos como dicts:
+    # se validan una sola vez al serializar la respuesta
     diccionario_personas = {}
     
-    for turno in turnos:
-        persona_id = turno.persona_id
+    for turno_id, persona_id, fecha, hora, estado, nombre, dni in filas:
+        persona = diccionario_personas.get(persona_id)
         
-        if persona_id not in diccionario_personas:
-            diccionario_personas[persona_id] = PersonaConTurnos(
-                id=turno.persona.id,
-                nombre=turno.persona.nombre,
-                dni=turno.persona.dni,
-                cantidad_turnos=0,
-                turnos=[]
-            )
+        if persona is None:
+            persona = diccionario_personas[persona_id] = {
+                "id": persona_id,
+                "nombre": nombre,
+                "dni": dni,
+                "cantidad_turnos": 0,
+                "turnos": []
+            }
         
-        turno_reporte = TurnoReporte(
-            id=turno.id,
-            hora=turno.hora,
-            estado=turno.estado
-        )
+        turno_reporte = {"id": turno_id, "hora": hora, "estado": estado}
         
         if incluir_fecha:
-            turno_reporte.fecha = turno.fecha
+            turno_reporte["fecha"] = fecha
         
-        diccionario_personas[persona_id].turnos.append(turno_reporte)
+        persona["turnos"].append(turno_reporte)
     
     for persona in diccionario_personas.values():
-        persona.cantidad_turnos = len(persona.turnos)
+        persona["cantidad_turnos"] = len(persona["turnos"])
     
     return list(diccionario_personas.values())
 
 
-def obtener_turnos_cancelados_mes_actual(db: Session):
+def consulta_turnos_cancelados_mes_actual(db: Session):
     
     fecha_actual = date.today()
     primer_dia_mes = date(fecha_actual.year, fecha_actual.month, 1)
@@ -256,41 +522,209 @@ def obtener_turnos_cancelados_mes_actual(db: Session):
     else:
         ultimo_dia_mes = date(fecha_actual.year, fecha_actual.month + 1, 1) - timedelta(days=1)
     
-    turnos = db.query(Turno).filter(
+    return db.query(Turno).options(CARGA_PERSONA).filter(
         Turno.estado == ESTADO_CANCELADO,
         Turno.fecha >= primer_dia_mes,
         Turno.fecha <= ultimo_dia_mes
-    ).all()
-    
-    return turnos
+    )
+
 
+def obtener_turnos_cancelados_mes_actual(db: Session):
+    return consulta_turnos_cancelados_mes_actual(db).all()
 
 
 
-def obtener_turnos_confirmados_por_periodo(db: Session, fecha_desde: date, fecha_hasta: date, pagina: int = 1, limite: int = LIMIT_PAGINACION_DEFAULT):
+def obtener_turnos_confirmados_por_periodo(db: Session, fecha_desde: date, fecha_hasta: date, pagina: int = 1, limite: int = LIMIT_PAGINACION_DEFAULT, cursor: str = None):
     
     validar_rango_fechas(fecha_desde, fecha_hasta)
     
-    turnos_confirmados_query = db.query(Turno).filter(
+    turnos_confirmados_query = db.query(Turno).options(CARGA_PERSONA).filter(
         Turno.estado == ESTADO_CONFIRMADO,
-        Turno.fecha >= fecha_desde,
         Turno.fecha <= fecha_hasta
     )
     
-    #Se cuenta el total de turnos confirmados para calcular la paginacion
-    total_turnos_confirmados = turnos_confirmados_query.count()
+    #Se cuenta el total de turnos confirmados para calcular la paginacion por número de página, desde el resumen diario
+    total_turnos_confirmados = None
+    if cursor is None:
+        total_turnos_confirmados = contar_turnos_diarios(db, fecha_desde, fecha_hasta, ESTADO_CONFIRMADO)
+    
+    turnos_confirmados_query = turnos_confirmados_query.order_by(Turno.fecha, Turno.hora, Turno.id)
+    
+    if cursor is not None:
+        # Paginación por clave: se busca en el índice a partir del último turno devuelto.
+        # El cursor ya implica fecha >= desde, y dejar los dos límites impide que SQLite use la búsqueda por clave
+        fecha, hora, turno_id = decodificar_cursor_turno(cursor)
+        if fecha < fecha_desde:
+            fecha, hora, turno_id = fecha_desde, time.min, 0
+        turnos_confirmados_query = turnos_confirmados_query.filter(
+            tuple_(Turno.fecha, Turno.hora, Turno.id) > (fecha, hora, turno_id)
+        )
+    else:
+        turnos_confirmados_query = turnos_confirmados_query.filter(
+            Turno.fecha >= fecha_desde
+        ).offset((pagina - 1) * limite)
     
-    offset = (pagina - 1) * limite
-    turnos_paginados = turnos_confirmados_query.offset(offset).limit(limite).all()
+    # Se pide un turno de más para saber si hay una página siguiente
+    turnos_paginados = turnos_confirmados_query.limit(limite + 1).all()
     
-    return turnos_paginados, total_turnos_confirmados
+    siguiente_cursor = None
+    if len(turnos_paginados) > limite:
+        turnos_paginados = turnos_paginados[:limite]
+        ultimo = turnos_paginados[-1]
+        siguiente_cursor = codificar_cursor(ultimo.fecha, ultimo.hora, ultimo.id)
+    
+    return turnos_paginados, total_turnos_confirmados, siguiente_cursor
 
 
-def obtener_todos_turnos_confirmados_por_periodo(db: Session, fecha_desde: date, fecha_hasta: date):
-    validar_rango_fechas(fecha_desde, fecha_hasta)
-    
-    return db.query(Turno).filter(
+def consulta_turnos_confirmados_por_periodo(db: Session, fecha_desde: date, fecha_hasta: date):
+    return db.query(Turno).options(CARGA_PERSONA).filter(
         Turno.estado == ESTADO_CONFIRMADO,
         Turno.fecha >= fecha_desde,
         Turno.fecha <= fecha_hasta
-    ).all()
+    )
+
+
+def obtener_todos_turnos_confirmados_por_periodo(db: Session, fecha_desde: date, fecha_hasta: date):
+    validar_rango_fechas(fecha_desde, fecha_hasta)
+    
+    return consulta_turnos_confirmados_por_periodo(db, fecha_desde, fecha_hasta).all()
+
+
+
+def calcular_porcentaje(parte: int, total: int):
+    return round(parte * 100 / total, 2) if total else 0.0
+
+
+def calcular_tasa(parte: int, total: int):
+    return round(parte / total, 4) if total else None
+
+
+def obtener_ocupacion(db: Session, fecha_desde: date, fecha_hasta: date):
+    
+    validar_rango_fechas(fecha_desde, fecha_hasta)
+    
+    cantidad_dias = (fecha_hasta - fecha_desde).days + 1
+    if cantidad_dias > MAX_DIAS_OCUPACION:
+        raise HTTPException(status_code=400, detail=f"El rango no puede superar los {MAX_DIAS_OCUPACION} días")
+    
+    # Cantidad de turnos por estado, fecha y hora del período, leída del resumen diario (turnos_diarios)
+    cantidades = consulta_turnos_diarios(db, fecha_desde, fecha_hasta).all()
+    
+    horarios_grilla = set(HORARIOS_DISPONIBLES)
+    fecha_actual = date.today()
+    por_estado = Counter()
+    estados_por_dia = defaultdict(Counter)
+    estados_por_horario = defaultdict(Counter)
+    ocupados_por_dia = Counter()
+    ocupados_por_horario = Counter()
+    asistidos = ausentes = 0
+    
+    for estado, fecha, hora, cantidad in cantidades:
+        por_estado[estado] += cantidad
+        estados_por_dia[fecha][estado] += cantidad
+        estados_por_horario[hora][estado] += cantidad
+        
+        # Ocupan la grilla los turnos no cancelados en un horario de HORARIOS_DISPONIBLES
+        if estado != ESTADO_CANCELADO and hora in horarios_grilla:
+            ocupados_por_dia[fecha] += cantidad
+            ocupados_por_horario[hora] += cantidad
+        
+        # Ausentismo: turnos de días pasados que quedaron confirmados sin marcarse como asistidos
+        if fecha < fecha_actual:
+            if estado == ESTADO_ASISTIDO:
+                asistidos += cantidad
+            elif estado == ESTADO_CONFIRMADO:
+                ausentes += cantidad
+    
+    capacidad_dia = len(HORARIOS_DISPONIBLES)
+    dias = []
+    for desplazamiento in range(cantidad_dias):
+        fecha = fecha_desde + timedelta(days=desplazamiento)
+        dias.append({
+            "fecha": fecha,
+            "capacidad": capacidad_dia,
+            "ocupados": ocupados_por_dia[fecha],
+            "porcentaje_ocupacion": calcular_porcentaje(ocupados_por_dia[fecha], capacidad_dia),
+            "por_estado": estados_por_dia.get(fecha, {})
+        })
+    
+    # Los horarios fuera de la grilla (turnos de una configuración anterior) se informan con capacidad 0
+    horarios = []
+    for hora in sorted(horarios_grilla.union(estados_por_horario)):
+        capacidad_horario = cantidad_dias if hora in horarios_grilla else 0
+        horarios.append({
+            "hora": hora,
+            "capacidad": capacidad_horario,
+            "ocupados": ocupados_por_horario[hora],
+            "porcentaje_ocupacion": calcular_porcentaje(ocupados_por_horario[hora], capacidad_horario),
+            "por_estado": estados_por_horario.get(hora, {})
+        })
+    
+    total_turnos = sum(por_estado.values())
+    capacidad = capacidad_dia * cantidad_dias
+    ocupados = sum(ocupados_por_dia.values())
+    
+    return {
+        "desde": fecha_desde,
+        "hasta": fecha_hasta,
+        "cantidad_dias": cantidad_dias,
+        "capacidad": capacidad,
+        "ocupados": ocupados,
+        "porcentaje_ocupacion": calcular_porcentaje(ocupados, capacidad),
+        "total_turnos": total_turnos,
+        "por_estado": por_estado,
+        "tasa_cancelacion": calcular_tasa(por_estado[ESTADO_CANCELADO], total_turnos),
+        "tasa_ausentismo": calcular_tasa(ausentes, asistidos + ausentes),
+        "dias": dias,
+        "horarios": horarios
+    }
+
+
+def verificar_indices_turnos(db: Session):
+    # Arma las consultas más frecuentes con valores de ejemplo y devuelve el plan de cada una
+    fecha_actual = date.today()
+    fecha_limite = fecha_actual - timedelta(days=DIAS_LIMITE_CANCELACIONES)
+
+    consultas = {
+        "obtener_turnos_disponibles": db.query(Turno.hora).filter(
+            Turno.fecha == fecha_actual,
+            Turno.estado != ESTADO_CANCELADO
+        ),
+        "obtener_turnos_cancelados_mes_actual": db.query(Turno).filter(
+            Turno.estado == ESTADO_CANCELADO,
+            Turno.fecha >= date(fecha_actual.year, fecha_actual.month, 1),
+            Turno.fecha <= fecha_actual
+        ),
+        "obtener_turnos_confirmados_por_periodo": db.query(Turno).filter(
+            Turno.estado == ESTADO_CONFIRMADO,
+            Turno.fecha <= fecha_actual,
+            tuple_(Turno.fecha, Turno.hora, Turno.id) > (fecha_limite, time.min, 0)
+        ).order_by(Turno.fecha, Turno.hora, Turno.id),
+        "contar_turnos_cancelados": db.query(CancelacionDiaria).filter(
+            CancelacionDiaria.persona_id == 0,
+            CancelacionDiaria.fecha >= fecha_limite
+        ),
+        "obtener_ocupacion": consulta_turnos_diarios(db, fecha_limite, fecha_actual),
+    }
+
+    return {nombre: explicar_consulta(db, consulta) for nombre, consulta in consultas.items()}
+
+
+# ==================== Versiones async (ver utils.version_async y utils.version_threadpool) ====================
+
+crear_turno_async = version_async(crear_turno)
+crear_turnos_lote_async = version_threadpool(crear_turnos_lote)
+listar_turnos_paginados_async = version_threadpool(listar_turnos_paginados)
+actualizar_turno_async = version_async(actualizar_turno)
+eliminar_turno_async = version_async(eliminar_turno)
+buscar_turno_async = version_async(buscar_turno)
+cancelar_turno_async = version_async(cancelar_turno)
+confirmar_turno_async = version_async(confirmar_turno)
+obtener_filas_turnos_por_fecha_async = version_threadpool(obtener_filas_turnos_por_fecha)
+obtener_filas_turnos_por_persona_async = version_threadpool(obtener_filas_turnos_por_persona)
+obtener_turnos_disponibles_async = version_async(obtener_turnos_disponibles)
+obtener_calendario_disponibilidad_async = version_threadpool(obtener_calendario_disponibilidad)
+obtener_filas_turnos_cancelados_mes_actual_async = version_threadpool(obtener_filas_turnos_cancelados_mes_actual)
+obtener_filas_personas_con_turnos_cancelados_async = version_threadpool(obtener_filas_personas_con_turnos_cancelados)
+obtener_turnos_confirmados_por_periodo_async = version_threadpool(obtener_turnos_confirmados_por_periodo)
+obtener_ocupacion_async = version_threadpool(obtener_ocupacion)
@@ -1,11 +1,88 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-from .config import URL_BASE_DATOS
+from .config import (URL_BASE_DATOS, URL_BASE_DATOS_ASYNC, MODO_ASYNC, SQL_ECHO, SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, SQLITE_CACHE_SIZE,
+                     SQLITE_MMAP_SIZE, SQLITE_BUSY_TIMEOUT, SQLITE_TEMP_STORE,
+                     DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE)
 
 
-engine = create_engine(URL_BASE_DATOS, echo=True, future=True)
+def configurar_conexion_sqlite(conexion_dbapi, registro_conexion):
+    cursor = conexion_dbapi.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    cursor.execute(f"PRAGMA temp_store={SQLITE_TEMP_STORE}")
+    cursor.close()
+
+
+def crear_motor(url: str = URL_BASE_DATOS):
+    motor = create_engine(
+        url,
+        echo=SQL_ECHO,
+        future=True,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE
+    )
+    if motor.dialect.name == "sqlite":
+        event.listen(motor, "connect", configurar_conexion_sqlite)
+    return motor
+
+
+def crear_motor_async(url: str = URL_BASE_DATOS_ASYNC):
+    motor = create_async_engine(
+        url,
+        echo=SQL_ECHO,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE
+    )
+    if motor.dialect.name == "sqlite":
+        event.listen(motor.sync_engine, "connect", configurar_conexion_sqlite)
+    return motor
+
+
+# El motor sync se usa siempre al iniciar (create_all, índices); el async solo en modo async
+engine = crear_motor()
 
 SesionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
-Base = declarative_base()
\ No newline at end of file
+engine_async = crear_motor_async() if MODO_ASYNC else None
+
+# expire_on_commit=False: las respuestas se arman fuera de run_sync y no pueden recargar atributos
+SesionAsync = async_sessionmaker(bind=engine_async, autoflush=False, expire_on_commit=False) if MODO_ASYNC else None
+
+Base = declarative_base()
+
+
+def crear_indices_faltantes():
+    # create_all no agrega índices nuevos a tablas que ya existen.
+    # Devuelve los índices únicos que no se pudieron crear porque los datos existentes los violan
+    indices_fallidos = []
+    for tabla in Base.metadata.sorted_tables:
+        for indice in tabla.indexes:
+            try:
+                indice.create(bind=engine, checkfirst=True)
+            except IntegrityError:
+                indices_fallidos.append(indice.name)
+    return indices_fallidos
+
+
+def explicar_consulta(db, consulta):
+    # Devuelve el detalle de EXPLAIN QUERY PLAN (SQLite) para una consulta ORM
+    compilada = consulta.statement.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+    parametros = compilada.construct_params()
+    valores = []
+    for nombre in compilada.positiontup:
+        # Un IN se expande en un parámetro por valor (estado_1_1, estado_1_2, ...) con el tipo del parámetro original
+        parametro = compilada.binds[nombre if nombre in compilada.binds else nombre.rsplit("_", 1)[0]]
+        procesador = parametro.type.dialect_impl(engine.dialect).bind_processor(engine.dialect)
+        valores.append(procesador(parametros[nombre]) if procesador else parametros[nombre])
+    plan = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compilada}", tuple(valores)).all()
+    return [fila[-1] for fila in plan]
@@ -1,47 +1,91 @@
+import io
+import logging
 from datetime import date
 from math import ceil
-from typing import List
+from typing import List, Literal, Optional, Union
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Depends, HTTPException
-
-from .config import LIMIT_PAGINACION_DEFAULT, MIN_CANCELADOS_DEFAULT, HORARIO_INICIO, HORARIO_FIN, INTERVALO_TURNOS_MINUTOS, HORARIOS_DISPONIBLES
-from .crudPersonas import obtener_todas_personas, crear_persona, actualizar_persona, buscar_persona, obtener_personas_con_turnos_cancelados, obtener_personas_por_estado, buscar_persona_por_dni
-from .crudTurnos import (cancelar_turno, confirmar_turno, crear_turno, eliminar_turno, listar_turnos, 
-                        actualizar_turno, buscar_turno, obtener_turnos_disponibles, obtener_turnos_por_fecha,
+from inspect import Parameter, signature
+from tempfile import SpooledTemporaryFile
+from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from sqlalchemy import inspect
+
+from .config import LIMIT_PAGINACION_DEFAULT, LIMIT_LISTADO_DEFAULT, MAX_TURNOS_LOTE, IMPORTACION_MAX_MEMORIA_BYTES, MIN_CANCELADOS_DEFAULT, HORARIO_INICIO, HORARIO_FIN, INTERVALO_TURNOS_MINUTOS, HORARIOS_DISPONIBLES
+from .crudPersonas import (crear_persona_async, importar_personas_async, obtener_personas_paginadas_async, actualizar_persona_async, buscar_persona_async,
+                           eliminar_persona_async, obtener_personas_por_estado_async, obtener_personas_por_estado, obtener_personas_con_turnos_cancelados,
+                           buscar_persona_por_dni_async, buscar_persona_por_dni, consulta_personas_con_turnos_cancelados, consulta_personas_por_estado)
+from .crudTurnos import (cancelar_turno_async, confirmar_turno_async, crear_turno_async, crear_turnos_lote_async, eliminar_turno_async, listar_turnos_paginados_async,
+                        actualizar_turno_async, buscar_turno_async, obtener_turnos_disponibles_async, obtener_calendario_disponibilidad_async, obtener_turnos_por_fecha,
                         agrupar_turnos_por_persona, obtener_turnos_cancelados_mes_actual, obtener_turnos_por_persona,
-                        obtener_turnos_confirmados_por_periodo, obtener_todos_turnos_confirmados_por_periodo)
-from .database import Base, engine
-from .models import Turno
-from .schemas import actualizar_turno_base, turno_base, ReporteTurnosPorFecha, ReporteTurnosCancelados, ReportePersonasConCancelaciones, TurnoReporte, ReporteTurnosConfirmadosPaginado, PersonaSimple, ReporteEstadoPersonas, PersonaCompleta, TurnoRespuesta, TurnosDisponiblesRespuesta, PersonaConTurnos, persona_base, actualizar_persona_base, PersonaRespuesta
-from .utils import get_db, calcular_edad, validar_formato_fecha, obtener_nombre_mes, generar_horarios_disponibles
-from .reportes_pdf import (generar_pdf_turnos_por_fecha, generar_pdf_turnos_cancelados_mes, 
-                       generar_pdf_turnos_por_persona, generar_pdf_personas_con_cancelaciones,
-                       generar_pdf_turnos_confirmados, generar_pdf_estado_personas)
+                        obtener_filas_turnos_por_fecha_async, obtener_filas_turnos_cancelados_mes_actual_async, obtener_filas_turnos_por_persona_async,
+                        obtener_filas_personas_con_turnos_cancelados_async, obtener_ocupacion_async,
+                        obtener_turnos_confirmados_por_periodo_async, obtener_todos_turnos_confirmados_por_periodo,
+                        verificar_indices_turnos, consulta_turnos_por_fecha, consulta_turnos_cancelados_mes_actual, consulta_turnos_por_persona,
+                        consulta_turnos_confirmados_por_periodo)
+from .cache_reportes import cache_reportes
+from .cancelaciones import reconstruir_contadores_cancelaciones
+from .turnos_diarios import reconstruir_turnos_diarios
+from .database import Base, engine, engine_async, SesionLocal, crear_indices_faltantes
+from .models import CancelacionDiaria, TurnoDiario
+from .procesos_pdf import pool_pdf, fila_persona, filas_personas, filas_turnos
+from .trabajos_reportes import trabajos_reportes, TRABAJO_TERMINADO
+from .schemas import actualizar_turno_base, turno_base, ReporteTurnosPorFecha, ReporteTurnosCancelados, ReportePersonasConCancelaciones, ReporteTurnosConfirmadosPaginado, ReporteTurnosConfirmadosCursor, ReporteEstadoPersonas, ReporteOcupacion, TurnoRespuesta, ResultadoTurnoLote, RespuestaTurnosLote, TurnosDisponiblesRespuesta, DisponibilidadDia, CalendarioDisponibilidadRespuesta, PersonaConTurnos, persona_base, actualizar_persona_base, PersonaRespuesta, RespuestaImportacionPersonas, trabajo_reporte_base, TrabajoReporteRespuesta
+from .utils import get_db, abrir_sesion, version_threadpool, deshacer_cambios_async, hay_resultados_async, iterar_consulta, calcular_edad, validar_formato_fecha, validar_limite, validar_rango_fechas, obtener_nombre_mes, generar_horarios_disponibles
 from .reportes_csv import (generar_csv_turnos_por_fecha, generar_csv_turnos_cancelados_mes,
                        generar_csv_turnos_por_persona, generar_csv_personas_con_cancelaciones,
                        generar_csv_turnos_confirmados, generar_csv_estado_personas)
+from .serializacion import (serializador_personas, serializador_turnos, serializador_turnos_por_fecha, serializador_turnos_cancelados_mes,
+                            serializador_turnos_por_persona, serializador_personas_con_cancelaciones, serializador_turnos_confirmados, serializador_turnos_confirmados_cursor,
+                            serializador_estado_personas, serializador_ocupacion, filas_a_dicts)
+from .reportes_tipados import (FORMATO_NDJSON, FORMATO_PARQUET, MEDIA_TYPES, transmitir_reporte_tipado, crear_fila_persona,
+                               reporte_turnos_por_fecha, reporte_turnos_cancelados_mes, reporte_turnos_por_persona,
+                               reporte_personas_con_cancelaciones, reporte_turnos_confirmados, reporte_estado_personas)
+
+
+logger = logging.getLogger("uvicorn.error")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Los contadores de cancelaciones y el resumen diario se calculan desde los turnos la primera vez que se crea su tabla
+    contadores_nuevos = not inspect(engine).has_table(CancelacionDiaria.__tablename__)
+    resumen_nuevo = not inspect(engine).has_table(TurnoDiario.__tablename__)
     Base.metadata.create_all(bind=engine)
+    for indice in crear_indices_faltantes():
+        logger.warning("No se pudo crear el índice único %s: hay datos duplicados", indice)
+    with SesionLocal() as db:
+        if contadores_nuevos:
+            reconstruir_contadores_cancelaciones(db)
+        if resumen_nuevo:
+            reconstruir_turnos_diarios(db)
+        for consulta, plan in verificar_indices_turnos(db).items():
+            usa_indice = any("USING INDEX" in paso or "USING COVERING INDEX" in paso for paso in plan)
+            logger.info("%s: %s (%s)", consulta, "usa índice" if usa_indice else "SIN ÍNDICE", " | ".join(plan))
     horarios = generar_horarios_disponibles(HORARIO_INICIO, HORARIO_FIN, INTERVALO_TURNOS_MINUTOS)
     HORARIOS_DISPONIBLES.extend(horarios)
+    # La base pudo cambiar con la API detenida: las ETags de antes del arranque ya no valen
+    cache_reportes.invalidar()
+    trabajos_reportes.limpiar_vencidos()
     yield
+    await trabajos_reportes.cerrar()
+    pool_pdf.cerrar()
+    if engine_async is not None:
+        await engine_async.dispose()
 
 app = FastAPI(title="SL-UNLA-LAB-2025-GRUPO-03-API", lifespan=lifespan)
 
 
 @app.get("/")
-def inicio():
+async def inicio():
     return {"ok": True, "mensaje": "API funcionando"}
 
 # ========================== Endpoints Personas ==========================
 
 @app.post("/personas", response_model=PersonaRespuesta)
-def crear_persona_endpoint(persona_data: persona_base, db = Depends(get_db)):
+async def crear_persona_endpoint(persona_data: persona_base, db = Depends(get_db)):
     try:
-        nueva_persona = crear_persona(db, persona_data)
+        nueva_persona = await crear_persona_async(db, persona_data)
         
         return PersonaRespuesta(
             id=nueva_persona.id,
@@ -56,27 +100,46 @@ def crear_persona_endpoint(persona_data: persona_base, db = Depends(get_db)):
     except HTTPException:
         raise
     except Exception:
-        db.rollback()
+        await deshacer_cambios_async(db)
         raise HTTPException(status_code=500, detail="Error al crear la persona")
 
 
+@app.post("/personas/importar", response_model=RespuestaImportacionPersonas)
+async def importar_personas_endpoint(request: Request, db = Depends(get_db)):
+    # El CSV llega como cuerpo del request (Content-Type: text/csv); se copia a un archivo
+    # temporal que pasa a disco al superar IMPORTACION_MAX_MEMORIA_BYTES
+    with SpooledTemporaryFile(max_size=IMPORTACION_MAX_MEMORIA_BYTES) as archivo:
+        async for bloque in request.stream():
+            archivo.write(bloque)
+        archivo.seek(0)
+        
+        try:
+            with io.TextIOWrapper(archivo, encoding="utf-8-sig", newline="") as texto:
+                return await importar_personas_async(db, texto)
+        except HTTPException:
+            raise
+        except UnicodeDecodeError:
+            await deshacer_cambios_async(db)
+            raise HTTPException(status_code=400, detail="El archivo debe estar codificado en UTF-8")
+        except Exception:
+            await deshacer_cambios_async(db)
+            raise HTTPException(status_code=500, detail="Error al importar las personas")
+
+
 @app.get("/personas", response_model=List[PersonaRespuesta])
-def listar_personas(db = Depends(get_db)):
+async def listar_personas(limite: int = LIMIT_LISTADO_DEFAULT, cursor: Optional[str] = None, 
+                    habilitado: Optional[bool] = None, dni_prefijo: Optional[str] = None, db = Depends(get_db)):
     try:
-        personas = obtener_todas_personas(db)
-        return [
-            PersonaRespuesta(
-                id=persona.id,
-                nombre=persona.nombre,
-                dni=persona.dni,
-                email=persona.email,
-                telefono=persona.telefono,
-                fecha_nacimiento=persona.fecha_nacimiento,
-                edad=calcular_edad(persona.fecha_nacimiento),
-                habilitado=persona.habilitado
-            )
-            for persona in personas
-        ]
+        validar_limite(limite)
+        if dni_prefijo is not None and not dni_prefijo.isdigit():
+            raise HTTPException(status_code=400, detail="El prefijo de DNI debe contener solo números")
+        
+        personas, siguiente_cursor = await obtener_personas_paginadas_async(db, limite, cursor, habilitado, dni_prefijo)
+        
+        # El token de la página siguiente va en un header para no cambiar el formato de la respuesta
+        headers = {"X-Next-Cursor": siguiente_cursor} if siguiente_cursor else None
+        
+        return serializador_personas.responder([crear_fila_persona(persona) for persona in personas], headers)
     except HTTPException:
         raise
     except Exception:
@@ -84,9 +147,9 @@ def listar_personas(db = Depends(get_db)):
 
 
 @app.get("/personas/{id}", response_model=PersonaRespuesta)
-def obtener_persona(id: int, db = Depends(get_db)):
+async def obtener_persona(id: int, db = Depends(get_db)):
     try:
-        persona = buscar_persona(db, id)
+        persona = await buscar_persona_async(db, id)
         
         return PersonaRespuesta(
             id=persona.id,
@@ -105,9 +168,9 @@ def obtener_persona(id: int, db = Depends(get_db)):
 
 
 @app.put("/personas/{id}", response_model=PersonaRespuesta)
-def actualizar_persona_endpoint(id: int, persona_data: actualizar_persona_base, db = Depends(get_db)):
+async def actualizar_persona_endpoint(id: int, persona_data: actualizar_persona_base, db = Depends(get_db)):
     try:
-        persona = actualizar_persona(db, id, persona_data)
+        persona = await actualizar_persona_async(db, id, persona_data)
         
         return PersonaRespuesta(
             id=persona.id,
@@ -122,16 +185,13 @@ def actualizar_persona_endpoint(id: int, persona_data: actualizar_persona_base,
     except HTTPException:
         raise
     except Exception:
-        db.rollback()
+        await deshacer_cambios_async(db)
         raise HTTPException(status_code=500, detail="Error al actualizar la persona")
 
 
 @app.delete("/personas/{id}")
-def eliminar_persona(id: int, db = Depends(get_db)):
-    persona = buscar_persona(db, id)
-    
-    # Verificar si la persona tiene turnos asociados
-    turnos_asociados = db.query(Turno).filter(Turno.persona_id == id).count()
+async def eliminar_persona_endpoint(id: int, db = Depends(get_db)):
+    turnos_asociados = await eliminar_persona_async(db, id)
     
     if turnos_asociados > 0:
         return {
@@ -139,17 +199,15 @@ def eliminar_persona(id: int, db = Depends(get_db)):
             "mensaje": f"No se puede eliminar la persona porque tiene {turnos_asociados} turno(s) asociado(s). Primero elimine o cancele los turnos."
         }
 
-    db.delete(persona)
-    db.commit()
     return {"ok": True, "mensaje": "Persona eliminada"}
 
 
 # ========================== Endpoints Turnos ==========================
 
 @app.post("/turnos", response_model=TurnoRespuesta)
-def crear_turno_endpoint(turno_data: turno_base, db = Depends(get_db)):
+async def crear_turno_endpoint(turno_data: turno_base, db = Depends(get_db)):
     try:
-        nuevo_turno = crear_turno(db, turno_data)
+        nuevo_turno = await crear_turno_async(db, turno_data)
 
         return TurnoRespuesta(
             id=nuevo_turno.id,
@@ -161,33 +219,79 @@ def crear_turno_endpoint(turno_data: turno_base, db = Depends(get_db)):
     except HTTPException:
         raise
     except Exception:
-        db.rollback()
+        await deshacer_cambios_async(db)
         raise HTTPException(status_code=500, detail="Error al crear el turno")
 
-@app.get("/turnos", response_model=List[TurnoRespuesta])
-def listar_turnos_endpoint(db = Depends(get_db)):
+@app.post("/turnos/lote", response_model=RespuestaTurnosLote)
+async def crear_turnos_lote_endpoint(turnos_data: List[turno_base], db = Depends(get_db)):
+    if not turnos_data or len(turnos_data) > MAX_TURNOS_LOTE:
+        raise HTTPException(status_code=400, detail=f"El lote debe tener entre 1 y {MAX_TURNOS_LOTE} turnos")
+    
     try:
-        turnos = listar_turnos(db)
-
-        return [
-            TurnoRespuesta(
-                id=turno.id,
-                persona_id=turno.persona_id,
-                fecha=turno.fecha,
-                hora=turno.hora,
-                estado=turno.estado
+        resultados = await crear_turnos_lote_async(db, turnos_data)
+        
+        respuesta = [
+            ResultadoTurnoLote(
+                indice=indice,
+                turno=TurnoRespuesta(
+                    id=turno.id,
+                    persona_id=turno.persona_id,
+                    fecha=turno.fecha,
+                    hora=turno.hora,
+                    estado=turno.estado
+                ) if turno is not None else None,
+                error=error
             )
-            for turno in turnos
+            for indice, (turno, error) in enumerate(resultados)
         ]
+        creados = sum(1 for resultado in respuesta if resultado.turno is not None)
+        
+        return RespuestaTurnosLote(
+            creados=creados,
+            rechazados=len(respuesta) - creados,
+            resultados=respuesta
+        )
+    except HTTPException:
+        raise
+    except Exception:
+        await deshacer_cambios_async(db)
+        raise HTTPException(status_code=500, detail="Error al crear los turnos")
+
+@app.get("/turnos", response_model=List[TurnoRespuesta])
+async def listar_turnos_endpoint(limite: int = LIMIT_LISTADO_DEFAULT, cursor: Optional[str] = None, 
+                           desde: Optional[str] = None, hasta: Optional[str] = None, estado: Optional[str] = None, 
+                           persona_id: Optional[int] = None, db = Depends(get_db)):
+    try:
+        validar_limite(limite)
+        
+        fecha_desde = None
+        if desde is not None:
+            validar_formato_fecha(desde)
+            fecha_desde = date.fromisoformat(desde)
+        
+        fecha_hasta = None
+        if hasta is not None:
+            validar_formato_fecha(hasta)
+            fecha_hasta = date.fromisoformat(hasta)
+        
+        if fecha_desde is not None and fecha_hasta is not None:
+            validar_rango_fechas(fecha_desde, fecha_hasta)
+        
+        turnos, siguiente_cursor = await listar_turnos_paginados_async(db, limite, cursor, fecha_desde, fecha_hasta, estado, persona_id)
+        
+        # El token de la página siguiente va en un header para no cambiar el formato de la respuesta
+        headers = {"X-Next-Cursor": siguiente_cursor} if siguiente_cursor else None
+
+        return serializador_turnos.responder(filas_a_dicts(turnos), headers)
     except HTTPException:
         raise
     except Exception:
         raise HTTPException(status_code=500, detail="Error al obtener los turnos")
 
 @app.get("/turnos/{id}", response_model=TurnoRespuesta)
-def obtener_turno(id: int, db = Depends(get_db)):
+async def obtener_turno(id: int, db = Depends(get_db)):
     try:
-        turno = buscar_turno(db, id)
+        turno = await buscar_turno_async(db, id)
         return TurnoRespuesta(
             id=turno.id,
             persona_id=turno.persona_id,
@@ -201,9 +305,9 @@ def obtener_turno(id: int, db = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Error al obtener el turno")
 
 @app.put("/turnos/{id}", response_model=TurnoRespuesta)
-def actualizar_turno_endpoint(id: int, turno_data: actualizar_turno_base, db = Depends(get_db)):
+async def actualizar_turno_endpoint(id: int, turno_data: actualizar_turno_base, db = Depends(get_db)):
     try:
-        turno = actualizar_turno(db, id, turno_data)
+        turno = await actualizar_turno_async(db, id, turno_data)
         
         return TurnoRespuesta(
             id=turno.id,
@@ -215,27 +319,54 @@ def actualizar_turno_endpoint(id: int, turno_data: actualizar_turno_base, db = D
     except HTTPException:
         raise
     except Exception:
-        db.rollback()
+        await deshacer_cambios_async(db)
         raise HTTPException(status_code=500, detail="Error al actualizar el turno")
 
 @app.delete("/turnos/{id}")
-def eliminar_turno_endpoint(id: int, db = Depends(get_db)):
+async def eliminar_turno_endpoint(id: int, db = Depends(get_db)):
 
-    eliminar_turno(db, id)
+    await eliminar_turno_async(db, id)
 
     return {"ok": True, "mensaje": "Turno eliminado"}
 
 
-@app.get("/turnos-disponibles", response_model=TurnosDisponiblesRespuesta)
-def obtener_turnos_disponibles_endpoint(fecha: str, db = Depends(get_db)):
+@app.get("/turnos-disponibles", response_model=Union[TurnosDisponiblesRespuesta, CalendarioDisponibilidadRespuesta], response_model_exclude_none=True)
+async def obtener_turnos_disponibles_endpoint(fecha: Optional[str] = None, desde: Optional[str] = None, hasta: Optional[str] = None, 
+                                              compacto: bool = False, db = Depends(get_db)):
     try:
-        validar_formato_fecha(fecha)    
-        fecha_date = date.fromisoformat(fecha)
-        turnos_disponibles = obtener_turnos_disponibles(db, fecha_date)
-
-        return TurnosDisponiblesRespuesta(
-            fecha=fecha_date,
-            horarios_disponibles=turnos_disponibles
+        if fecha is not None:
+            validar_formato_fecha(fecha)    
+            fecha_date = date.fromisoformat(fecha)
+            turnos_disponibles = await obtener_turnos_disponibles_async(db, fecha_date)
+
+            return TurnosDisponiblesRespuesta(
+                fecha=fecha_date,
+                horarios_disponibles=turnos_disponibles
+            )
+        
+        if desde is None or hasta is None:
+            raise HTTPException(status_code=400, detail="Debe indicar 'fecha' o el rango 'desde' y 'hasta'")
+        
+        validar_formato_fecha(desde)
+        validar_formato_fecha(hasta)
+        
+        fecha_desde = date.fromisoformat(desde)
+        fecha_hasta = date.fromisoformat(hasta)
+        
+        # En modo compacto solo se informa la cantidad de horarios libres de cada día
+        calendario = await obtener_calendario_disponibilidad_async(db, fecha_desde, fecha_hasta, compacto)
+        
+        return CalendarioDisponibilidadRespuesta(
+            desde=fecha_desde,
+            hasta=fecha_hasta,
+            dias=[
+                DisponibilidadDia(
+                    fecha=fecha_dia,
+                    cantidad_disponibles=cantidad_disponibles,
+                    horarios_disponibles=horarios_disponibles
+                )
+                for fecha_dia, cantidad_disponibles, horarios_disponibles in calendario
+            ]
         )
     except HTTPException:
         raise
@@ -243,9 +374,9 @@ def obtener_turnos_disponibles_endpoint(fecha: str, db = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Error al obtener turnos disponibles") 
 
 @app.put("/turnos/{turno_id}/cancelar", response_model=TurnoRespuesta)
-def cancelar_turno_endpoint(turno_id: int, db = Depends(get_db)):
+async def cancelar_turno_endpoint(turno_id: int, db = Depends(get_db)):
     try:
-        turno_cancelado = cancelar_turno(db, turno_id)
+        turno_cancelado = await cancelar_turno_async(db, turno_id)
             
         return TurnoRespuesta(
             id=turno_cancelado.id,
@@ -257,14 +388,14 @@ def cancelar_turno_endpoint(turno_id: int, db = Depends(get_db)):
     except HTTPException:
         raise
     except Exception:
-        db.rollback()
+        await deshacer_cambios_async(db)
         raise HTTPException(status_code=500, detail="Error al cancelar el turno")
     
 
 @app.put("/turnos/{turno_id}/confirmar", response_model=TurnoRespuesta)
-def confirmar_turno_endpoint(turno_id: int, db = Depends(get_db)):
+async def confirmar_turno_endpoint(turno_id: int, db = Depends(get_db)):
     try:
-        turno_confirmado = confirmar_turno(db, turno_id)
+        turno_confirmado = await confirmar_turno_async(db, turno_id)
         
         return TurnoRespuesta(
             id=turno_confirmado.id,
@@ -276,27 +407,30 @@ def confirmar_turno_endpoint(turno_id: int, db = Depends(get_db)):
     except HTTPException:
         raise
     except Exception:
-        db.rollback()
+        await deshacer_cambios_async(db)
         raise HTTPException(status_code=500, detail="Error al confirmar el turno")
 
 
 # ========================== Endpoints Reportes ==========================
 
 @app.get("/reportes/turnos-por-fecha", response_model=ReporteTurnosPorFecha, response_model_exclude_none=True)
-def obtener_turnos_por_fecha_endpoint(fecha: str, db = Depends(get_db)):
+async def obtener_turnos_por_fecha_endpoint(fecha: str, db = Depends(get_db), request: Request = None):
     try:
         validar_formato_fecha(fecha)
         fecha_date = date.fromisoformat(fecha)
         
-        turnos = obtener_turnos_por_fecha(db, fecha_date)
-        personas_turnos = agrupar_turnos_por_persona(turnos, incluir_fecha=False)
-        
-        return ReporteTurnosPorFecha(
-            fecha=fecha_date,
-            cantidad_turnos=len(turnos),
-            cantidad_personas=len(personas_turnos),
-            personas=personas_turnos
-        )
+        async def generar():
+            turnos = await obtener_filas_turnos_por_fecha_async(db, fecha_date)
+            personas_turnos = agrupar_turnos_por_persona(turnos, incluir_fecha=False)
+            
+            return serializador_turnos_por_fecha.responder({
+                "fecha": fecha_date,
+                "cantidad_turnos": len(turnos),
+                "cantidad_personas": len(personas_turnos),
+                "personas": personas_turnos
+            })
+        
+        return await cache_reportes.responder(request, generar)
     except HTTPException:
         raise
     except Exception:
@@ -304,19 +438,22 @@ def obtener_turnos_por_fecha_endpoint(fecha: str, db = Depends(get_db)):
 
 
 @app.get("/reportes/turnos-cancelados-por-mes", response_model=ReporteTurnosCancelados, response_model_exclude_none=True)
-def obtener_turnos_cancelados_mes_endpoint(db = Depends(get_db)):
+async def obtener_turnos_cancelados_mes_endpoint(db = Depends(get_db), request: Request = None):
     try:
-        turnos_cancelados = obtener_turnos_cancelados_mes_actual(db)
-        personas_turnos = agrupar_turnos_por_persona(turnos_cancelados, incluir_fecha=True)
-        fecha_actual = date.today()
-        
-        return ReporteTurnosCancelados(
-            mes=obtener_nombre_mes(fecha_actual),
-            año=fecha_actual.year,
-            cantidad_total=len(turnos_cancelados),
-            cantidad_personas=len(personas_turnos),
-            personas=personas_turnos
-        )
+        async def generar():
+            turnos_cancelados = await obtener_filas_turnos_cancelados_mes_actual_async(db)
+            personas_turnos = agrupar_turnos_por_persona(turnos_cancelados, incluir_fecha=True)
+            fecha_actual = date.today()
+            
+            return serializador_turnos_cancelados_mes.responder({
+                "mes": obtener_nombre_mes(fecha_actual),
+                "año": fecha_actual.year,
+                "cantidad_total": len(turnos_cancelados),
+                "cantidad_personas": len(personas_turnos),
+                "personas": personas_turnos
+            })
+        
+        return await cache_reportes.responder(request, generar)
     except HTTPException:
         raise
     except Exception:
@@ -324,28 +461,21 @@ def obtener_turnos_cancelados_mes_endpoint(db = Depends(get_db)):
 
 
 @app.get("/reportes/turnos-por-persona", response_model=PersonaConTurnos, response_model_exclude_none=True)
-def obtener_turnos_por_persona_endpoint(dni: str, db = Depends(get_db)):
+async def obtener_turnos_por_persona_endpoint(dni: str, db = Depends(get_db), request: Request = None):
     try:
-        persona = buscar_persona_por_dni(db, dni)
-        turnos = obtener_turnos_por_persona(db, persona.id)
-        
-        turnos_reporte = [
-            TurnoReporte(
-                id=turno.id,
-                fecha=turno.fecha,
-                hora=turno.hora,
-                estado=turno.estado
-            )
-            for turno in turnos
-        ]
-        
-        return PersonaConTurnos(
-            id=persona.id,
-            nombre=persona.nombre,
-            dni=persona.dni,
-            cantidad_turnos=len(turnos_reporte),
-            turnos=turnos_reporte
-        )
+        async def generar():
+            persona = await buscar_persona_por_dni_async(db, dni)
+            turnos = await obtener_filas_turnos_por_persona_async(db, persona.id)
+            
+            return serializador_turnos_por_persona.responder({
+                "id": persona.id,
+                "nombre": persona.nombre,
+                "dni": persona.dni,
+                "cantidad_turnos": len(turnos),
+                "turnos": filas_a_dicts(turnos)
+            })
+        
+        return await cache_reportes.responder(request, generar)
     except HTTPException:
         raise
     except Exception:
@@ -353,7 +483,7 @@ def obtener_turnos_por_persona_endpoint(dni: str, db = Depends(get_db)):
 
 
 @app.get("/reportes/turnos-cancelados", response_model=ReportePersonasConCancelaciones, response_model_exclude_none=True)
-def obtener_personas_con_cancelaciones_endpoint(min: int = MIN_CANCELADOS_DEFAULT, db = Depends(get_db)):
+async def obtener_personas_con_cancelaciones_endpoint(min: int = MIN_CANCELADOS_DEFAULT, db = Depends(get_db), request: Request = None):
     try:
         if min < 1:
             raise HTTPException(
@@ -361,22 +491,25 @@ def obtener_personas_con_cancelaciones_endpoint(min: int = MIN_CANCELADOS_DEFAUL
                 detail="El número mínimo de turnos cancelados debe ser al menos 1"
             )
         
-        turnos_con_minimo_cancelaciones = obtener_personas_con_turnos_cancelados(db, min)
-        personas_con_cancelaciones = agrupar_turnos_por_persona(turnos_con_minimo_cancelaciones, incluir_fecha=True)
+        async def generar():
+            turnos_con_minimo_cancelaciones = await obtener_filas_personas_con_turnos_cancelados_async(db, min)
+            personas_con_cancelaciones = agrupar_turnos_por_persona(turnos_con_minimo_cancelaciones, incluir_fecha=True)
+            
+            return serializador_personas_con_cancelaciones.responder({
+                "min_cancelados": min,
+                "cantidad_personas": len(personas_con_cancelaciones),
+                "personas": personas_con_cancelaciones
+            })
         
-        return ReportePersonasConCancelaciones(
-            min_cancelados=min,
-            cantidad_personas=len(personas_con_cancelaciones),
-            personas=personas_con_cancelaciones
-        )
+        return await cache_reportes.responder(request, generar)
     except HTTPException:
         raise
     except Exception:
         raise HTTPException(status_code=500, detail="Error al generar el reporte")
 
 
-@app.get("/reportes/turnos-confirmados", response_model=ReporteTurnosConfirmadosPaginado, response_model_exclude_none=True)
-def obtener_turnos_confirmados_endpoint(desde: str, hasta: str, pagina: int = 1, db = Depends(get_db)):
+@app.get("/reportes/turnos-confirmados", response_model=Union[ReporteTurnosConfirmadosPaginado, ReporteTurnosConfirmadosCursor], response_model_exclude_none=True)
+async def obtener_turnos_confirmados_endpoint(desde: str, hasta: str, pagina: int = 1, cursor: Optional[str] = None, db = Depends(get_db), request: Request = None):
     try:
         validar_formato_fecha(desde)
         validar_formato_fecha(hasta)
@@ -384,35 +517,32 @@ def obtener_turnos_confirmados_endpoint(desde: str, hasta: str, pagina: int = 1,
         fecha_desde = date.fromisoformat(desde)
         fecha_hasta = date.fromisoformat(hasta)
         
-        turnos_paginados, total_turnos_confirmados = obtener_turnos_confirmados_por_periodo(
-            db, fecha_desde, fecha_hasta, pagina, LIMIT_PAGINACION_DEFAULT
-        )
-        
-        turnos_detalle = [
-            TurnoReporte(
-                id=turno.id,
-                fecha=turno.fecha,
-                hora=turno.hora,
-                estado=turno.estado,
-                persona=PersonaSimple(
-                    id=turno.persona.id,
-                    nombre=turno.persona.nombre,
-                    dni=turno.persona.dni
-                )
+        async def generar():
+            turnos_paginados, total_turnos_confirmados, siguiente_cursor = await obtener_turnos_confirmados_por_periodo_async(
+                db, fecha_desde, fecha_hasta, pagina, LIMIT_PAGINACION_DEFAULT, cursor
             )
-            for turno in turnos_paginados
-        ]
-        
-        total_paginas = ceil(total_turnos_confirmados / LIMIT_PAGINACION_DEFAULT)
-        
-        return ReporteTurnosConfirmadosPaginado(
-            desde=fecha_desde,
-            hasta=fecha_hasta,
-            pagina=pagina,
-            total_turnos=total_turnos_confirmados,
-            total_paginas=total_paginas,
-            turnos=turnos_detalle
-        )
+            
+            # Los turnos (con su persona, cargada en la misma consulta) se validan desde los atributos del ORM.
+            # Con cursor la respuesta no lleva número de página ni total: no se recalcula en cada página
+            if cursor is not None:
+                return serializador_turnos_confirmados_cursor.responder({
+                    "desde": fecha_desde,
+                    "hasta": fecha_hasta,
+                    "next_cursor": siguiente_cursor,
+                    "turnos": turnos_paginados
+                })
+            
+            return serializador_turnos_confirmados.responder({
+                "desde": fecha_desde,
+                "hasta": fecha_hasta,
+                "pagina": pagina,
+                "total_turnos": total_turnos_confirmados,
+                "total_paginas": ceil(total_turnos_confirmados / LIMIT_PAGINACION_DEFAULT),
+                "next_cursor": siguiente_cursor,
+                "turnos": turnos_paginados
+            })
+        
+        return await cache_reportes.responder(request, generar)
     except HTTPException:
         raise
     except Exception:
@@ -420,29 +550,38 @@ def obtener_turnos_confirmados_endpoint(desde: str, hasta: str, pagina: int = 1,
 
 
 @app.get("/reportes/estado-personas", response_model=ReporteEstadoPersonas)
-def obtener_personas_por_estado_endpoint(habilitado: bool, db = Depends(get_db)):
+async def obtener_personas_por_estado_endpoint(habilitado: bool, db = Depends(get_db), request: Request = None):
     try:
-        personas = obtener_personas_por_estado(db, habilitado)
-        
-        personas_detalle = [
-            PersonaCompleta(
-                id=persona.id,
-                nombre=persona.nombre,
-                dni=persona.dni,
-                email=persona.email,
-                telefono=persona.telefono,
-                fecha_nacimiento=persona.fecha_nacimiento,
-                edad=calcular_edad(persona.fecha_nacimiento),
-                habilitado=persona.habilitado
-            )
-            for persona in personas
-        ]
+        async def generar():
+            personas = await obtener_personas_por_estado_async(db, habilitado)
+            
+            return serializador_estado_personas.responder({
+                "habilitado": habilitado,
+                "cantidad_personas": len(personas),
+                "personas": [crear_fila_persona(persona) for persona in personas]
+            })
         
-        return ReporteEstadoPersonas(
-            habilitado=habilitado,
-            cantidad_personas=len(personas_detalle),
-            personas=personas_detalle
-        )
+        return await cache_reportes.responder(request, generar)
+    except HTTPException:
+        raise
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error al generar el reporte")
+
+
+@app.get("/reportes/ocupacion", response_model=ReporteOcupacion)
+async def obtener_ocupacion_endpoint(desde: str, hasta: str, db = Depends(get_db), request: Request = None):
+    try:
+        validar_formato_fecha(desde)
+        validar_formato_fecha(hasta)
+        
+        fecha_desde = date.fromisoformat(desde)
+        fecha_hasta = date.fromisoformat(hasta)
+        
+        # Ocupación de la grilla por día y por horario, cantidades por estado y tasas de cancelación y ausentismo
+        async def generar():
+            return serializador_ocupacion.responder(await obtener_ocupacion_async(db, fecha_desde, fecha_hasta))
+        
+        return await cache_reportes.responder(request, generar)
     except HTTPException:
         raise
     except Exception:
@@ -450,16 +589,41 @@ def obtener_personas_por_estado_endpoint(habilitado: bool, db = Depends(get_db))
 
 
 # ========================== Endpoints Reportes PDF ==========================
+# La consulta y la conversión a filas planas (procesos_pdf) corren en la misma llamada, en el
+# threadpool: con miles de filas, convertirlas en el event loop lo bloquearía
+
+def filas_pdf_turnos(obtener_turnos):
+    def obtener_filas(db, *args):
+        return filas_turnos(obtener_turnos(db, *args))
+    return version_threadpool(obtener_filas)
+
+
+def obtener_filas_pdf_turnos_por_persona(db, dni: str):
+    persona = buscar_persona_por_dni(db, dni)
+    return fila_persona(persona), filas_turnos(obtener_turnos_por_persona(db, persona.id))
+
+
+def obtener_filas_pdf_estado_personas(db, habilitado: bool):
+    return filas_personas(obtener_personas_por_estado(db, habilitado))
+
+
+obtener_filas_pdf_turnos_por_fecha_async = filas_pdf_turnos(obtener_turnos_por_fecha)
+obtener_filas_pdf_turnos_cancelados_mes_async = filas_pdf_turnos(obtener_turnos_cancelados_mes_actual)
+obtener_filas_pdf_personas_con_cancelaciones_async = filas_pdf_turnos(obtener_personas_con_turnos_cancelados)
+obtener_filas_pdf_turnos_confirmados_async = filas_pdf_turnos(obtener_todos_turnos_confirmados_por_periodo)
+obtener_filas_pdf_turnos_por_persona_async = version_threadpool(obtener_filas_pdf_turnos_por_persona)
+obtener_filas_pdf_estado_personas_async = version_threadpool(obtener_filas_pdf_estado_personas)
+
 
 @app.get("/reportes/pdf/turnos-por-fecha")
-def obtener_pdf_turnos_por_fecha(fecha: str, db = Depends(get_db)):
+async def obtener_pdf_turnos_por_fecha(fecha: str, renderizador: Optional[Literal["borb", "rapido"]] = None, db = Depends(get_db)):
     try:
         validar_formato_fecha(fecha)
         fecha_date = date.fromisoformat(fecha)
         
-        turnos = obtener_turnos_por_fecha(db, fecha_date)
+        turnos = await obtener_filas_pdf_turnos_por_fecha_async(db, fecha_date)
         
-        return generar_pdf_turnos_por_fecha(fecha_date, turnos)
+        return await pool_pdf.generar("generar_pdf_turnos_por_fecha", fecha_date, turnos, renderizador=renderizador)
     except HTTPException:
         raise
     except Exception:
@@ -467,15 +631,16 @@ def obtener_pdf_turnos_por_fecha(fecha: str, db = Depends(get_db)):
 
 
 @app.get("/reportes/pdf/turnos-cancelados-por-mes")
-def obtener_pdf_turnos_cancelados_mes(db = Depends(get_db)):
+async def obtener_pdf_turnos_cancelados_mes(renderizador: Optional[Literal["borb", "rapido"]] = None, db = Depends(get_db)):
     try:
-        turnos_cancelados = obtener_turnos_cancelados_mes_actual(db)
+        turnos_cancelados = await obtener_filas_pdf_turnos_cancelados_mes_async(db)
         fecha_actual = date.today()
         
-        return generar_pdf_turnos_cancelados_mes(
+        return await pool_pdf.generar("generar_pdf_turnos_cancelados_mes",
             obtener_nombre_mes(fecha_actual),
             fecha_actual.year,
-            turnos_cancelados
+            turnos_cancelados,
+            renderizador=renderizador
         )
     except HTTPException:
         raise
@@ -484,12 +649,11 @@ def obtener_pdf_turnos_cancelados_mes(db = Depends(get_db)):
 
 
 @app.get("/reportes/pdf/turnos-por-persona")
-def obtener_pdf_turnos_por_persona(dni: str, db = Depends(get_db)):
+async def obtener_pdf_turnos_por_persona(dni: str, renderizador: Optional[Literal["borb", "rapido"]] = None, db = Depends(get_db)):
     try:
-        persona = buscar_persona_por_dni(db, dni)
-        turnos = obtener_turnos_por_persona(db, persona.id)
+        persona, turnos = await obtener_filas_pdf_turnos_por_persona_async(db, dni)
         
-        return generar_pdf_turnos_por_persona(persona, turnos)
+        return await pool_pdf.generar("generar_pdf_turnos_por_persona", persona, turnos, renderizador=renderizador)
     except HTTPException:
         raise
     except Exception as e:
@@ -499,7 +663,7 @@ def obtener_pdf_turnos_por_persona(dni: str, db = Depends(get_db)):
 
 
 @app.get("/reportes/pdf/turnos-cancelados")
-def obtener_pdf_personas_con_cancelaciones(min: int = MIN_CANCELADOS_DEFAULT, db = Depends(get_db)):
+async def obtener_pdf_personas_con_cancelaciones(min: int = MIN_CANCELADOS_DEFAULT, renderizador: Optional[Literal["borb", "rapido"]] = None, db = Depends(get_db)):
     try:
         if min < 1:
             raise HTTPException(
@@ -507,9 +671,9 @@ def obtener_pdf_personas_con_cancelaciones(min: int = MIN_CANCELADOS_DEFAULT, db
                 detail="El número mínimo de turnos cancelados debe ser al menos 1"
             )
         
-        turnos_con_minimo_cancelaciones = obtener_personas_con_turnos_cancelados(db, min)
+        turnos_con_minimo_cancelaciones = await obtener_filas_pdf_personas_con_cancelaciones_async(db, min)
         
-        return generar_pdf_personas_con_cancelaciones(min, turnos_con_minimo_cancelaciones)
+        return await pool_pdf.generar("generar_pdf_personas_con_cancelaciones", min, turnos_con_minimo_cancelaciones, renderizador=renderizador)
     except HTTPException:
         raise
     except Exception:
@@ -517,7 +681,7 @@ def obtener_pdf_personas_con_cancelaciones(min: int = MIN_CANCELADOS_DEFAULT, db
 
 
 @app.get("/reportes/pdf/turnos-confirmados")
-def obtener_pdf_turnos_confirmados(desde: str, hasta: str, db = Depends(get_db)):
+async def obtener_pdf_turnos_confirmados(desde: str, hasta: str, renderizador: Optional[Literal["borb", "rapido"]] = None, db = Depends(get_db)):
     try:
         validar_formato_fecha(desde)
         validar_formato_fecha(hasta)
@@ -525,9 +689,9 @@ def obtener_pdf_turnos_confirmados(desde: str, hasta: str, db = Depends(get_db))
         fecha_desde = date.fromisoformat(desde)
         fecha_hasta = date.fromisoformat(hasta)
         
-        turnos_confirmados = obtener_todos_turnos_confirmados_por_periodo(db, fecha_desde, fecha_hasta)
+        turnos_confirmados = await obtener_filas_pdf_turnos_confirmados_async(db, fecha_desde, fecha_hasta)
         
-        return generar_pdf_turnos_confirmados(fecha_desde, fecha_hasta, turnos_confirmados)
+        return await pool_pdf.generar("generar_pdf_turnos_confirmados", fecha_desde, fecha_hasta, turnos_confirmados, renderizador=renderizador)
     except HTTPException:
         raise
     except Exception:
@@ -535,77 +699,79 @@ def obtener_pdf_turnos_confirmados(desde: str, hasta: str, db = Depends(get_db))
 
 
 @app.get("/reportes/pdf/estado-personas")
-def obtener_pdf_estado_personas(habilitado: bool, db = Depends(get_db)):
+async def obtener_pdf_estado_personas(habilitado: bool, renderizador: Optional[Literal["borb", "rapido"]] = None, db = Depends(get_db)):
     try:
-        personas = obtener_personas_por_estado(db, habilitado)
+        personas = await obtener_filas_pdf_estado_personas_async(db, habilitado)
         
-        return generar_pdf_estado_personas(habilitado, personas)
+        return await pool_pdf.generar("generar_pdf_estado_personas", habilitado, personas, renderizador=renderizador)
     except HTTPException:
         raise
     except Exception:
         raise HTTPException(status_code=500, detail="Error al generar el PDF")
 
 
-# ========================== Endpoints Reportes CSV ==========================
+# ========================== Endpoints Reportes CSV, NDJSON y Parquet ==========================
+# Los tres formatos recorren la misma consulta con un cursor (iterar_consulta) y se transmiten
+# a medida que se generan; NDJSON y Parquet conservan los tipos de las columnas
 
-@app.get("/reportes/csv/turnos-por-fecha")
-def obtener_csv_turnos_por_fecha(fecha: str, db = Depends(get_db)):
+def transmitir_exportacion(formato: str, generar_csv, generar_reporte_tipado, *args):
+    if formato == "csv":
+        return generar_csv(*args)
+    return transmitir_reporte_tipado(formato, generar_reporte_tipado(*args))
+
+
+async def exportar_turnos_por_fecha(formato: str, fecha: str, db):
     try:
         validar_formato_fecha(fecha)
         fecha_date = date.fromisoformat(fecha)
         
-        turnos = obtener_turnos_por_fecha(db, fecha_date)
-        
-        return generar_csv_turnos_por_fecha(fecha_date, turnos)
+        return transmitir_exportacion(formato, generar_csv_turnos_por_fecha, reporte_turnos_por_fecha,
+                                      fecha_date, iterar_consulta(consulta_turnos_por_fecha, fecha_date))
     except HTTPException:
         raise
     except Exception:
-        raise HTTPException(status_code=500, detail="Error al generar el CSV")
+        raise HTTPException(status_code=500, detail=f"Error al generar el {formato.upper()}")
 
 
-@app.get("/reportes/csv/turnos-cancelados-por-mes")
-def obtener_csv_turnos_cancelados_mes(db = Depends(get_db)):
+async def exportar_turnos_cancelados_mes(formato: str, db):
     try:
-        turnos_cancelados = obtener_turnos_cancelados_mes_actual(db)
         fecha_actual = date.today()
         
-        if not turnos_cancelados:
+        if not await hay_resultados_async(db, consulta_turnos_cancelados_mes_actual):
             raise HTTPException(
                 status_code=404,
                 detail=f"No hay turnos cancelados en {obtener_nombre_mes(fecha_actual)} {fecha_actual.year}"
             )
         
-        return generar_csv_turnos_cancelados_mes(
+        return transmitir_exportacion(formato, generar_csv_turnos_cancelados_mes, reporte_turnos_cancelados_mes,
             obtener_nombre_mes(fecha_actual),
             fecha_actual.year,
-            turnos_cancelados
+            iterar_consulta(consulta_turnos_cancelados_mes_actual)
         )
     except HTTPException:
         raise
     except Exception:
-        raise HTTPException(status_code=500, detail="Error al generar el CSV")
+        raise HTTPException(status_code=500, detail=f"Error al generar el {formato.upper()}")
 
 
-@app.get("/reportes/csv/turnos-por-persona")
-def obtener_csv_turnos_por_persona(dni: str, db = Depends(get_db)):
+async def exportar_turnos_por_persona(formato: str, dni: str, db):
     try:
-        persona = buscar_persona_por_dni(db, dni)
-        turnos = obtener_turnos_por_persona(db, persona.id)
+        persona = await buscar_persona_por_dni_async(db, dni)
         
-        if not turnos:
+        if not await hay_resultados_async(db, consulta_turnos_por_persona, persona.id):
             raise HTTPException(
                 status_code=404,
                 detail=f"La persona con DNI: {dni} no tiene turnos registrados"
             )
-        return generar_csv_turnos_por_persona(persona, turnos)
+        return transmitir_exportacion(formato, generar_csv_turnos_por_persona, reporte_turnos_por_persona,
+                                      persona, iterar_consulta(consulta_turnos_por_persona, persona.id))
     except HTTPException:
         raise
     except Exception:
-        raise HTTPException(status_code=500, detail="Error al generar el CSV")
+        raise HTTPException(status_code=500, detail=f"Error al generar el {formato.upper()}")
 
 
-@app.get("/reportes/csv/turnos-cancelados")
-def obtener_csv_personas_con_cancelaciones(min: int = MIN_CANCELADOS_DEFAULT, db = Depends(get_db)):
+async def exportar_personas_con_cancelaciones(formato: str, min: int, db):
     try:
         if min < 1:
             raise HTTPException(
@@ -613,23 +779,21 @@ def obtener_csv_personas_con_cancelaciones(min: int = MIN_CANCELADOS_DEFAULT, db
                 detail="El número mínimo de turnos cancelados debe ser al menos 1"
             )
         
-        turnos_con_minimo_cancelaciones = obtener_personas_con_turnos_cancelados(db, min)
-
-        if not turnos_con_minimo_cancelaciones:
+        if not await hay_resultados_async(db, consulta_personas_con_turnos_cancelados, min):
             raise HTTPException(
                 status_code=404,
                 detail=f"No hay personas con al menos {min} turno/s cancelado/s"
             )
         
-        return generar_csv_personas_con_cancelaciones(min, turnos_con_minimo_cancelaciones)
+        return transmitir_exportacion(formato, generar_csv_personas_con_cancelaciones, reporte_personas_con_cancelaciones,
+                                      min, iterar_consulta(consulta_personas_con_turnos_cancelados, min))
     except HTTPException:
         raise
     except Exception:
-        raise HTTPException(status_code=500, detail="Error al generar el CSV")
+        raise HTTPException(status_code=500, detail=f"Error al generar el {formato.upper()}")
 
 
-@app.get("/reportes/csv/turnos-confirmados")
-def obtener_csv_turnos_confirmados(desde: str, hasta: str, db = Depends(get_db)):
+async def exportar_turnos_confirmados(formato: str, desde: str, hasta: str, db):
     try:
         validar_formato_fecha(desde)
         validar_formato_fecha(hasta)
@@ -637,34 +801,218 @@ def obtener_csv_turnos_confirmados(desde: str, hasta: str, db = Depends(get_db))
         fecha_desde = date.fromisoformat(desde)
         fecha_hasta = date.fromisoformat(hasta)
         
-        turnos_confirmados = obtener_todos_turnos_confirmados_por_periodo(db, fecha_desde, fecha_hasta)
+        validar_rango_fechas(fecha_desde, fecha_hasta)
 
-        if not turnos_confirmados:
+        if not await hay_resultados_async(db, consulta_turnos_confirmados_por_periodo, fecha_desde, fecha_hasta):
             raise HTTPException(
                 status_code=404,
                 detail=f"No hay turnos confirmados en el período especificado"
             )
         
-        return generar_csv_turnos_confirmados(fecha_desde, fecha_hasta, turnos_confirmados)
+        return transmitir_exportacion(formato, generar_csv_turnos_confirmados, reporte_turnos_confirmados,
+                                      fecha_desde, fecha_hasta,
+                                      iterar_consulta(consulta_turnos_confirmados_por_periodo, fecha_desde, fecha_hasta))
     except HTTPException:
         raise
     except Exception:
-        raise HTTPException(status_code=500, detail="Error al generar el CSV")
+        raise HTTPException(status_code=500, detail=f"Error al generar el {formato.upper()}")
 
 
-@app.get("/reportes/csv/estado-personas")
-def obtener_csv_estado_personas(habilitado: bool, db = Depends(get_db)):
+async def exportar_estado_personas(formato: str, habilitado: bool, db):
     try:
-        personas = obtener_personas_por_estado(db, habilitado)
-
-        if not personas:
+        if not await hay_resultados_async(db, consulta_personas_por_estado, habilitado):
             raise HTTPException(
                 status_code=404,
                 detail=f"No hay personas con el estado habilitado={habilitado}"
             )
         
-        return generar_csv_estado_personas(habilitado, personas)
+        return transmitir_exportacion(formato, generar_csv_estado_personas, reporte_estado_personas,
+                                      habilitado, iterar_consulta(consulta_personas_por_estado, habilitado))
     except HTTPException:
         raise
     except Exception:
-        raise HTTPException(status_code=500, detail="Error al generar el CSV")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error al generar el {formato.upper()}")
+
+
+@app.get("/reportes/csv/turnos-por-fecha")
+async def obtener_csv_turnos_por_fecha(fecha: str, db = Depends(get_db)):
+    return await exportar_turnos_por_fecha("csv", fecha, db)
+
+
+@app.get("/reportes/csv/turnos-cancelados-por-mes")
+async def obtener_csv_turnos_cancelados_mes(db = Depends(get_db)):
+    return await exportar_turnos_cancelados_mes("csv", db)
+
+
+@app.get("/reportes/csv/turnos-por-persona")
+async def obtener_csv_turnos_por_persona(dni: str, db = Depends(get_db)):
+    return await exportar_turnos_por_persona("csv", dni, db)
+
+
+@app.get("/reportes/csv/turnos-cancelados")
+async def obtener_csv_personas_con_cancelaciones(min: int = MIN_CANCELADOS_DEFAULT, db = Depends(get_db)):
+    return await exportar_personas_con_cancelaciones("csv", min, db)
+
+
+@app.get("/reportes/csv/turnos-confirmados")
+async def obtener_csv_turnos_confirmados(desde: str, hasta: str, db = Depends(get_db)):
+    return await exportar_turnos_confirmados("csv", desde, hasta, db)
+
+
+@app.get("/reportes/csv/estado-personas")
+async def obtener_csv_estado_personas(habilitado: bool, db = Depends(get_db)):
+    return await exportar_estado_personas("csv", habilitado, db)
+
+
+@app.get("/reportes/ndjson/turnos-por-fecha")
+async def obtener_ndjson_turnos_por_fecha(fecha: str, db = Depends(get_db)):
+    return await exportar_turnos_por_fecha(FORMATO_NDJSON, fecha, db)
+
+
+@app.get("/reportes/ndjson/turnos-cancelados-por-mes")
+async def obtener_ndjson_turnos_cancelados_mes(db = Depends(get_db)):
+    return await exportar_turnos_cancelados_mes(FORMATO_NDJSON, db)
+
+
+@app.get("/reportes/ndjson/turnos-por-persona")
+async def obtener_ndjson_turnos_por_persona(dni: str, db = Depends(get_db)):
+    return await exportar_turnos_por_persona(FORMATO_NDJSON, dni, db)
+
+
+@app.get("/reportes/ndjson/turnos-cancelados")
+async def obtener_ndjson_personas_con_cancelaciones(min: int = MIN_CANCELADOS_DEFAULT, db = Depends(get_db)):
+    return await exportar_personas_con_cancelaciones(FORMATO_NDJSON, min, db)
+
+
+@app.get("/reportes/ndjson/turnos-confirmados")
+async def obtener_ndjson_turnos_confirmados(desde: str, hasta: str, db = Depends(get_db)):
+    return await exportar_turnos_confirmados(FORMATO_NDJSON, desde, hasta, db)
+
+
+@app.get("/reportes/ndjson/estado-personas")
+async def obtener_ndjson_estado_personas(habilitado: bool, db = Depends(get_db)):
+    return await exportar_estado_personas(FORMATO_NDJSON, habilitado, db)
+
+
+@app.get("/reportes/parquet/turnos-por-fecha")
+async def obtener_parquet_turnos_por_fecha(fecha: str, db = Depends(get_db)):
+    return await exportar_turnos_por_fecha(FORMATO_PARQUET, fecha, db)
+
+
+@app.get("/reportes/parquet/turnos-cancelados-por-mes")
+async def obtener_parquet_turnos_cancelados_mes(db = Depends(get_db)):
+    return await exportar_turnos_cancelados_mes(FORMATO_PARQUET, db)
+
+
+@app.get("/reportes/parquet/turnos-por-persona")
+async def obtener_parquet_turnos_por_persona(dni: str, db = Depends(get_db)):
+    return await exportar_turnos_por_persona(FORMATO_PARQUET, dni, db)
+
+
+@app.get("/reportes/parquet/turnos-cancelados")
+async def obtener_parquet_personas_con_cancelaciones(min: int = MIN_CANCELADOS_DEFAULT, db = Depends(get_db)):
+    return await exportar_personas_con_cancelaciones(FORMATO_PARQUET, min, db)
+
+
+@app.get("/reportes/parquet/turnos-confirmados")
+async def obtener_parquet_turnos_confirmados(desde: str, hasta: str, db = Depends(get_db)):
+    return await exportar_turnos_confirmados(FORMATO_PARQUET, desde, hasta, db)
+
+
+@app.get("/reportes/parquet/estado-personas")
+async def obtener_parquet_estado_personas(habilitado: bool, db = Depends(get_db)):
+    return await exportar_estado_personas(FORMATO_PARQUET, habilitado, db)
+
+
+# ========================== Reportes en segundo plano ==========================
+
+# Reportes que se pueden pedir por POST /reportes/jobs: los mismos endpoints PDF, CSV, NDJSON y Parquet
+REPORTES_TRABAJOS = {
+    "pdf": {
+        "turnos-por-fecha": obtener_pdf_turnos_por_fecha,
+        "turnos-cancelados-por-mes": obtener_pdf_turnos_cancelados_mes,
+        "turnos-por-persona": obtener_pdf_turnos_por_persona,
+        "turnos-cancelados": obtener_pdf_personas_con_cancelaciones,
+        "turnos-confirmados": obtener_pdf_turnos_confirmados,
+        "estado-personas": obtener_pdf_estado_personas,
+    },
+    "csv": {
+        "turnos-por-fecha": obtener_csv_turnos_por_fecha,
+        "turnos-cancelados-por-mes": obtener_csv_turnos_cancelados_mes,
+        "turnos-por-persona": obtener_csv_turnos_por_persona,
+        "turnos-cancelados": obtener_csv_personas_con_cancelaciones,
+        "turnos-confirmados": obtener_csv_turnos_confirmados,
+        "estado-personas": obtener_csv_estado_personas,
+    },
+    "ndjson": {
+        "turnos-por-fecha": obtener_ndjson_turnos_por_fecha,
+        "turnos-cancelados-por-mes": obtener_ndjson_turnos_cancelados_mes,
+        "turnos-por-persona": obtener_ndjson_turnos_por_persona,
+        "turnos-cancelados": obtener_ndjson_personas_con_cancelaciones,
+        "turnos-confirmados": obtener_ndjson_turnos_confirmados,
+        "estado-personas": obtener_ndjson_estado_personas,
+    },
+    "parquet": {
+        "turnos-por-fecha": obtener_parquet_turnos_por_fecha,
+        "turnos-cancelados-por-mes": obtener_parquet_turnos_cancelados_mes,
+        "turnos-por-persona": obtener_parquet_turnos_por_persona,
+        "turnos-cancelados": obtener_parquet_personas_con_cancelaciones,
+        "turnos-confirmados": obtener_parquet_turnos_confirmados,
+        "estado-personas": obtener_parquet_estado_personas,
+    },
+}
+
+MEDIA_TYPES_TRABAJOS = {"pdf": "application/pdf", "csv": "text/csv", **MEDIA_TYPES}
+
+
+def respuesta_trabajo(trabajo: dict) -> TrabajoReporteRespuesta:
+    url_descarga = f"/reportes/jobs/{trabajo['id']}/descarga" if trabajo["estado"] == TRABAJO_TERMINADO else None
+    return TrabajoReporteRespuesta(**trabajo, url_descarga=url_descarga)
+
+
+@app.post("/reportes/jobs", response_model=TrabajoReporteRespuesta, status_code=202)
+async def crear_trabajo_reporte(trabajo: trabajo_reporte_base):
+    endpoint = REPORTES_TRABAJOS[trabajo.formato][trabajo.reporte]
+    parametros = trabajo.parametros.model_dump(exclude_none=True)
+    
+    # Se validan los parámetros contra los del endpoint equivalente antes de encolar el trabajo
+    firma = signature(endpoint).parameters
+    faltantes = [nombre for nombre, parametro in firma.items()
+                 if nombre != "db" and parametro.default is Parameter.empty and nombre not in parametros]
+    if faltantes:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Faltan parámetros para el reporte {trabajo.reporte}: {', '.join(faltantes)}"
+        )
+    argumentos = {nombre: valor for nombre, valor in parametros.items() if nombre in firma}
+    
+    async def generar():
+        async with abrir_sesion() as db:
+            return await endpoint(db=db, **argumentos)
+    
+    await run_in_threadpool(trabajos_reportes.limpiar_vencidos)
+    return respuesta_trabajo(trabajos_reportes.crear(trabajo.formato, trabajo.reporte, generar))
+
+
+@app.get("/reportes/jobs/{id_trabajo}", response_model=TrabajoReporteRespuesta)
+async def obtener_trabajo_reporte(id_trabajo: str):
+    trabajo = await run_in_threadpool(trabajos_reportes.obtener, id_trabajo)
+    if trabajo is None:
+        raise HTTPException(status_code=404, detail="Reporte no encontrado o vencido")
+    return respuesta_trabajo(trabajo)
+
+
+@app.get("/reportes/jobs/{id_trabajo}/descarga")
+async def descargar_trabajo_reporte(id_trabajo: str):
+    trabajo = await run_in_threadpool(trabajos_reportes.obtener, id_trabajo)
+    if trabajo is None:
+        raise HTTPException(status_code=404, detail="Reporte no encontrado o vencido")
+    if trabajo["estado"] != TRABAJO_TERMINADO:
+        raise HTTPException(status_code=409, detail=f"El reporte no está disponible (estado: {trabajo['estado']})")
+    
+    # FileResponse responde Range / If-Range (206) para retomar descargas cortadas
+    return FileResponse(
+        trabajos_reportes.ruta_resultado(trabajo),
+        media_type=MEDIA_TYPES_TRABAJOS[trabajo["formato"]],
+        filename=trabajo["filename"]
+    )
@@ -1,8 +1,9 @@
-from sqlalchemy import Integer, String, Boolean, Date, Time, ForeignKey
+from sqlalchemy import Integer, String, Boolean, Date, Time, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import date, time
 
 from .database import Base
+from .config import ESTADO_CANCELADO
 
 
 class Persona(Base):
@@ -14,12 +15,23 @@ class Persona(Base):
     dni: Mapped[str] = mapped_column(String(20), unique=True, nullable=False)
     telefono: Mapped[str] = mapped_column(String(20), unique=True, nullable=False)
     fecha_nacimiento: Mapped[date] = mapped_column(Date, nullable=False)
-    habilitado: Mapped[bool] = mapped_column(Boolean, default=True)
+    habilitado: Mapped[bool] = mapped_column(Boolean, default=True, index=True)
     
     turnos = relationship("Turno", back_populates="persona")
 
 class Turno(Base):
     __tablename__ = "turnos"
+    __table_args__ = (
+        # Disponibilidad y reporte por fecha: fecha exacta + filtro de estado
+        Index("ix_turnos_fecha_estado", "fecha", "estado"),
+        # Reportes por estado en un período (cancelados del mes, confirmados ordenados por fecha y hora)
+        Index("ix_turnos_estado_fecha_hora", "estado", "fecha", "hora"),
+        # Conteo de cancelaciones recientes y turnos de una persona
+        Index("ix_turnos_persona_estado_fecha", "persona_id", "estado", "fecha"),
+        # Un solo turno activo (no cancelado) por horario: evita reservas dobles concurrentes
+        Index("ux_turnos_fecha_hora_activos", "fecha", "hora", unique=True,
+              sqlite_where=text(f"estado != '{ESTADO_CANCELADO}'")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     persona_id: Mapped[int] = mapped_column(Integer, ForeignKey("personas.id"), nullable=False)
@@ -28,3 +40,23 @@ class Turno(Base):
     hora: Mapped[time] = mapped_column(Time, nullable=False)
     estado: Mapped[str] = mapped_column(String(20), nullable=False, default="pendiente")
 
+
+
+class CancelacionDiaria(Base):
+    # Turnos cancelados por persona y fecha del turno; se mantiene en la misma transacción que el cambio de estado
+    __tablename__ = "cancelaciones_diarias"
+
+    persona_id: Mapped[int] = mapped_column(Integer, ForeignKey("personas.id"), primary_key=True)
+    fecha: Mapped[date] = mapped_column(Date, primary_key=True)
+    cantidad: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class TurnoDiario(Base):
+    # Turnos por fecha, hora y estado; se mantiene en la misma transacción que cada cambio de turno.
+    # Sumando las horas se obtiene fecha × estado y sumando los estados, fecha × hora
+    __tablename__ = "turnos_diarios"
+
+    fecha: Mapped[date] = mapped_column(Date, primary_key=True)
+    hora: Mapped[time] = mapped_column(Time, primary_key=True)
+    estado: Mapped[str] = mapped_column(String(20), primary_key=True)
+    cantidad: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -0,0 +1,91 @@
+import threading
+import time as reloj
+from collections import OrderedDict
+from datetime import date, time
+
+from sqlalchemy.orm import Session
+
+from .models import Turno
+from .config import ESTADO_CANCELADO, HORARIOS_DISPONIBLES, OCUPACION_MAX_FECHAS, OCUPACION_TTL_SEGUNDOS
+
+
+class IndiceOcupacion:
+    # Índice en memoria de horarios ocupados por fecha: un bitmap (int) sobre la grilla de
+    # HORARIOS_DISPONIBLES, cargado desde la base la primera vez que se consulta cada fecha.
+    # Se actualiza al escribir (write-through) y se limita con LRU. Es por proceso: los cambios de
+    # otros workers se ven recién al vencer la fecha (OCUPACION_TTL_SEGUNDOS), por eso solo se usa
+    # para informar disponibilidad; las reservas las valida el índice único de la base.
+
+    def __init__(self, max_fechas: int, ttl_segundos: int):
+        self.max_fechas = max_fechas
+        self.ttl_segundos = ttl_segundos
+        self._bitmaps = OrderedDict()  # fecha -> (bitmap, momento de carga)
+        self._posiciones = {}
+        self._generacion = 0
+        self._candado = threading.Lock()
+
+    def _posicion(self, hora: time):
+        # La grilla se genera en el lifespan, así que el mapa hora -> bit se arma recién al usarlo
+        if len(self._posiciones) != len(HORARIOS_DISPONIBLES):
+            self._posiciones = {horario: posicion for posicion, horario in enumerate(HORARIOS_DISPONIBLES)}
+        return self._posiciones.get(hora)
+
+    def _vigente(self, momento_carga: float):
+        return self.ttl_segundos <= 0 or reloj.monotonic() - momento_carga < self.ttl_segundos
+
+    def obtener_bitmap(self, db: Session, fecha: date):
+        with self._candado:
+            entrada = self._bitmaps.get(fecha)
+            if entrada is not None and self._vigente(entrada[1]):
+                self._bitmaps.move_to_end(fecha)
+                return entrada[0]
+            generacion = self._generacion
+
+        horas_ocupadas = db.query(Turno.hora).filter(
+            Turno.fecha == fecha,
+            Turno.estado != ESTADO_CANCELADO
+        ).all()
+
+        bitmap = 0
+        for (hora,) in horas_ocupadas:
+            posicion = self._posicion(hora)
+            if posicion is not None:
+                bitmap |= 1 << posicion
+
+        with self._candado:
+            # Si hubo escrituras mientras se consultaba, el resultado puede estar viejo: no se guarda
+            if generacion == self._generacion:
+                self._bitmaps[fecha] = (bitmap, reloj.monotonic())
+                self._bitmaps.move_to_end(fecha)
+                while len(self._bitmaps) > self.max_fechas:
+                    self._bitmaps.popitem(last=False)
+        return bitmap
+
+    def horarios_libres(self, db: Session, fecha: date):
+        bitmap = self.obtener_bitmap(db, fecha)
+        return [hora for posicion, hora in enumerate(HORARIOS_DISPONIBLES) if not bitmap >> posicion & 1]
+
+    def _actualizar(self, fecha: date, hora: time, ocupado: bool):
+        posicion = self._posicion(hora)
+        with self._candado:
+            self._generacion += 1
+            entrada = self._bitmaps.get(fecha)
+            if entrada is None or posicion is None:
+                return
+            bitmap, momento_carga = entrada
+            bitmap = bitmap | (1 << posicion) if ocupado else bitmap & ~(1 << posicion)
+            self._bitmaps[fecha] = (bitmap, momento_carga)
+
+    def marcar_ocupado(self, fecha: date, hora: time):
+        self._actualizar(fecha, hora, True)
+
+    def liberar(self, fecha: date, hora: time):
+        self._actualizar(fecha, hora, False)
+
+    def limpiar(self):
+        with self._candado:
+            self._generacion += 1
+            self._bitmaps.clear()
+
+
+indice_ocupacion = IndiceOcupacion(OCUPACION_MAX_FECHAS, OCUPACION_TTL_SEGUNDOS)
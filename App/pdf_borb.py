@@ -0,0 +1,311 @@
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+from io import BytesIO
+from decimal import Decimal
+from statistics import median
+
+from borb.pdf import Document, Page, PageLayout, SingleColumnLayout, Paragraph, PDF, FixedColumnWidthTable, LayoutElement, HexColor
+from borb.pdf.font.font import Font
+from borb.pdf.font.simple_font.standard_14_fonts import Standard14Fonts
+
+from .reportes_pdf import Celda, Estilo, RenderizadorPdf, ESTILO_DATO
+from .config import (
+    FORMATO_FECHA_GENERACION, TITULO_SISTEMA,
+    PDF_BORDER_DELGADO, PDF_BORDER_GRUESO, PDF_BORDER_MEDIO,
+    PDF_COLOR_PRIMARIO, PDF_COLOR_SECUNDARIO, PDF_COLOR_TEXTO_GRIS, PDF_COLOR_TEXTO_GRIS_CLARO,
+    PDF_FONT_BOLD, PDF_FONT_NORMAL, PDF_FONTSIZE_DATO, PDF_FONTSIZE_NORMAL, PDF_FONTSIZE_PEQUENO,
+    PDF_FONTSIZE_TITULO, PDF_PADDING_GRANDE, PDF_PADDING_MEDIO,
+    PDF_PADDING_MUY_GRANDE, PDF_PADDING_NORMAL, PDF_PADDING_PEQUENO
+)
+
+
+# ==================== Utilidades ====================
+
+# Una sola instancia por fuente: borb crea una por celda si recibe el nombre, y cada página
+# terminaba con sus propios objetos de fuente (más memoria y más objetos al escribir el PDF)
+_fuentes = {}
+
+
+def obtener_fuente(nombre: str) -> Font:
+    if nombre not in _fuentes:
+        _fuentes[nombre] = Standard14Fonts.get(nombre)
+    return _fuentes[nombre]
+
+
+def crear_paragraph(texto: str, **propiedades) -> Paragraph:
+    defaults = {
+        'font': PDF_FONT_NORMAL,
+        'font_size': PDF_FONTSIZE_DATO,
+        'padding_top': Decimal(PDF_PADDING_PEQUENO),
+        'padding_bottom': Decimal(PDF_PADDING_PEQUENO),
+        'padding_left': Decimal(PDF_PADDING_PEQUENO),
+        'padding_right': Decimal(PDF_PADDING_PEQUENO)
+    }
+    defaults.update(propiedades)
+    defaults['font'] = obtener_fuente(defaults['font'])
+    return Paragraph(texto, **defaults)
+
+
+def crear_espacio() -> Paragraph:
+    return Paragraph(" ", font=obtener_fuente(PDF_FONT_NORMAL))
+
+
+def crear_celda_header(texto: str) -> Paragraph:
+    return crear_paragraph(
+        texto,
+        font=PDF_FONT_BOLD,
+        font_color=HexColor(PDF_COLOR_PRIMARIO),
+        padding_top=Decimal(PDF_PADDING_NORMAL),
+        padding_bottom=Decimal(PDF_PADDING_NORMAL)
+    )
+
+
+def crear_celda(celda: Celda, padding_extra=False) -> Paragraph:
+    propiedades = {'font_size': celda.font_size or PDF_FONTSIZE_DATO}
+    if celda.negrita:
+        propiedades['font'] = PDF_FONT_BOLD
+    if celda.color:
+        propiedades['font_color'] = HexColor(celda.color)
+    if padding_extra:
+        propiedades.update({
+            'padding_top': Decimal(PDF_PADDING_GRANDE),
+            'padding_bottom': Decimal(PDF_PADDING_GRANDE),
+            'vertical_alignment': LayoutElement.VerticalAlignment.MIDDLE
+        })
+    return crear_paragraph(celda.texto, **propiedades)
+
+
+def finalizar_pdf(doc: Document, filename: str) -> tuple[bytes, str]:
+    buffer = BytesIO()
+    PDF.write(doc, buffer)
+    return buffer.getvalue(), filename
+
+
+# ==================== Creación de PDF Base ====================
+
+def crear_pdf_base(titulo: str, subtitulo: str = None) -> tuple[Document, PageLayout]:
+    doc = Document()
+    page = Page()
+    doc.append_page(page)
+    layout = SingleColumnLayout(page)
+
+    # Título del sistema
+    layout.append_layout_element(crear_paragraph(
+        TITULO_SISTEMA,
+        font=PDF_FONT_BOLD,
+        font_color=HexColor(PDF_COLOR_PRIMARIO),
+        padding_top=Decimal(PDF_PADDING_PEQUENO),
+        padding_left=Decimal(PDF_PADDING_MEDIO),
+        padding_right=Decimal(PDF_PADDING_MEDIO),
+        horizontal_alignment=LayoutElement.HorizontalAlignment.MIDDLE
+    ))
+
+    # Título del reporte
+    layout.append_layout_element(crear_paragraph(
+        titulo,
+        font=PDF_FONT_BOLD,
+        font_size=PDF_FONTSIZE_TITULO,
+        font_color=HexColor(PDF_COLOR_PRIMARIO),
+        horizontal_alignment=LayoutElement.HorizontalAlignment.MIDDLE,
+        padding_top=Decimal(PDF_PADDING_MUY_GRANDE),
+        padding_bottom=Decimal(PDF_PADDING_MEDIO)
+    ))
+
+    # Subtítulo opcional
+    if subtitulo:
+        layout.append_layout_element(crear_paragraph(
+            subtitulo,
+            font_size=PDF_FONTSIZE_NORMAL,
+            font_color=HexColor(PDF_COLOR_TEXTO_GRIS),
+            horizontal_alignment=LayoutElement.HorizontalAlignment.MIDDLE
+        ))
+
+    # Fecha de generación
+    layout.append_layout_element(crear_paragraph(
+        datetime.now().strftime(FORMATO_FECHA_GENERACION),
+        font_size=PDF_FONTSIZE_PEQUENO,
+        font_color=HexColor(PDF_COLOR_TEXTO_GRIS_CLARO),
+        horizontal_alignment=LayoutElement.HorizontalAlignment.MIDDLE,
+        padding_bottom=Decimal(PDF_PADDING_GRANDE)
+    ))
+
+    # Línea separadora
+    layout.append_layout_element(Paragraph(
+        " ",
+        font=obtener_fuente(PDF_FONT_NORMAL),
+        border_width_bottom=Decimal(PDF_BORDER_DELGADO),
+        border_color=HexColor(PDF_COLOR_SECUNDARIO),
+        padding_bottom=Decimal(PDF_PADDING_MEDIO)
+    ))
+    layout.append_layout_element(crear_espacio())
+
+    return doc, layout
+
+
+# ==================== Creación de Tablas ====================
+# Las tablas se agregan de a bloques que entran en una página, cada uno con sus encabezados.
+# El layout pasa solo a una página nueva cuando un bloque no entra en la actual, y cada bloque
+# se dibuja y se descarta antes de armar el siguiente: el árbol de layout en memoria queda
+# acotado a una página, sin importar la cantidad de filas.
+
+MUESTRA_FILAS_POR_PAGINA = 10
+
+# forma de la tabla (columnas y opciones) -> filas de datos que entran en una página
+_filas_por_pagina = {}
+
+
+def obtener_caches_layout() -> list:
+    # borb memoiza get_size (y otros cálculos de layout) con functools.cache a nivel de clase: esas
+    # caches guardan una referencia a cada celda dibujada y nunca se vacían, así que se limpian a mano
+    caches, clases = [], [LayoutElement]
+    while clases:
+        clase = clases.pop()
+        clases.extend(clase.__subclasses__())
+        caches.extend(valor for valor in vars(clase).values() if hasattr(valor, "cache_clear"))
+    return caches
+
+
+CACHES_LAYOUT = obtener_caches_layout()
+
+
+def liberar_elementos_dibujados() -> None:
+    for cache in CACHES_LAYOUT:
+        cache.cache_clear()
+
+
+def obtener_espacio_pagina() -> tuple[int, int]:
+    # Ancho y alto útiles de una página de SingleColumnLayout (márgenes del 10%)
+    ancho, alto = Page().get_size()
+    return ancho - 2 * int(ancho * 0.1), alto - 2 * int(alto * 0.1)
+
+
+def crear_bloque_tabla(headers: List[str], column_widths: List[Decimal], filas: list, agregar_fila: Callable) -> FixedColumnWidthTable:
+    tabla = FixedColumnWidthTable(number_of_rows=len(filas) + 1, number_of_columns=len(headers), column_widths=column_widths)
+    for header in headers:
+        tabla.append_layout_element(crear_celda_header(header))
+    for fila in filas:
+        agregar_fila(tabla, fila)
+    return tabla
+
+
+def calcular_filas_por_pagina(headers: List[str], column_widths: List[Decimal], filas: list, agregar_fila: Callable) -> int:
+    # Se mide el alto de los encabezados y la mediana del alto de una muestra de filas, para que una
+    # fila de varias líneas no achique todos los bloques (si un bloque no entra, se parte al agregarlo)
+    espacio = obtener_espacio_pagina()
+    alto_encabezados = crear_bloque_tabla(headers, column_widths, [], agregar_fila).get_size(available_space=espacio)[1]
+    altos_filas = [
+        crear_bloque_tabla(headers, column_widths, [fila], agregar_fila).get_size(available_space=espacio)[1] - alto_encabezados
+        for fila in filas[:MUESTRA_FILAS_POR_PAGINA]
+    ]
+    return max(1, int((espacio[1] - alto_encabezados) * 0.95 / median(altos_filas)))
+
+
+def agregar_bloque_tabla(layout: PageLayout, headers: List[str], column_widths: List[Decimal], filas: list, agregar_fila: Callable) -> None:
+    try:
+        layout.append_layout_element(crear_bloque_tabla(headers, column_widths, filas, agregar_fila))
+        liberar_elementos_dibujados()
+    except AssertionError:
+        # borb rechaza elementos más altos que una página (celdas de varias líneas): se parte el bloque
+        if len(filas) == 1:
+            raise
+        mitad = len(filas) // 2
+        agregar_bloque_tabla(layout, headers, column_widths, filas[:mitad], agregar_fila)
+        agregar_bloque_tabla(layout, headers, column_widths, filas[mitad:], agregar_fila)
+
+
+def agregar_tabla(layout: PageLayout, forma: tuple, headers: List[str], column_widths: List[Decimal], filas: list, agregar_fila: Callable) -> None:
+    if not filas:
+        layout.append_layout_element(crear_bloque_tabla(headers, column_widths, filas, agregar_fila))
+        return
+    if forma not in _filas_por_pagina:
+        _filas_por_pagina[forma] = calcular_filas_por_pagina(headers, column_widths, filas, agregar_fila)
+    por_pagina = _filas_por_pagina[forma]
+    for inicio in range(0, len(filas), por_pagina):
+        agregar_bloque_tabla(layout, headers, column_widths, filas[inicio:inicio + por_pagina], agregar_fila)
+
+
+# ==================== Renderizador ====================
+
+class RenderizadorBorb(RenderizadorPdf):
+    # Layout general de borb: párrafos y tablas con padding, alineación y saltos de línea
+
+    def __init__(self, titulo: str, subtitulo: Optional[str] = None):
+        self.doc, self.layout = crear_pdf_base(titulo, subtitulo)
+
+    def texto(self, texto: str, estilo: Estilo = ESTILO_DATO) -> None:
+        propiedades = {'font_size': estilo.font_size, 'padding_top': Decimal(estilo.padding_top)}
+        if estilo.negrita:
+            propiedades['font'] = PDF_FONT_BOLD
+        if estilo.color:
+            propiedades['font_color'] = HexColor(estilo.color)
+        self.layout.append_layout_element(crear_paragraph(texto, **propiedades))
+
+    def espacio(self) -> None:
+        self.layout.append_layout_element(crear_espacio())
+        liberar_elementos_dibujados()
+
+    def ficha(self, datos: List[Tuple[str, str]]) -> None:
+        info = FixedColumnWidthTable(number_of_rows=len(datos), number_of_columns=2, column_widths=[Decimal(0.20), Decimal(0.80)])
+        for label, valor in datos:
+            info.append_layout_element(crear_paragraph(
+                label,
+                font=PDF_FONT_BOLD,
+                font_color=HexColor(PDF_COLOR_SECUNDARIO),
+                padding_left=Decimal(PDF_PADDING_MUY_GRANDE),
+                padding_top=Decimal(2),
+                padding_bottom=Decimal(2)
+            ))
+            info.append_layout_element(crear_paragraph(
+                valor,
+                padding_left=Decimal(PDF_PADDING_MUY_GRANDE),
+                padding_top=Decimal(2),
+                padding_bottom=Decimal(2)
+            ))
+        info.no_borders()
+        self.layout.append_layout_element(info)
+
+    def destacado(self, texto: str, color: str) -> None:
+        self.layout.append_layout_element(crear_paragraph(
+            texto,
+            font=PDF_FONT_BOLD,
+            font_size=PDF_FONTSIZE_NORMAL,
+            font_color=HexColor(color),
+            border_width_left=Decimal(PDF_BORDER_GRUESO),
+            border_color=HexColor(color),
+            padding_top=Decimal(6),
+            padding_bottom=Decimal(6),
+            padding_left=Decimal(PDF_PADDING_MUY_GRANDE),
+            padding_right=Decimal(PDF_PADDING_MUY_GRANDE),
+            horizontal_alignment=LayoutElement.HorizontalAlignment.MIDDLE
+        ))
+
+    def resumen(self, valores: List[Tuple[str, int, str]]) -> None:
+        stats_tabla = FixedColumnWidthTable(number_of_rows=1, number_of_columns=len(valores))
+        for label, valor, color in valores:
+            stats_tabla.append_layout_element(crear_paragraph(
+                f"{label}\n{valor}",
+                font=PDF_FONT_BOLD,
+                font_size=PDF_FONTSIZE_NORMAL,
+                font_color=HexColor(color),
+                border_width_left=Decimal(PDF_BORDER_MEDIO),
+                border_color=HexColor(color),
+                padding_top=Decimal(PDF_PADDING_GRANDE),
+                padding_bottom=Decimal(PDF_PADDING_GRANDE),
+                padding_left=Decimal(PDF_PADDING_GRANDE),
+                padding_right=Decimal(PDF_PADDING_GRANDE),
+                horizontal_alignment=LayoutElement.HorizontalAlignment.MIDDLE
+            ))
+        stats_tabla.no_borders()
+        self.layout.append_layout_element(stats_tabla)
+
+    def tabla(self, headers: List[str], column_widths: List[float], filas: list,
+              celdas: Callable[[Any], List[Celda]], espaciado: bool = False) -> None:
+        def agregar_fila(tabla: FixedColumnWidthTable, fila) -> None:
+            for celda in celdas(fila):
+                tabla.append_layout_element(crear_celda(celda, padding_extra=espaciado))
+
+        agregar_tabla(self.layout, (tuple(headers), espaciado), headers,
+                      [Decimal(ancho) for ancho in column_widths], filas, agregar_fila)
+
+    def finalizar(self, filename: str) -> tuple[bytes, str]:
+        return finalizar_pdf(self.doc, filename)
@@ -0,0 +1,321 @@
+import unicodedata
+import zlib
+from datetime import datetime
+from io import BytesIO
+from typing import Any, Callable, List, Optional, Tuple
+
+from .reportes_pdf import Celda, Estilo, RenderizadorPdf, ESTILO_DATO
+from .config import (
+    FORMATO_FECHA_GENERACION, TITULO_SISTEMA,
+    PDF_BORDER_DELGADO, PDF_BORDER_GRUESO, PDF_BORDER_MEDIO,
+    PDF_COLOR_PRIMARIO, PDF_COLOR_SECUNDARIO, PDF_COLOR_TEXTO_GRIS, PDF_COLOR_TEXTO_GRIS_CLARO,
+    PDF_FONT_BOLD, PDF_FONT_NORMAL, PDF_FONTSIZE_DATO, PDF_FONTSIZE_NORMAL, PDF_FONTSIZE_PEQUENO,
+    PDF_FONTSIZE_TITULO, PDF_PADDING_GRANDE, PDF_PADDING_MEDIO,
+    PDF_PADDING_MUY_GRANDE, PDF_PADDING_NORMAL, PDF_PADDING_PEQUENO
+)
+
+
+# Escribe el PDF directamente: texto con las fuentes estándar (sin embeber), tablas en una grilla
+# fija de columnas (el texto que no entra sigue en más líneas y la fila se agranda, como en borb) y
+# cada página se comprime y se vuelca a la salida apenas se completa. No hay objetos por celda ni
+# layout que medir: el ancho del texto sale de las métricas de las fuentes.
+
+# A4 con márgenes del 10%, igual que SingleColumnLayout de borb
+ANCHO_PAGINA, ALTO_PAGINA = 595, 842
+MARGEN_X, MARGEN_Y = int(ANCHO_PAGINA * 0.1), int(ALTO_PAGINA * 0.1)
+ANCHO_UTIL = ANCHO_PAGINA - 2 * MARGEN_X
+
+INTERLINEADO = 1.2
+ALTO_ESPACIO = 14
+
+# Ancho en milésimas del tamaño de letra de los caracteres 32 a 126 (métricas AFM de Helvetica).
+# Las letras con tilde miden lo mismo que la letra base; el resto se mide como "?".
+ANCHOS_NORMAL = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278, 556, 556, 556, 556,
+    556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556, 1015, 667, 667, 722, 722, 667, 611, 778,
+    722, 278, 500, 667, 556, 833, 722, 778, 667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278,
+    278, 278, 469, 556, 333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584
+]
+ANCHOS_BOLD = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278, 556, 556, 556, 556,
+    556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611, 975, 722, 722, 722, 722, 667, 611, 778,
+    722, 278, 556, 722, 611, 833, 722, 778, 667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333,
+    278, 333, 584, 556, 333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584
+]
+
+# Nombre del recurso en la página -> fuente estándar
+FUENTE_NORMAL, FUENTE_BOLD = "F1", "F2"
+
+ESCAPES = str.maketrans({"\\": "\\\\", "(": "\\(", ")": "\\)", "\r": " ", "\n": " "})
+
+# Los objetos 1 a 4 son fijos; las páginas y sus contenidos se numeran desde 5
+ID_CATALOGO, ID_PAGINAS, ID_FUENTE_NORMAL, ID_FUENTE_BOLD = 1, 2, 3, 4
+
+
+# ==================== Utilidades ====================
+
+_anchos_caracteres = {False: {}, True: {}}
+_colores = {}
+
+
+def ancho_caracter(caracter: str, negrita: bool) -> int:
+    anchos = _anchos_caracteres[negrita]
+    if caracter not in anchos:
+        tabla = ANCHOS_BOLD if negrita else ANCHOS_NORMAL
+        base = ord(unicodedata.normalize("NFD", caracter)[0])
+        anchos[caracter] = tabla[base - 32] if 32 <= base <= 126 else tabla[ord("?") - 32]
+    return anchos[caracter]
+
+
+def medir_texto(texto: str, negrita: bool, font_size: float) -> float:
+    return sum(ancho_caracter(caracter, negrita) for caracter in texto) * font_size / 1000
+
+
+def partir_texto(texto: str, negrita: bool, font_size: float, ancho: float) -> List[str]:
+    # Líneas del texto que entran en el ancho: corta entre palabras y, si una palabra sola no entra, entre caracteres
+    if medir_texto(texto, negrita, font_size) <= ancho:
+        return [texto]
+    disponible = ancho * 1000 / font_size
+    ancho_espacio = ancho_caracter(" ", negrita)
+    lineas = []
+    linea, usado = "", 0
+    for palabra in texto.split(" "):
+        ancho_palabra = sum(ancho_caracter(caracter, negrita) for caracter in palabra)
+        separacion = ancho_espacio if linea else 0
+        if usado + separacion + ancho_palabra <= disponible:
+            linea = f"{linea} {palabra}" if linea else palabra
+            usado += separacion + ancho_palabra
+            continue
+        if linea:
+            lineas.append(linea)
+        linea, usado = "", 0
+        for caracter in palabra:
+            ancho_letra = ancho_caracter(caracter, negrita)
+            if linea and usado + ancho_letra > disponible:
+                lineas.append(linea)
+                linea, usado = "", 0
+            linea += caracter
+            usado += ancho_letra
+    lineas.append(linea)
+    return lineas
+
+
+def cadena_pdf(texto: str) -> str:
+    # WinAnsiEncoding (cp1252); lo que no se puede representar queda como "?"
+    return "(" + texto.encode("cp1252", "replace").decode("latin-1").translate(ESCAPES) + ")"
+
+
+def color_pdf(color: Optional[str]) -> str:
+    # "#RRGGBB" -> "r g b" entre 0 y 1; sin color, negro
+    if color not in _colores:
+        valor = (color or "#000000").lstrip("#")
+        _colores[color] = " ".join(f"{int(valor[i:i + 2], 16) / 255:.3f}" for i in (0, 2, 4))
+    return _colores[color]
+
+
+# ==================== Renderizador ====================
+
+class RenderizadorRapido(RenderizadorPdf):
+
+    def __init__(self, titulo: str, subtitulo: Optional[str] = None):
+        self._salida = BytesIO()
+        self._salida.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._posiciones = {}
+        self._paginas = []
+        self._siguiente_id = ID_FUENTE_BOLD + 1
+        self._operaciones = []
+        self._y = ALTO_PAGINA - MARGEN_Y
+
+        self._linea(TITULO_SISTEMA, True, PDF_FONTSIZE_DATO, PDF_COLOR_PRIMARIO, centrado=True)
+        self._linea(titulo, True, PDF_FONTSIZE_TITULO, PDF_COLOR_PRIMARIO, centrado=True,
+                    padding_top=PDF_PADDING_MUY_GRANDE, padding_bottom=PDF_PADDING_MEDIO)
+        if subtitulo:
+            self._linea(subtitulo, False, PDF_FONTSIZE_NORMAL, PDF_COLOR_TEXTO_GRIS, centrado=True)
+        self._linea(datetime.now().strftime(FORMATO_FECHA_GENERACION), False, PDF_FONTSIZE_PEQUENO,
+                    PDF_COLOR_TEXTO_GRIS_CLARO, centrado=True, padding_bottom=PDF_PADDING_GRANDE)
+
+        # Línea separadora
+        self._y -= PDF_PADDING_MEDIO
+        self._operaciones.append(f"{PDF_BORDER_DELGADO} w {color_pdf(PDF_COLOR_SECUNDARIO)} RG "
+                                 f"{MARGEN_X} {self._y:.2f} m {MARGEN_X + ANCHO_UTIL} {self._y:.2f} l S")
+        self.espacio()
+
+    # ---------- Páginas y objetos ----------
+
+    def _nuevo_id(self) -> int:
+        self._siguiente_id += 1
+        return self._siguiente_id - 1
+
+    def _escribir_objeto(self, id_objeto: int, contenido: bytes) -> None:
+        self._posiciones[id_objeto] = self._salida.tell()
+        self._salida.write(b"%d 0 obj\n%s\nendobj\n" % (id_objeto, contenido))
+
+    def _cerrar_pagina(self) -> None:
+        contenido = zlib.compress("\n".join(self._operaciones).encode("latin-1"))
+        id_contenido, id_pagina = self._nuevo_id(), self._nuevo_id()
+        self._escribir_objeto(id_contenido, b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream"
+                              % (len(contenido), contenido))
+        self._escribir_objeto(id_pagina, (
+            f"<< /Type /Page /Parent {ID_PAGINAS} 0 R /MediaBox [0 0 {ANCHO_PAGINA} {ALTO_PAGINA}] "
+            f"/Resources << /Font << /{FUENTE_NORMAL} {ID_FUENTE_NORMAL} 0 R /{FUENTE_BOLD} {ID_FUENTE_BOLD} 0 R >> >> "
+            f"/Contents {id_contenido} 0 R >>"
+        ).encode("latin-1"))
+        self._paginas.append(id_pagina)
+        self._operaciones = []
+        self._y = ALTO_PAGINA - MARGEN_Y
+
+    def _reservar(self, alto: float) -> bool:
+        # Pasa a una página nueva si el alto no entra en la actual; indica si hubo salto
+        if self._y - alto >= MARGEN_Y:
+            return False
+        self._cerrar_pagina()
+        return True
+
+    # ---------- Dibujo ----------
+
+    def _texto(self, texto: str, x: float, y: float, negrita: bool, font_size: float, color: Optional[str]) -> None:
+        fuente = FUENTE_BOLD if negrita else FUENTE_NORMAL
+        self._operaciones.append(
+            f"BT /{fuente} {font_size} Tf {color_pdf(color)} rg {x:.2f} {y:.2f} Td {cadena_pdf(texto)} Tj ET"
+        )
+
+    def _barra(self, x: float, y: float, ancho: float, alto: float, color: str) -> None:
+        self._operaciones.append(f"{color_pdf(color)} rg {x:.2f} {y:.2f} {ancho:.2f} {alto:.2f} re f")
+
+    def _linea(self, texto: str, negrita: bool, font_size: float, color: Optional[str], centrado: bool = False,
+               padding_top: int = PDF_PADDING_PEQUENO, padding_bottom: int = PDF_PADDING_PEQUENO) -> None:
+        lineas = partir_texto(texto, negrita, font_size, ANCHO_UTIL - 2 * PDF_PADDING_PEQUENO)
+        alto_linea = font_size * INTERLINEADO
+        self._reservar(padding_top + len(lineas) * alto_linea + padding_bottom)
+        for numero, linea in enumerate(lineas):
+            if centrado:
+                x = MARGEN_X + (ANCHO_UTIL - medir_texto(linea, negrita, font_size)) / 2
+            else:
+                x = MARGEN_X + PDF_PADDING_PEQUENO
+            self._texto(linea, x, self._y - padding_top - font_size - numero * alto_linea, negrita, font_size, color)
+        self._y -= padding_top + len(lineas) * alto_linea + padding_bottom
+
+    # ---------- Interfaz ----------
+
+    def texto(self, texto: str, estilo: Estilo = ESTILO_DATO) -> None:
+        self._linea(texto, estilo.negrita, estilo.font_size, estilo.color, padding_top=estilo.padding_top)
+
+    def espacio(self) -> None:
+        if not self._reservar(ALTO_ESPACIO):
+            self._y -= ALTO_ESPACIO
+
+    def ficha(self, datos: List[Tuple[str, str]]) -> None:
+        alto_linea = PDF_FONTSIZE_DATO * INTERLINEADO
+        x_valor = MARGEN_X + ANCHO_UTIL * 0.20 + PDF_PADDING_MUY_GRANDE
+        for label, valor in datos:
+            lineas = partir_texto(valor, False, PDF_FONTSIZE_DATO, MARGEN_X + ANCHO_UTIL - x_valor)
+            alto = len(lineas) * alto_linea + 4
+            self._reservar(alto)
+            y = self._y - 2 - PDF_FONTSIZE_DATO
+            self._texto(label, MARGEN_X + PDF_PADDING_MUY_GRANDE, y, True, PDF_FONTSIZE_DATO, PDF_COLOR_SECUNDARIO)
+            for numero, linea in enumerate(lineas):
+                self._texto(linea, x_valor, y - numero * alto_linea, False, PDF_FONTSIZE_DATO, None)
+            self._y -= alto
+
+    def destacado(self, texto: str, color: str) -> None:
+        alto = PDF_FONTSIZE_NORMAL * INTERLINEADO + 12
+        self._reservar(alto)
+        ancho = medir_texto(texto, True, PDF_FONTSIZE_NORMAL)
+        x = MARGEN_X + (ANCHO_UTIL - ancho) / 2
+        self._barra(x - PDF_PADDING_MUY_GRANDE, self._y - alto, PDF_BORDER_GRUESO, alto, color)
+        self._texto(texto, x, self._y - 6 - PDF_FONTSIZE_NORMAL, True, PDF_FONTSIZE_NORMAL, color)
+        self._y -= alto
+
+    def resumen(self, valores: List[Tuple[str, int, str]]) -> None:
+        linea = PDF_FONTSIZE_NORMAL * INTERLINEADO
+        alto = 2 * linea + 2 * PDF_PADDING_GRANDE
+        self._reservar(alto)
+        ancho_columna = ANCHO_UTIL / len(valores)
+        for indice, (label, valor, color) in enumerate(valores):
+            x = MARGEN_X + indice * ancho_columna
+            self._barra(x, self._y - alto, PDF_BORDER_MEDIO, alto, color)
+            for numero, texto in enumerate((label, str(valor))):
+                x_texto = x + (ancho_columna - medir_texto(texto, True, PDF_FONTSIZE_NORMAL)) / 2
+                y = self._y - PDF_PADDING_GRANDE - PDF_FONTSIZE_NORMAL - numero * linea
+                self._texto(texto, x_texto, y, True, PDF_FONTSIZE_NORMAL, color)
+        self._y -= alto
+
+    def tabla(self, headers: List[str], column_widths: List[float], filas: list,
+              celdas: Callable[[Any], List[Celda]], espaciado: bool = False) -> None:
+        # Posiciones de las columnas y ancho disponible para el texto de cada una, calculados una vez
+        bordes = [MARGEN_X]
+        for ancho in column_widths:
+            bordes.append(bordes[-1] + ancho * ANCHO_UTIL)
+        x_textos = [borde + PDF_PADDING_PEQUENO for borde in bordes[:-1]]
+        anchos_texto = [bordes[i + 1] - bordes[i] - 2 * PDF_PADDING_PEQUENO for i in range(len(headers))]
+
+        padding = PDF_PADDING_GRANDE if espaciado else PDF_PADDING_PEQUENO
+        alto_linea = PDF_FONTSIZE_DATO * INTERLINEADO
+        lineas_headers = [partir_texto(header, True, PDF_FONTSIZE_DATO, ancho) for header, ancho in zip(headers, anchos_texto)]
+        alto_header = max(map(len, lineas_headers)) * alto_linea + 2 * PDF_PADDING_NORMAL
+        alto_fila = alto_linea + 2 * padding
+
+        def abrir_bloque() -> list:
+            # Encabezados al principio de la tabla y de cada página que ocupa
+            self._reservar(alto_header + (alto_fila if filas else 0))
+            y = self._y - PDF_PADDING_NORMAL - PDF_FONTSIZE_DATO
+            for lineas_header, x in zip(lineas_headers, x_textos):
+                for numero, linea in enumerate(lineas_header):
+                    self._texto(linea, x, y - numero * alto_linea, True, PDF_FONTSIZE_DATO, PDF_COLOR_PRIMARIO)
+            lineas = [self._y]
+            self._y -= alto_header
+            lineas.append(self._y)
+            return lineas
+
+        def cerrar_bloque(lineas: list) -> None:
+            # Una sola ruta con las líneas de la grilla del bloque
+            trazos = [f"{PDF_BORDER_DELGADO} w 0 0 0 RG"]
+            trazos += [f"{bordes[0]:.2f} {y:.2f} m {bordes[-1]:.2f} {y:.2f} l" for y in lineas]
+            trazos += [f"{x:.2f} {lineas[0]:.2f} m {x:.2f} {lineas[-1]:.2f} l" for x in bordes]
+            trazos.append("S")
+            self._operaciones.append(" ".join(trazos))
+
+        lineas = abrir_bloque()
+        for fila in filas:
+            # Casi siempre cada celda entra en una línea; si no, la fila toma el alto de la celda más alta
+            celdas_fila = []
+            alto_texto = alto_linea
+            for celda, ancho in zip(celdas(fila), anchos_texto):
+                font_size = celda.font_size or PDF_FONTSIZE_DATO
+                lineas_celda = partir_texto(celda.texto, celda.negrita, font_size, ancho)
+                celdas_fila.append((celda, font_size, lineas_celda))
+                alto_texto = max(alto_texto, len(lineas_celda) * font_size * INTERLINEADO)
+            alto = alto_texto + 2 * padding
+
+            if self._y - alto < MARGEN_Y:
+                cerrar_bloque(lineas)
+                self._cerrar_pagina()
+                lineas = abrir_bloque()
+            for (celda, font_size, lineas_celda), x in zip(celdas_fila, x_textos):
+                y = self._y - padding - font_size
+                for numero, linea in enumerate(lineas_celda):
+                    self._texto(linea, x, y - numero * font_size * INTERLINEADO, celda.negrita, font_size, celda.color)
+            self._y -= alto
+            lineas.append(self._y)
+        cerrar_bloque(lineas)
+
+    def finalizar(self, filename: str) -> tuple[bytes, str]:
+        self._cerrar_pagina()
+        for id_fuente, fuente in ((ID_FUENTE_NORMAL, PDF_FONT_NORMAL), (ID_FUENTE_BOLD, PDF_FONT_BOLD)):
+            self._escribir_objeto(id_fuente, (
+                f"<< /Type /Font /Subtype /Type1 /BaseFont /{fuente} /Encoding /WinAnsiEncoding >>"
+            ).encode("latin-1"))
+        kids = " ".join(f"{id_pagina} 0 R" for id_pagina in self._paginas)
+        self._escribir_objeto(ID_PAGINAS, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._paginas)} >>".encode("latin-1"))
+        self._escribir_objeto(ID_CATALOGO, f"<< /Type /Catalog /Pages {ID_PAGINAS} 0 R >>".encode("latin-1"))
+
+        # Tabla xref: un registro de 20 bytes por objeto, en orden de número
+        inicio_xref = self._salida.tell()
+        self._salida.write(b"xref\n0 %d\n0000000000 65535 f \n" % self._siguiente_id)
+        for id_objeto in range(1, self._siguiente_id):
+            self._salida.write(b"%010d 00000 n \n" % self._posiciones[id_objeto])
+        self._salida.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                           % (self._siguiente_id, ID_CATALOGO, inicio_xref))
+        return self._salida.getvalue(), filename
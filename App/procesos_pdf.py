@@ -0,0 +1,130 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, time
+from typing import Iterable, List, NamedTuple
+
+from fastapi import HTTPException, Response
+
+from .config import PDF_MAX_PROCESOS, PDF_MAX_COLA, PDF_REINTENTAR_SEGUNDOS
+
+
+# ==================== Filas planas para los PDF ====================
+# Los PDF se arman en otro proceso: se les pasan tuplas serializables, no objetos ORM.
+
+class FilaPersona(NamedTuple):
+    id: int
+    nombre: str
+    dni: str
+    email: str
+    telefono: str
+    fecha_nacimiento: date
+    habilitado: bool
+
+
+class FilaTurno(NamedTuple):
+    id: int
+    persona_id: int
+    fecha: date
+    hora: time
+    estado: str
+    persona: FilaPersona
+
+
+def fila_persona(persona) -> FilaPersona:
+    return FilaPersona(persona.id, persona.nombre, persona.dni, persona.email,
+                       persona.telefono, persona.fecha_nacimiento, persona.habilitado)
+
+
+def filas_personas(personas: Iterable) -> List[FilaPersona]:
+    return [fila_persona(persona) for persona in personas]
+
+
+def filas_turnos(turnos: Iterable) -> List[FilaTurno]:
+    # Cada persona se convierte una sola vez: pickle envía una vez la fila compartida
+    personas = {}
+    filas = []
+    for turno in turnos:
+        if turno.persona_id not in personas:
+            personas[turno.persona_id] = fila_persona(turno.persona)
+        filas.append(FilaTurno(turno.id, turno.persona_id, turno.fecha, turno.hora,
+                               turno.estado, personas[turno.persona_id]))
+    return filas
+
+
+# ==================== Pool de procesos ====================
+
+def _generar(generador: str, args: tuple, kwargs: dict):
+    # Corre en el proceso hijo; borb se importa ahí y nunca en el worker de la API
+    from . import reportes_pdf
+    return getattr(reportes_pdf, generador)(*args, **kwargs)
+
+
+class PoolPdf:
+    # Arma los PDF en un pool de procesos acotado para que el trabajo de borb (CPU y GIL) no frene
+    # las reservas del worker. Admite hasta max_procesos PDF en curso más max_cola en espera;
+    # por encima responde 503 con Retry-After. El pool se crea con el primer PDF.
+
+    def __init__(self, max_procesos: int, max_cola: int, reintentar_segundos: int):
+        self.max_procesos = max_procesos
+        self.max_cola = max_cola
+        self.reintentar_segundos = reintentar_segundos
+        self._ejecutor = None
+        self._pendientes = 0
+        self._candado = threading.Lock()
+
+    def _obtener_ejecutor(self) -> ProcessPoolExecutor:
+        if self._ejecutor is None:
+            # spawn: el worker de la API tiene hilos (threadpool, pool de conexiones) y no conviene hacer fork
+            self._ejecutor = ProcessPoolExecutor(max_workers=self.max_procesos,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._ejecutor
+
+    def _reservar_lugar(self) -> ProcessPoolExecutor:
+        with self._candado:
+            if self._pendientes >= self.max_procesos + self.max_cola:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Hay demasiados reportes PDF en proceso, intente nuevamente en unos segundos",
+                    headers={"Retry-After": str(self.reintentar_segundos)}
+                )
+            self._pendientes += 1
+            return self._obtener_ejecutor()
+
+    def _liberar_lugar(self) -> None:
+        with self._candado:
+            self._pendientes -= 1
+
+    async def generar(self, generador: str, *args, **kwargs) -> Response:
+        ejecutor = self._reservar_lugar()
+        try:
+            futuro = ejecutor.submit(_generar, generador, args, kwargs)
+        except BaseException:
+            self._liberar_lugar()
+            raise
+        # El lugar se libera cuando termina el proceso, aunque el cliente haya cortado antes
+        futuro.add_done_callback(lambda _: self._liberar_lugar())
+        try:
+            contenido, filename = await asyncio.wrap_future(futuro)
+        except BrokenProcessPool:
+            # Si un proceso hijo murió el pool queda inutilizable: el próximo PDF crea uno nuevo
+            with self._candado:
+                if self._ejecutor is ejecutor:
+                    self._ejecutor = None
+            raise
+        return Response(
+            content=contenido,
+            media_type="application/pdf",
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
+
+    def cerrar(self) -> None:
+        with self._candado:
+            ejecutor, self._ejecutor = self._ejecutor, None
+        if ejecutor is not None:
+            ejecutor.shutdown(wait=False, cancel_futures=True)
+
+
+pool_pdf = PoolPdf(PDF_MAX_PROCESOS, PDF_MAX_COLA, PDF_REINTENTAR_SEGUNDOS)
@@ -1,8 +1,9 @@
+import csv
 from datetime import date
-from typing import List
+from itertools import groupby
+from typing import Iterable, List
 from io import StringIO
 
-import pandas as pd
 from fastapi.responses import StreamingResponse
 
 from .utils import calcular_edad
@@ -11,9 +12,18 @@ from .config import (
     HEADER_DNI, HEADER_EDAD, HEADER_EMAIL, HEADER_ESTADO, 
     HEADER_FECHA, HEADER_HORA, HEADER_ID, HEADER_ID_PERSONA, 
     HEADER_NOMBRE, HEADER_TELEFONO,
-    TEXTO_DESHABILITADO, TEXTO_HABILITADO
+    TEXTO_DESHABILITADO, TEXTO_HABILITADO, FILAS_POR_BLOQUE
 )
 
+HEADER_CANTIDAD_CANCELADOS = 'Cantidad Cancelados'
+HEADER_ID_TURNO = 'ID Turno'
+
+# Columnas de cada CSV, en el orden de las filas que arman crear_fila_turno y crear_fila_persona
+ENCABEZADOS_TURNO = [HEADER_ID, HEADER_ID_PERSONA, HEADER_NOMBRE, HEADER_DNI, HEADER_FECHA, HEADER_HORA, HEADER_ESTADO]
+ENCABEZADOS_PERSONA = [HEADER_ID, HEADER_NOMBRE, HEADER_DNI, HEADER_EMAIL, HEADER_TELEFONO, HEADER_EDAD, HEADER_ESTADO]
+ENCABEZADOS_TURNOS_PERSONA = [HEADER_DNI, HEADER_NOMBRE, HEADER_ID, HEADER_FECHA, HEADER_HORA, HEADER_ESTADO]
+ENCABEZADOS_CANCELACIONES = ENCABEZADOS_TURNO + [HEADER_CANTIDAD_CANCELADOS, HEADER_ID_TURNO]
+
 
 # ==================== Utilidades ====================
 
@@ -45,71 +55,75 @@ def crear_fila_persona(persona: Persona, **campos_extra) -> dict:
     return fila
 
 
-def finalizar_csv(df: pd.DataFrame, filename: str) -> StreamingResponse:
-    buffer = StringIO()
-    df.to_csv(buffer, index=False, encoding='utf-8', sep=',', quotechar='"', quoting=1)
-    buffer.seek(0)
+def transmitir_csv(encabezados: List[str], filas: Iterable[dict], filename: str) -> StreamingResponse:
+    # Escribe las filas a medida que llegan y envía un bloque cada FILAS_POR_BLOQUE filas:
+    # la memoria no depende de la cantidad de filas y el primer bloque sale antes de terminar la consulta
+    def generar_bloques():
+        buffer = StringIO()
+        escritor = csv.DictWriter(buffer, fieldnames=encabezados, quoting=csv.QUOTE_ALL, lineterminator="\n")
+        escritor.writeheader()
+        
+        for numero_fila, fila in enumerate(filas, start=1):
+            escritor.writerow(fila)
+            if numero_fila % FILAS_POR_BLOQUE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        
+        yield buffer.getvalue()
+    
     return StreamingResponse(
-        [buffer.getvalue()],
+        generar_bloques(),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
 
 # ==================== Generadores de CSV ====================
+# Reciben listas u otros iterables (por ejemplo utils.iterar_consulta) y los recorren una sola vez
 
-def generar_csv_turnos_por_fecha(fecha: date, turnos: List[Turno]) -> StreamingResponse:
-    reporte = [crear_fila_turno(turno) for turno in turnos]
-    df = pd.DataFrame(reporte)
-    return finalizar_csv(df, f"turnos_{fecha}.csv")
+def generar_csv_turnos_por_fecha(fecha: date, turnos: Iterable[Turno]) -> StreamingResponse:
+    filas = (crear_fila_turno(turno) for turno in turnos)
+    return transmitir_csv(ENCABEZADOS_TURNO, filas, f"turnos_{fecha}.csv")
 
 
-def generar_csv_turnos_cancelados_mes(mes: str, anio: int, turnos: List[Turno]) -> StreamingResponse:
-    reporte = [crear_fila_turno(turno) for turno in turnos]
-    df = pd.DataFrame(reporte)
-    return finalizar_csv(df, f"cancelados_{mes}_{anio}.csv")
+def generar_csv_turnos_cancelados_mes(mes: str, anio: int, turnos: Iterable[Turno]) -> StreamingResponse:
+    filas = (crear_fila_turno(turno) for turno in turnos)
+    return transmitir_csv(ENCABEZADOS_TURNO, filas, f"cancelados_{mes}_{anio}.csv")
 
 
-def generar_csv_turnos_por_persona(persona: Persona, turnos: List[Turno]) -> StreamingResponse:
-    reporte = [
-        {HEADER_DNI: persona.dni, HEADER_NOMBRE: persona.nombre, HEADER_ID: turno.id,
+def generar_csv_turnos_por_persona(persona: Persona, turnos: Iterable[Turno]) -> StreamingResponse:
+    # Los datos de la persona se copian antes de transmitir: el objeto es de la sesión del request
+    dni, nombre = persona.dni, persona.nombre
+    filas = (
+        {HEADER_DNI: dni, HEADER_NOMBRE: nombre, HEADER_ID: turno.id,
          HEADER_FECHA: str(turno.fecha), HEADER_HORA: str(turno.hora), HEADER_ESTADO: turno.estado}
         for turno in turnos
-    ]
-    df = pd.DataFrame(reporte)
-    return finalizar_csv(df, f"historial_{persona.dni}.csv")
-
-
-def generar_csv_personas_con_cancelaciones(min_cancelados: int, turnos: List[Turno]) -> StreamingResponse:
-    # Agrupar turnos por persona
-    diccionario_personas = {}
-    for turno in turnos:
-        if turno.persona_id not in diccionario_personas:
-            diccionario_personas[turno.persona_id] = {'persona': turno.persona, 'turnos': []}
-        diccionario_personas[turno.persona_id]['turnos'].append(turno)
+    )
+    return transmitir_csv(ENCABEZADOS_TURNOS_PERSONA, filas, f"historial_{dni}.csv")
+
+
+def generar_csv_personas_con_cancelaciones(min_cancelados: int, turnos: Iterable[Turno]) -> StreamingResponse:
+    # Los turnos vienen ordenados por persona: se agrupan de a una persona para conocer su cantidad de cancelados
+    def generar_filas():
+        for persona_id, turnos_persona in groupby(turnos, key=lambda turno: turno.persona_id):
+            turnos_persona = list(turnos_persona)
+            for turno in turnos_persona:
+                yield crear_fila_turno(turno, **{
+                    HEADER_ID_PERSONA: persona_id,
+                    HEADER_CANTIDAD_CANCELADOS: len(turnos_persona),
+                    HEADER_ID_TURNO: turno.id
+                })
     
-    # Crear datos para el DataFrame
-    reporte = [
-        crear_fila_turno(turno, **{
-            HEADER_ID_PERSONA: persona_data['persona'].id,
-            'Cantidad Cancelados': len(persona_data['turnos']),
-            'ID Turno': turno.id
-        })
-        for persona_data in diccionario_personas.values()
-        for turno in persona_data['turnos']
-    ]
-    df = pd.DataFrame(reporte)
-    return finalizar_csv(df, f"cancelaciones_min_{min_cancelados}.csv")
-
-
-def generar_csv_turnos_confirmados(desde: date, hasta: date, turnos: List[Turno]) -> StreamingResponse:
-    reporte = [crear_fila_turno(turno) for turno in turnos]
-    df = pd.DataFrame(reporte)
-    return finalizar_csv(df, f"confirmados_{desde}_a_{hasta}.csv")
-
-
-def generar_csv_estado_personas(habilitado: bool, personas: List[Persona]) -> StreamingResponse:
+    return transmitir_csv(ENCABEZADOS_CANCELACIONES, generar_filas(), f"cancelaciones_min_{min_cancelados}.csv")
+
+
+def generar_csv_turnos_confirmados(desde: date, hasta: date, turnos: Iterable[Turno]) -> StreamingResponse:
+    filas = (crear_fila_turno(turno) for turno in turnos)
+    return transmitir_csv(ENCABEZADOS_TURNO, filas, f"confirmados_{desde}_a_{hasta}.csv")
+
+
+def generar_csv_estado_personas(habilitado: bool, personas: Iterable[Persona]) -> StreamingResponse:
     estado_texto = "habilitadas" if habilitado else "deshabilitadas"
-    reporte = [crear_fila_persona(persona) for persona in personas]
-    df = pd.DataFrame(reporte)
-    return finalizar_csv(df, f"personas_{estado_texto}.csv")
+    filas = (crear_fila_persona(persona) for persona in personas)
+    return transmitir_csv(ENCABEZADOS_PERSONA, filas, f"personas_{estado_texto}.csv")
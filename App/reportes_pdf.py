@@ -1,405 +1,289 @@
-from datetime import date, datetime
-from typing import List
-from io import BytesIO
-from decimal import Decimal
-
-from borb.pdf import Document, Page, PageLayout, SingleColumnLayout, Paragraph, PDF, FixedColumnWidthTable, LayoutElement, HexColor
-from fastapi.responses import StreamingResponse
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
 
 from .utils import calcular_edad
 
-from .models import Persona, Turno
+from .procesos_pdf import FilaPersona, FilaTurno
 from .config import (
     ESTADO_ASISTIDO, ESTADO_CANCELADO, ESTADO_CONFIRMADO,
-    FORMATO_FECHA_GENERACION, HEADER_DNI, HEADER_EDAD, HEADER_EMAIL, HEADER_ESTADO, 
+    HEADER_DNI, HEADER_EDAD, HEADER_EMAIL, HEADER_ESTADO,
     HEADER_FECHA, HEADER_HORA, HEADER_ID, HEADER_ID_PERSONA, HEADER_NOMBRE, HEADER_PACIENTE,
     HEADER_TELEFONO, MSG_SIN_TURNOS_CANCELADOS, MSG_SIN_TURNOS_CONFIRMADOS,
-    MSG_SIN_TURNOS_FECHA, MSG_SIN_TURNOS_PERSONA, TITULO_SISTEMA,
-    PDF_BORDER_DELGADO, PDF_BORDER_GRUESO, PDF_BORDER_MEDIO,
+    MSG_SIN_TURNOS_FECHA, MSG_SIN_TURNOS_PERSONA,
     PDF_COLOR_ALERTA, PDF_COLOR_ASISTIDO, PDF_COLOR_CANCELADO, PDF_COLOR_CONFIRMADO,
     PDF_COLOR_DESHABILITADO, PDF_COLOR_HABILITADO, PDF_COLOR_PENDIENTE, PDF_COLOR_PRIMARIO,
-    PDF_COLOR_SECUNDARIO, PDF_COLOR_TEXTO_GRIS, PDF_COLOR_TEXTO_GRIS_CLARO,
-    PDF_FONT_BOLD, PDF_FONTSIZE_DATO, PDF_FONTSIZE_NORMAL, PDF_FONTSIZE_PEQUENO,
-    PDF_FONTSIZE_SUBTITULO, PDF_FONTSIZE_TITULO, PDF_PADDING_GRANDE, PDF_PADDING_MEDIO,
-    PDF_PADDING_MUY_GRANDE, PDF_PADDING_NORMAL, PDF_PADDING_PEQUENO
+    PDF_COLOR_TEXTO_GRIS_CLARO, PDF_FONTSIZE_DATO, PDF_FONTSIZE_NORMAL, PDF_FONTSIZE_SUBTITULO,
+    PDF_PADDING_GRANDE, PDF_PADDING_MUY_GRANDE, PDF_PADDING_PEQUENO, PDF_RENDERIZADOR_UMBRAL_FILAS
 )
 
 
-# ==================== Utilidades ====================
+# ==================== Renderizadores ====================
+# Los generadores describen el reporte (textos, tablas, colores) y un renderizador lo dibuja:
+# borb (layout general, más prolijo) o el rápido (escribe el PDF directo con una grilla fija).
+# Sin renderizador pedido, los reportes desde PDF_RENDERIZADOR_UMBRAL_FILAS filas usan el rápido.
 
-def obtener_color_estado(estado: str) -> HexColor:
-    colores = {
-        'pendiente': HexColor(PDF_COLOR_PENDIENTE),
-        'confirmado': HexColor(PDF_COLOR_CONFIRMADO),
-        'cancelado': HexColor(PDF_COLOR_CANCELADO),
-        'asistido': HexColor(PDF_COLOR_ASISTIDO)
-    }
-    return colores.get(estado.lower(), HexColor(PDF_COLOR_TEXTO_GRIS_CLARO))
+RENDERIZADOR_BORB = "borb"
+RENDERIZADOR_RAPIDO = "rapido"
 
 
-def crear_paragraph(texto: str, **propiedades) -> Paragraph:
-    defaults = {
-        'font_size': PDF_FONTSIZE_DATO,
-        'padding_top': Decimal(PDF_PADDING_PEQUENO),
-        'padding_bottom': Decimal(PDF_PADDING_PEQUENO),
-        'padding_left': Decimal(PDF_PADDING_PEQUENO),
-        'padding_right': Decimal(PDF_PADDING_PEQUENO)
-    }
-    defaults.update(propiedades)
-    return Paragraph(texto, **defaults)
+class Estilo(NamedTuple):
+    negrita: bool = False
+    font_size: int = PDF_FONTSIZE_DATO
+    color: Optional[str] = None
+    padding_top: int = PDF_PADDING_PEQUENO
 
 
-def crear_celda_header(texto: str) -> Paragraph:
-    return crear_paragraph(
-        texto, 
-        font=PDF_FONT_BOLD, 
-        font_color=HexColor(PDF_COLOR_PRIMARIO),
-        padding_top=Decimal(PDF_PADDING_NORMAL), 
-        padding_bottom=Decimal(PDF_PADDING_NORMAL)
-    )
+ESTILO_DATO = Estilo()
+ESTILO_GRUPO = Estilo(negrita=True, font_size=PDF_FONTSIZE_NORMAL)
+ESTILO_SUBTITULO = Estilo(negrita=True, font_size=PDF_FONTSIZE_SUBTITULO, color=PDF_COLOR_PRIMARIO, padding_top=PDF_PADDING_GRANDE)
+ESTILO_ALERTA = Estilo(color=PDF_COLOR_ALERTA, padding_top=PDF_PADDING_MUY_GRANDE)
 
 
-def crear_celda_dato(texto: str, font_size=None, padding_extra=False) -> Paragraph:
-    propiedades = {'font_size': font_size or PDF_FONTSIZE_DATO}
-    if padding_extra:
-        propiedades.update({
-            'padding_top': Decimal(PDF_PADDING_GRANDE), 
-            'padding_bottom': Decimal(PDF_PADDING_GRANDE),
-            'vertical_alignment': LayoutElement.VerticalAlignment.MIDDLE
-        })
-    return crear_paragraph(texto, **propiedades)
-
-
-def crear_celda_estado(estado: str, padding_extra=False) -> Paragraph:
-    propiedades = {'font': PDF_FONT_BOLD, 'font_color': obtener_color_estado(estado)}
-    if padding_extra:
-        propiedades.update({
-            'padding_top': Decimal(PDF_PADDING_GRANDE), 
-            'padding_bottom': Decimal(PDF_PADDING_GRANDE),
-            'vertical_alignment': LayoutElement.VerticalAlignment.MIDDLE
-        })
-    return crear_paragraph(estado.upper(), **propiedades)
-
-
-def finalizar_pdf(doc: Document, filename: str) -> StreamingResponse:
-    buffer = BytesIO()
-    PDF.write(doc, buffer)
-    buffer.seek(0)
-    return StreamingResponse(
-        buffer, 
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+class Celda(NamedTuple):
+    texto: str
+    color: Optional[str] = None
+    negrita: bool = False
+    font_size: Optional[int] = None
+
+
+class RenderizadorPdf(ABC):
+    # Operaciones que usan los generadores; cada renderizador arma el encabezado del reporte al crearse
+
+    @abstractmethod
+    def __init__(self, titulo: str, subtitulo: Optional[str] = None):
+        ...
+
+    @abstractmethod
+    def texto(self, texto: str, estilo: Estilo = ESTILO_DATO) -> None:
+        ...
+
+    @abstractmethod
+    def espacio(self) -> None:
+        ...
+
+    @abstractmethod
+    def ficha(self, datos: List[Tuple[str, str]]) -> None:
+        # Etiqueta y valor, sin bordes
+        ...
+
+    @abstractmethod
+    def destacado(self, texto: str, color: str) -> None:
+        ...
+
+    @abstractmethod
+    def resumen(self, valores: List[Tuple[str, int, str]]) -> None:
+        # Recuadros de etiqueta, valor y color, uno al lado del otro
+        ...
+
+    @abstractmethod
+    def tabla(self, headers: List[str], column_widths: List[float], filas: list,
+              celdas: Callable[[Any], List[Celda]], espaciado: bool = False) -> None:
+        # column_widths en fracción del ancho útil; celdas convierte cada fila en sus celdas
+        ...
+
+    @abstractmethod
+    def finalizar(self, filename: str) -> tuple[bytes, str]:
+        ...
+
+
+def crear_renderizador(titulo: str, subtitulo: Optional[str], cantidad_filas: int,
+                       renderizador: Optional[str] = None) -> RenderizadorPdf:
+    if renderizador is None:
+        renderizador = RENDERIZADOR_RAPIDO if cantidad_filas >= PDF_RENDERIZADOR_UMBRAL_FILAS else RENDERIZADOR_BORB
+    # Cada motor se importa recién al usarlo: el rápido no carga borb
+    if renderizador == RENDERIZADOR_RAPIDO:
+        from .pdf_rapido import RenderizadorRapido
+        return RenderizadorRapido(titulo, subtitulo)
+    from .pdf_borb import RenderizadorBorb
+    return RenderizadorBorb(titulo, subtitulo)
+
+
+# ==================== Utilidades ====================
+
+def obtener_color_estado(estado: str) -> str:
+    colores = {
+        'pendiente': PDF_COLOR_PENDIENTE,
+        'confirmado': PDF_COLOR_CONFIRMADO,
+        'cancelado': PDF_COLOR_CANCELADO,
+        'asistido': PDF_COLOR_ASISTIDO
+    }
+    return colores.get(estado.lower(), PDF_COLOR_TEXTO_GRIS_CLARO)
+
+
+def obtener_color_habilitado(habilitado: bool) -> str:
+    return PDF_COLOR_HABILITADO if habilitado else PDF_COLOR_DESHABILITADO
 
 
-def agregar_turnos_agrupados_por_persona(layout: PageLayout, turnos: List[Turno], incluir_fecha: bool = True) -> None:
+def agregar_turnos_agrupados_por_persona(renderizador: RenderizadorPdf, turnos: List[FilaTurno], incluir_fecha: bool = True) -> None:
     diccionario_personas = {}
     for turno in turnos:
         if turno.persona_id not in diccionario_personas:
             diccionario_personas[turno.persona_id] = {'persona': turno.persona, 'turnos': []}
         diccionario_personas[turno.persona_id]['turnos'].append(turno)
-    
+
     for persona_data in diccionario_personas.values():
         persona = persona_data['persona']
         turnos_persona = persona_data['turnos']
-        layout.append_layout_element(crear_paragraph(
+        renderizador.texto(
             f"{persona.nombre} | ID: {persona.id} | DNI: {persona.dni} | {len(turnos_persona)} turno(s)",
-            font=PDF_FONT_BOLD, 
-            font_size=PDF_FONTSIZE_NORMAL
-        ))
-        layout.append_layout_element(crear_tabla_turnos(turnos_persona, incluir_persona=False, incluir_fecha=incluir_fecha))
-        layout.append_layout_element(Paragraph(" "))
-
-
-
-# ==================== Creación de PDF Base ====================
-
-def crear_pdf_base(titulo: str, subtitulo: str = None) -> tuple[Document, PageLayout]:
-    doc = Document()
-    page = Page()
-    doc.append_page(page)
-    layout = SingleColumnLayout(page)
-    
-    # Título del sistema
-    layout.append_layout_element(crear_paragraph(
-        TITULO_SISTEMA,
-        font=PDF_FONT_BOLD, 
-        font_color=HexColor(PDF_COLOR_PRIMARIO), 
-        padding_top=Decimal(PDF_PADDING_PEQUENO),
-        padding_left=Decimal(PDF_PADDING_MEDIO), 
-        padding_right=Decimal(PDF_PADDING_MEDIO),
-        horizontal_alignment=LayoutElement.HorizontalAlignment.MIDDLE
-    ))
-    
-    # Título del reporte
-    layout.append_layout_element(crear_paragraph(
-        titulo, 
-        font=PDF_FONT_BOLD, 
-        font_size=PDF_FONTSIZE_TITULO, 
-        font_color=HexColor(PDF_COLOR_PRIMARIO),
-        horizontal_alignment=LayoutElement.HorizontalAlignment.MIDDLE,
-        padding_top=Decimal(PDF_PADDING_MUY_GRANDE), 
-        padding_bottom=Decimal(PDF_PADDING_MEDIO)
-    ))
-    
-    # Subtítulo opcional
-    if subtitulo:
-        layout.append_layout_element(crear_paragraph(
-            subtitulo, 
-            font_size=PDF_FONTSIZE_NORMAL, 
-            font_color=HexColor(PDF_COLOR_TEXTO_GRIS),
-            horizontal_alignment=LayoutElement.HorizontalAlignment.MIDDLE
-        ))
-    
-    # Fecha de generación
-    layout.append_layout_element(crear_paragraph(
-        datetime.now().strftime(FORMATO_FECHA_GENERACION),
-        font_size=PDF_FONTSIZE_PEQUENO, 
-        font_color=HexColor(PDF_COLOR_TEXTO_GRIS_CLARO),
-        horizontal_alignment=LayoutElement.HorizontalAlignment.MIDDLE, 
-        padding_bottom=Decimal(PDF_PADDING_GRANDE)
-    ))
-    
-    # Línea separadora
-    layout.append_layout_element(Paragraph(
-        " ", 
-        border_width_bottom=Decimal(PDF_BORDER_DELGADO),
-        border_color=HexColor(PDF_COLOR_SECUNDARIO), 
-        padding_bottom=Decimal(PDF_PADDING_MEDIO)
-    ))
-    layout.append_layout_element(Paragraph(" "))
-    
-    return doc, layout
+            ESTILO_GRUPO
+        )
+        agregar_tabla_turnos(renderizador, turnos_persona, incluir_persona=False, incluir_fecha=incluir_fecha)
+        renderizador.espacio()
 
 
 # ==================== Creación de Tablas ====================
 
-def crear_tabla_turnos(turnos: List[Turno], incluir_persona: bool = False, incluir_fecha: bool = True) -> FixedColumnWidthTable:
+def agregar_tabla_turnos(renderizador: RenderizadorPdf, turnos: List[FilaTurno], incluir_persona: bool = False, incluir_fecha: bool = True) -> None:
     if incluir_persona:
         headers = [
-            HEADER_ID, HEADER_ID_PERSONA, HEADER_PACIENTE, 
+            HEADER_ID, HEADER_ID_PERSONA, HEADER_PACIENTE,
             HEADER_DNI, HEADER_FECHA, HEADER_HORA, HEADER_ESTADO
         ]
-        column_widths = [Decimal(0.06), Decimal(0.08), Decimal(0.26), Decimal(0.10), Decimal(0.14), Decimal(0.14), Decimal(0.22)]
+        column_widths = [0.06, 0.08, 0.26, 0.10, 0.14, 0.14, 0.22]
     elif incluir_fecha:
         headers = [HEADER_ID, HEADER_FECHA, HEADER_HORA, HEADER_ESTADO]
-        column_widths = [Decimal(0.10), Decimal(0.30), Decimal(0.30), Decimal(0.30)]
+        column_widths = [0.10, 0.30, 0.30, 0.30]
     else:
         headers = [HEADER_ID, HEADER_HORA, HEADER_ESTADO]
-        column_widths = [Decimal(0.15), Decimal(0.40), Decimal(0.45)]
-    
-    tabla = FixedColumnWidthTable(number_of_rows=len(turnos) + 1, number_of_columns=len(headers), column_widths=column_widths)
-    
-    for header in headers:
-        tabla.append_layout_element(crear_celda_header(header))
-    
-    for turno in turnos:
-        tabla.append_layout_element(crear_celda_dato(str(turno.id), padding_extra=incluir_persona))
-        
+        column_widths = [0.15, 0.40, 0.45]
+
+    def celdas(turno: FilaTurno) -> List[Celda]:
+        fila = [Celda(str(turno.id))]
+
         if incluir_persona:
-            tabla.append_layout_element(crear_celda_dato(str(turno.persona_id), padding_extra=True))
-            tabla.append_layout_element(crear_celda_dato(turno.persona.nombre, padding_extra=True))
-            tabla.append_layout_element(crear_celda_dato(turno.persona.dni, padding_extra=True))
-        
+            fila += [Celda(str(turno.persona_id)), Celda(turno.persona.nombre), Celda(turno.persona.dni)]
+
         if incluir_fecha:
-            tabla.append_layout_element(crear_celda_dato(str(turno.fecha), padding_extra=incluir_persona))
-        
-        tabla.append_layout_element(crear_celda_dato(str(turno.hora), padding_extra=incluir_persona))
-        tabla.append_layout_element(crear_celda_estado(turno.estado, padding_extra=incluir_persona))
-    
-    return tabla
+            fila.append(Celda(str(turno.fecha)))
+
+        fila.append(Celda(str(turno.hora)))
+        fila.append(Celda(turno.estado.upper(), obtener_color_estado(turno.estado), negrita=True))
+        return fila
+
+    renderizador.tabla(headers, column_widths, turnos, celdas, espaciado=incluir_persona)
 
 
-def crear_tabla_personas(personas: List[Persona], incluir_completo: bool = False) -> FixedColumnWidthTable:    
+def agregar_tabla_personas(renderizador: RenderizadorPdf, personas: List[FilaPersona], incluir_completo: bool = False) -> None:
     if incluir_completo:
         headers = [
-            HEADER_ID, HEADER_NOMBRE, HEADER_DNI, 
+            HEADER_ID, HEADER_NOMBRE, HEADER_DNI,
             HEADER_EMAIL, HEADER_TELEFONO, HEADER_EDAD, HEADER_ESTADO
         ]
-        column_widths = [Decimal(0.06), Decimal(0.22), Decimal(0.10), Decimal(0.26), Decimal(0.12), Decimal(0.06), Decimal(0.18)]
+        column_widths = [0.06, 0.22, 0.10, 0.26, 0.12, 0.06, 0.18]
     else:
         headers = [HEADER_ID, HEADER_NOMBRE, HEADER_DNI]
-        column_widths = [Decimal(0.10), Decimal(0.65), Decimal(0.25)]
-    
-    tabla = FixedColumnWidthTable(number_of_rows=len(personas) + 1, number_of_columns=len(headers), column_widths=column_widths)
-    
-    for header in headers:
-        tabla.append_layout_element(crear_celda_header(header))
-    
-    for persona in personas:
-        tabla.append_layout_element(crear_celda_dato(str(persona.id), padding_extra=True))
-        tabla.append_layout_element(crear_celda_dato(persona.nombre, padding_extra=True))
-        tabla.append_layout_element(crear_celda_dato(persona.dni, padding_extra=True))
-        
+        column_widths = [0.10, 0.65, 0.25]
+
+    def celdas(persona: FilaPersona) -> List[Celda]:
+        fila = [Celda(str(persona.id)), Celda(persona.nombre), Celda(persona.dni)]
+
         if incluir_completo:
-            tabla.append_layout_element(crear_celda_dato(persona.email, font_size=8, padding_extra=True))
-            tabla.append_layout_element(crear_celda_dato(persona.telefono, padding_extra=True))
-            tabla.append_layout_element(crear_celda_dato(str(calcular_edad(persona.fecha_nacimiento)), padding_extra=True))
-            
-            estado_color = HexColor(PDF_COLOR_HABILITADO if persona.habilitado else PDF_COLOR_DESHABILITADO)
-            tabla.append_layout_element(crear_paragraph(
-                "HABILITADO" if persona.habilitado else "DESHABILITADO",
-                font=PDF_FONT_BOLD, 
-                font_color=estado_color,
-                padding_top=Decimal(PDF_PADDING_GRANDE), 
-                padding_bottom=Decimal(PDF_PADDING_GRANDE),
-                vertical_alignment=LayoutElement.VerticalAlignment.MIDDLE
-            ))
-    
-    return tabla
+            fila += [
+                Celda(persona.email, font_size=8),
+                Celda(persona.telefono),
+                Celda(str(calcular_edad(persona.fecha_nacimiento))),
+                Celda("HABILITADO" if persona.habilitado else "DESHABILITADO",
+                      obtener_color_habilitado(persona.habilitado), negrita=True)
+            ]
+        return fila
 
+    renderizador.tabla(headers, column_widths, personas, celdas, espaciado=True)
 
-# ==================== Generadores de PDF ====================
 
+# ==================== Generadores de PDF ====================
 
 
+def generar_pdf_turnos_por_fecha(fecha: date, turnos: List[FilaTurno], renderizador: Optional[str] = None) -> tuple[bytes, str]:
+    pdf = crear_renderizador(f"Turnos - {fecha}", f"Total: {len(turnos)} turnos", len(turnos), renderizador)
 
-def generar_pdf_turnos_por_fecha(fecha: date, turnos: List[Turno]) -> StreamingResponse:
-    doc, layout = crear_pdf_base(f"Turnos - {fecha}", f"Total: {len(turnos)} turnos")
-    
     if turnos:
-        agregar_turnos_agrupados_por_persona(layout, turnos, incluir_fecha=False)
+        agregar_turnos_agrupados_por_persona(pdf, turnos, incluir_fecha=False)
     else:
-        layout.append_layout_element(crear_paragraph(MSG_SIN_TURNOS_FECHA))
-    
-    return finalizar_pdf(doc, f"turnos_{fecha}.pdf")
+        pdf.texto(MSG_SIN_TURNOS_FECHA)
 
+    return pdf.finalizar(f"turnos_{fecha}.pdf")
 
 
-def generar_pdf_turnos_cancelados_mes(mes: str, anio: int, turnos: List[Turno]) -> StreamingResponse:
-    doc, layout = crear_pdf_base(f"Turnos Cancelados - {mes} {anio}", f"Total: {len(turnos)}")
-    
+
+def generar_pdf_turnos_cancelados_mes(mes: str, anio: int, turnos: List[FilaTurno], renderizador: Optional[str] = None) -> tuple[bytes, str]:
+    pdf = crear_renderizador(f"Turnos Cancelados - {mes} {anio}", f"Total: {len(turnos)}", len(turnos), renderizador)
+
     if turnos:
-        agregar_turnos_agrupados_por_persona(layout, turnos, incluir_fecha=True)
+        agregar_turnos_agrupados_por_persona(pdf, turnos, incluir_fecha=True)
     else:
-        layout.append_layout_element(crear_paragraph(MSG_SIN_TURNOS_CANCELADOS))
-    
-    return finalizar_pdf(doc, f"cancelados_{mes}_{anio}.pdf")
+        pdf.texto(MSG_SIN_TURNOS_CANCELADOS)
+
+    return pdf.finalizar(f"cancelados_{mes}_{anio}.pdf")
 
 
-def generar_pdf_turnos_por_persona(persona: Persona, turnos: List[Turno]) -> StreamingResponse:    
-    doc, layout = crear_pdf_base("HISTORIAL DE TURNOS DEL PACIENTE", "Reporte completo")
-    
+def generar_pdf_turnos_por_persona(persona: FilaPersona, turnos: List[FilaTurno], renderizador: Optional[str] = None) -> tuple[bytes, str]:
+    pdf = crear_renderizador("HISTORIAL DE TURNOS DEL PACIENTE", "Reporte completo", len(turnos), renderizador)
+
     # Info del paciente
-    info = FixedColumnWidthTable(number_of_rows=5, number_of_columns=2, column_widths=[Decimal(0.20), Decimal(0.80)])
-    for label, valor in [("Nombre:", persona.nombre), ("DNI:", persona.dni), ("Email:", persona.email), ("Teléfono:", persona.telefono), ("Edad:", f"{calcular_edad(persona.fecha_nacimiento)} años")]:
-        info.append_layout_element(crear_paragraph(
-            label, 
-            font=PDF_FONT_BOLD, 
-            font_color=HexColor(PDF_COLOR_SECUNDARIO),
-            padding_left=Decimal(PDF_PADDING_MUY_GRANDE), 
-            padding_top=Decimal(2), 
-            padding_bottom=Decimal(2)
-        ))
-        info.append_layout_element(crear_paragraph(
-            valor, 
-            padding_left=Decimal(PDF_PADDING_MUY_GRANDE),
-            padding_top=Decimal(2), 
-            padding_bottom=Decimal(2)
-        ))
-    info.no_borders()
-    layout.append_layout_element(info)
-    
+    pdf.ficha([
+        ("Nombre:", persona.nombre), ("DNI:", persona.dni), ("Email:", persona.email),
+        ("Teléfono:", persona.telefono), ("Edad:", f"{calcular_edad(persona.fecha_nacimiento)} años")
+    ])
+
     # Estado
-    estado_color = HexColor(PDF_COLOR_HABILITADO if persona.habilitado else PDF_COLOR_DESHABILITADO)
-    layout.append_layout_element(crear_paragraph(
+    pdf.destacado(
         "HABILITADO PARA SOLICITAR TURNOS" if persona.habilitado else "DESHABILITADO PARA SOLICITAR TURNOS",
-        font=PDF_FONT_BOLD, 
-        font_size=PDF_FONTSIZE_NORMAL, 
-        font_color=estado_color,
-        border_width_left=Decimal(PDF_BORDER_GRUESO), 
-        border_color=estado_color,
-        padding_top=Decimal(6), 
-        padding_bottom=Decimal(6), 
-        padding_left=Decimal(PDF_PADDING_MUY_GRANDE), 
-        padding_right=Decimal(PDF_PADDING_MUY_GRANDE),
-        horizontal_alignment=LayoutElement.HorizontalAlignment.MIDDLE
-    ))
-    
-    layout.append_layout_element(Paragraph(" "))
-    layout.append_layout_element(crear_paragraph("RESUMEN DE TURNOS", 
-        font=PDF_FONT_BOLD, 
-        font_size=PDF_FONTSIZE_SUBTITULO,
-        font_color=HexColor(PDF_COLOR_PRIMARIO), 
-        padding_top=Decimal(PDF_PADDING_GRANDE)
-    ))
-    
+        obtener_color_habilitado(persona.habilitado)
+    )
+
+    pdf.espacio()
+    pdf.texto("RESUMEN DE TURNOS", ESTILO_SUBTITULO)
+
     if turnos:
         # Estadísticas
-        stats_tabla = FixedColumnWidthTable(number_of_rows=1, number_of_columns=4)
-        stats = [
-            ('Total', len(turnos), HexColor(PDF_COLOR_TEXTO_GRIS_CLARO)),
-            ('Confirmados', sum(1 for t in turnos if t.estado.lower() == ESTADO_CONFIRMADO.lower()), HexColor(PDF_COLOR_CONFIRMADO)),
-            ('Cancelados', sum(1 for t in turnos if t.estado.lower() == ESTADO_CANCELADO.lower()), HexColor(PDF_COLOR_CANCELADO)),
-            ('Asistidos', sum(1 for t in turnos if t.estado.lower() == ESTADO_ASISTIDO.lower()), HexColor(PDF_COLOR_ASISTIDO))
-        ]
-        
-        for label, valor, color in stats:
-            stats_tabla.append_layout_element(crear_paragraph(
-                f"{label}\n{valor}", 
-                font=PDF_FONT_BOLD, 
-                font_size=PDF_FONTSIZE_NORMAL, 
-                font_color=color,
-                border_width_left=Decimal(PDF_BORDER_MEDIO), 
-                border_color=color,
-                padding_top=Decimal(PDF_PADDING_GRANDE), 
-                padding_bottom=Decimal(PDF_PADDING_GRANDE), 
-                padding_left=Decimal(PDF_PADDING_GRANDE), 
-                padding_right=Decimal(PDF_PADDING_GRANDE),
-                horizontal_alignment=LayoutElement.HorizontalAlignment.MIDDLE
-            ))
-        
-        stats_tabla.no_borders()
-        layout.append_layout_element(stats_tabla)
-        layout.append_layout_element(Paragraph(" "))
-        layout.append_layout_element(crear_paragraph(
-            "DETALLE DE TURNOS", 
-            font=PDF_FONT_BOLD,
-            font_size=PDF_FONTSIZE_SUBTITULO, 
-            font_color=HexColor(PDF_COLOR_PRIMARIO)
-        ))
-        layout.append_layout_element(crear_tabla_turnos(turnos, incluir_persona=False, incluir_fecha=True))
+        pdf.resumen([
+            ('Total', len(turnos), PDF_COLOR_TEXTO_GRIS_CLARO),
+            ('Confirmados', sum(1 for t in turnos if t.estado.lower() == ESTADO_CONFIRMADO.lower()), PDF_COLOR_CONFIRMADO),
+            ('Cancelados', sum(1 for t in turnos if t.estado.lower() == ESTADO_CANCELADO.lower()), PDF_COLOR_CANCELADO),
+            ('Asistidos', sum(1 for t in turnos if t.estado.lower() == ESTADO_ASISTIDO.lower()), PDF_COLOR_ASISTIDO)
+        ])
+        pdf.espacio()
+        pdf.texto("DETALLE DE TURNOS", ESTILO_SUBTITULO)
+        agregar_tabla_turnos(pdf, turnos, incluir_persona=False, incluir_fecha=True)
     else:
-        layout.append_layout_element(crear_paragraph(
-            MSG_SIN_TURNOS_PERSONA,
-            font_color=HexColor(PDF_COLOR_ALERTA), 
-            padding_top=Decimal(PDF_PADDING_MUY_GRANDE)
-        ))
-    
-    return finalizar_pdf(doc, f"historial_{persona.dni}.pdf")
+        pdf.texto(MSG_SIN_TURNOS_PERSONA, ESTILO_ALERTA)
+
+    return pdf.finalizar(f"historial_{persona.dni}.pdf")
 
 
 
-def generar_pdf_personas_con_cancelaciones(min_cancelados: int, turnos: List[Turno]) -> StreamingResponse:
-    doc, layout = crear_pdf_base(f"Personas con {min_cancelados}+ Turnos Cancelados", None)
-    
+def generar_pdf_personas_con_cancelaciones(min_cancelados: int, turnos: List[FilaTurno], renderizador: Optional[str] = None) -> tuple[bytes, str]:
+    pdf = crear_renderizador(f"Personas con {min_cancelados}+ Turnos Cancelados", None, len(turnos), renderizador)
+
     if turnos:
-        agregar_turnos_agrupados_por_persona(layout, turnos, incluir_fecha=True)
+        agregar_turnos_agrupados_por_persona(pdf, turnos, incluir_fecha=True)
     else:
-        layout.append_layout_element(crear_paragraph(f"No hay personas con {min_cancelados}+ cancelaciones."))
-    
-    return finalizar_pdf(doc, f"cancelaciones_min_{min_cancelados}.pdf")
+        pdf.texto(f"No hay personas con {min_cancelados}+ cancelaciones.")
+
+    return pdf.finalizar(f"cancelaciones_min_{min_cancelados}.pdf")
+
 
 
+def generar_pdf_turnos_confirmados(desde: date, hasta: date, turnos: List[FilaTurno], renderizador: Optional[str] = None) -> tuple[bytes, str]:
+    pdf = crear_renderizador("Turnos Confirmados", f"{desde} a {hasta} - Total: {len(turnos)}", len(turnos), renderizador)
 
-def generar_pdf_turnos_confirmados(desde: date, hasta: date, turnos: List[Turno]) -> StreamingResponse:
-    doc, layout = crear_pdf_base("Turnos Confirmados", f"{desde} a {hasta} - Total: {len(turnos)}")
-    
     if turnos:
-        agregar_turnos_agrupados_por_persona(layout, turnos, incluir_fecha=True)
+        agregar_turnos_agrupados_por_persona(pdf, turnos, incluir_fecha=True)
     else:
-        layout.append_layout_element(crear_paragraph(MSG_SIN_TURNOS_CONFIRMADOS))
-    
-    return finalizar_pdf(doc, f"confirmados_{desde}_a_{hasta}.pdf")
+        pdf.texto(MSG_SIN_TURNOS_CONFIRMADOS)
 
+    return pdf.finalizar(f"confirmados_{desde}_a_{hasta}.pdf")
 
-def generar_pdf_estado_personas(habilitado: bool, personas: List[Persona]) -> StreamingResponse:
+
+def generar_pdf_estado_personas(habilitado: bool, personas: List[FilaPersona], renderizador: Optional[str] = None) -> tuple[bytes, str]:
     estado = "Habilitadas" if habilitado else "Deshabilitadas"
-    doc, layout = crear_pdf_base(f"Personas {estado}", f"Total: {len(personas)}")
-    
+    pdf = crear_renderizador(f"Personas {estado}", f"Total: {len(personas)}", len(personas), renderizador)
+
     if personas:
-        layout.append_layout_element(crear_tabla_personas(personas, incluir_completo=True))
+        agregar_tabla_personas(pdf, personas, incluir_completo=True)
     else:
-        layout.append_layout_element(crear_paragraph(f"No hay personas {estado.lower()}."))
-    
-    return finalizar_pdf(doc, f"personas_{estado.lower()}.pdf")
\ No newline at end of file
+        pdf.texto(f"No hay personas {estado.lower()}.")
+
+    return pdf.finalizar(f"personas_{estado.lower()}.pdf")
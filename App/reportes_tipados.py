@@ -0,0 +1,192 @@
+import io
+import json
+from datetime import date
+from itertools import groupby
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
+
+from fastapi.responses import StreamingResponse
+
+from .utils import calcular_edad
+from .models import Persona, Turno
+from .config import FILAS_POR_BLOQUE, PARQUET_FILAS_POR_GRUPO
+
+
+# Reportes con columnas tipadas para consumo masivo: NDJSON (un objeto JSON por línea) y Parquet.
+# Las filas son las mismas que las de los CSV, pero las fechas, horas, números y booleanos conservan
+# su tipo y las columnas usan los nombres de los campos de la API.
+
+FORMATO_NDJSON = "ndjson"
+FORMATO_PARQUET = "parquet"
+
+MEDIA_TYPES = {
+    FORMATO_NDJSON: "application/x-ndjson",
+    FORMATO_PARQUET: "application/vnd.apache.parquet",
+}
+
+# Columnas de cada reporte: nombre y tipo (alias de tipos de pyarrow)
+COLUMNAS_TURNO = [
+    ("id", "int64"), ("persona_id", "int64"), ("nombre", "string"), ("dni", "string"),
+    ("fecha", "date32"), ("hora", "time64[us]"), ("estado", "string")
+]
+COLUMNAS_TURNOS_PERSONA = [
+    ("dni", "string"), ("nombre", "string"), ("id", "int64"),
+    ("fecha", "date32"), ("hora", "time64[us]"), ("estado", "string")
+]
+COLUMNAS_CANCELACIONES = COLUMNAS_TURNO + [("cantidad_cancelados", "int64")]
+COLUMNAS_PERSONA = [
+    ("id", "int64"), ("nombre", "string"), ("dni", "string"), ("email", "string"), ("telefono", "string"),
+    ("fecha_nacimiento", "date32"), ("edad", "int64"), ("habilitado", "bool")
+]
+
+
+class ReporteTipado(NamedTuple):
+    columnas: List[Tuple[str, str]]
+    filas: Iterable[dict]
+    nombre: str
+
+
+# ==================== Utilidades ====================
+
+def crear_fila_turno(turno: Turno, **campos_extra) -> dict:
+    fila = {
+        "id": turno.id,
+        "persona_id": turno.persona_id,
+        "nombre": turno.persona.nombre,
+        "dni": turno.persona.dni,
+        "fecha": turno.fecha,
+        "hora": turno.hora,
+        "estado": turno.estado
+    }
+    fila.update(campos_extra)
+    return fila
+
+
+def crear_fila_persona(persona: Persona) -> dict:
+    return {
+        "id": persona.id,
+        "nombre": persona.nombre,
+        "dni": persona.dni,
+        "email": persona.email,
+        "telefono": persona.telefono,
+        "fecha_nacimiento": persona.fecha_nacimiento,
+        "edad": calcular_edad(persona.fecha_nacimiento),
+        "habilitado": persona.habilitado
+    }
+
+
+def serializar_valor(valor):
+    # date y time van en formato ISO, igual que en las respuestas JSON
+    return valor.isoformat()
+
+
+def generar_bloques_ndjson(reporte: ReporteTipado) -> Iterator[str]:
+    lineas = []
+    for fila in reporte.filas:
+        lineas.append(json.dumps(fila, default=serializar_valor, ensure_ascii=False))
+        if len(lineas) == FILAS_POR_BLOQUE:
+            yield "\n".join(lineas) + "\n"
+            lineas = []
+    if lineas:
+        yield "\n".join(lineas) + "\n"
+
+
+class SalidaPorBloques(io.RawIOBase):
+    # Destino del escritor de Parquet que entrega lo escrito de a bloques: conserva la posición total
+    # (el pie del archivo guarda la posición de cada grupo de filas) pero no el contenido ya enviado
+
+    def __init__(self):
+        self._bloques = []
+        self._posicion = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, datos) -> int:
+        self._bloques.append(bytes(datos))
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self) -> int:
+        return self._posicion
+
+    def vaciar(self) -> bytes:
+        datos = b"".join(self._bloques)
+        self._bloques.clear()
+        return datos
+
+
+def generar_bloques_parquet(reporte: ReporteTipado) -> Iterator[bytes]:
+    # pyarrow se importa recién con el primer Parquet, como borb con los PDF
+    import pyarrow
+    import pyarrow.parquet
+
+    esquema = pyarrow.schema([(nombre, pyarrow.type_for_alias(tipo)) for nombre, tipo in reporte.columnas])
+    salida = SalidaPorBloques()
+    escritor = pyarrow.parquet.ParquetWriter(salida, esquema)
+    try:
+        # Cada PARQUET_FILAS_POR_GRUPO filas se escribe un grupo de filas y se envía
+        filas = iter(reporte.filas)
+        while True:
+            grupo = [fila for _, fila in zip(range(PARQUET_FILAS_POR_GRUPO), filas)]
+            if not grupo:
+                break
+            escritor.write_table(pyarrow.Table.from_pylist(grupo, schema=esquema))
+            yield salida.vaciar()
+    finally:
+        escritor.close()
+    yield salida.vaciar()
+
+
+def transmitir_reporte_tipado(formato: str, reporte: ReporteTipado) -> StreamingResponse:
+    bloques = generar_bloques_parquet(reporte) if formato == FORMATO_PARQUET else generar_bloques_ndjson(reporte)
+    return StreamingResponse(
+        bloques,
+        media_type=MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f"attachment; filename={reporte.nombre}.{formato}"}
+    )
+
+
+# ==================== Reportes ====================
+# Reciben listas u otros iterables (por ejemplo utils.iterar_consulta) y los recorren una sola vez
+
+def reporte_turnos_por_fecha(fecha: date, turnos: Iterable[Turno]) -> ReporteTipado:
+    filas = (crear_fila_turno(turno) for turno in turnos)
+    return ReporteTipado(COLUMNAS_TURNO, filas, f"turnos_{fecha}")
+
+
+def reporte_turnos_cancelados_mes(mes: str, anio: int, turnos: Iterable[Turno]) -> ReporteTipado:
+    filas = (crear_fila_turno(turno) for turno in turnos)
+    return ReporteTipado(COLUMNAS_TURNO, filas, f"cancelados_{mes}_{anio}")
+
+
+def reporte_turnos_por_persona(persona: Persona, turnos: Iterable[Turno]) -> ReporteTipado:
+    # Los datos de la persona se copian antes de transmitir: el objeto es de la sesión del request
+    dni, nombre = persona.dni, persona.nombre
+    filas = (
+        {"dni": dni, "nombre": nombre, "id": turno.id,
+         "fecha": turno.fecha, "hora": turno.hora, "estado": turno.estado}
+        for turno in turnos
+    )
+    return ReporteTipado(COLUMNAS_TURNOS_PERSONA, filas, f"historial_{dni}")
+
+
+def reporte_personas_con_cancelaciones(min_cancelados: int, turnos: Iterable[Turno]) -> ReporteTipado:
+    # Los turnos vienen ordenados por persona: se agrupan de a una persona para conocer su cantidad de cancelados
+    def generar_filas():
+        for _, turnos_persona in groupby(turnos, key=lambda turno: turno.persona_id):
+            turnos_persona = list(turnos_persona)
+            for turno in turnos_persona:
+                yield crear_fila_turno(turno, cantidad_cancelados=len(turnos_persona))
+
+    return ReporteTipado(COLUMNAS_CANCELACIONES, generar_filas(), f"cancelaciones_min_{min_cancelados}")
+
+
+def reporte_turnos_confirmados(desde: date, hasta: date, turnos: Iterable[Turno]) -> ReporteTipado:
+    filas = (crear_fila_turno(turno) for turno in turnos)
+    return ReporteTipado(COLUMNAS_TURNO, filas, f"confirmados_{desde}_a_{hasta}")
+
+
+def reporte_estado_personas(habilitado: bool, personas: Iterable[Persona]) -> ReporteTipado:
+    estado_texto = "habilitadas" if habilitado else "deshabilitadas"
+    filas = (crear_fila_persona(persona) for persona in personas)
+    return ReporteTipado(COLUMNAS_PERSONA, filas, f"personas_{estado_texto}")
@@ -1,6 +1,6 @@
-from datetime import date, time
+from datetime import date, time, datetime
 from pydantic import BaseModel, EmailStr, field_validator
-from typing import Optional, List
+from typing import Dict, Literal, Optional, List
 
 from .config import ESTADO_PENDIENTE
 
@@ -91,11 +91,35 @@ class TurnoRespuesta(BaseModel):
     estado: str
 
 
+class ResultadoTurnoLote(BaseModel):
+    indice: int
+    turno: Optional[TurnoRespuesta] = None
+    error: Optional[str] = None
+
+
+class RespuestaTurnosLote(BaseModel):
+    creados: int
+    rechazados: int
+    resultados: List[ResultadoTurnoLote]
+
+
 class TurnosDisponiblesRespuesta(BaseModel):
     fecha: date
     horarios_disponibles: List[time]
 
 
+class DisponibilidadDia(BaseModel):
+    fecha: date
+    cantidad_disponibles: int
+    horarios_disponibles: Optional[List[time]] = None
+
+
+class CalendarioDisponibilidadRespuesta(BaseModel):
+    desde: date
+    hasta: date
+    dias: List[DisponibilidadDia]
+
+
 # Schemas de respuesta para personas
 class PersonaRespuesta(BaseModel):
     id: int
@@ -108,6 +132,18 @@ class PersonaRespuesta(BaseModel):
     habilitado: bool
 
 
+class ErrorImportacionPersona(BaseModel):
+    fila: int
+    error: str
+
+
+class RespuestaImportacionPersonas(BaseModel):
+    procesadas: int
+    creadas: int
+    rechazadas: int
+    errores: List[ErrorImportacionPersona]
+
+
 # Schemas para reportes
 class PersonaSimple(BaseModel):
     id: int
@@ -158,6 +194,15 @@ class ReporteTurnosConfirmadosPaginado(BaseModel):
     pagina: int
     total_turnos: int
     total_paginas: int
+    next_cursor: Optional[str] = None
+    turnos: List[TurnoReporte]
+
+
+class ReporteTurnosConfirmadosCursor(BaseModel):
+    # Página pedida con cursor: no lleva número de página ni total (no se recalcula en cada página)
+    desde: date
+    hasta: date
+    next_cursor: Optional[str] = None
     turnos: List[TurnoReporte]
 
 
@@ -176,3 +221,67 @@ class ReporteEstadoPersonas(BaseModel):
     habilitado: bool
     cantidad_personas: int
     personas: List[PersonaCompleta]
+
+
+class OcupacionDia(BaseModel):
+    fecha: date
+    capacidad: int
+    ocupados: int
+    porcentaje_ocupacion: float
+    por_estado: Dict[str, int]
+
+
+class OcupacionHorario(BaseModel):
+    hora: time
+    capacidad: int
+    ocupados: int
+    porcentaje_ocupacion: float
+    por_estado: Dict[str, int]
+
+
+class ReporteOcupacion(BaseModel):
+    desde: date
+    hasta: date
+    cantidad_dias: int
+    capacidad: int
+    ocupados: int
+    porcentaje_ocupacion: float
+    total_turnos: int
+    por_estado: Dict[str, int]
+    tasa_cancelacion: Optional[float] = None
+    tasa_ausentismo: Optional[float] = None
+    dias: List[OcupacionDia]
+    horarios: List[OcupacionHorario]
+
+
+# Reportes en segundo plano (POST /reportes/jobs)
+class parametros_reporte_base(BaseModel):
+    fecha: Optional[str] = None
+    dni: Optional[str] = None
+    min: Optional[int] = None
+    desde: Optional[str] = None
+    hasta: Optional[str] = None
+    habilitado: Optional[bool] = None
+    renderizador: Optional[Literal["borb", "rapido"]] = None
+
+
+class trabajo_reporte_base(BaseModel):
+    formato: Literal["pdf", "csv", "ndjson", "parquet"]
+    reporte: Literal["turnos-por-fecha", "turnos-cancelados-por-mes", "turnos-por-persona",
+                     "turnos-cancelados", "turnos-confirmados", "estado-personas"]
+    parametros: parametros_reporte_base = parametros_reporte_base()
+
+
+class TrabajoReporteRespuesta(BaseModel):
+    id: str
+    formato: str
+    reporte: str
+    estado: str
+    progreso: int
+    bytes_generados: int
+    filename: Optional[str] = None
+    codigo_error: Optional[int] = None
+    error: Optional[str] = None
+    creado: datetime
+    actualizado: datetime
+    url_descarga: Optional[str] = None
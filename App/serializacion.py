@@ -0,0 +1,49 @@
+from typing import List, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from .schemas import (PersonaRespuesta, TurnoRespuesta, PersonaConTurnos, ReporteTurnosPorFecha, ReporteTurnosCancelados,
+                      ReportePersonasConCancelaciones, ReporteTurnosConfirmadosPaginado, ReporteTurnosConfirmadosCursor,
+                      ReporteEstadoPersonas, ReporteOcupacion)
+
+
+class Serializador:
+    # Serializa la respuesta de un endpoint con una sola validación: los datos (filas Row, objetos del ORM
+    # o dicts) se validan contra el esquema leyendo sus atributos y se codifican a JSON con pydantic-core.
+    # El endpoint devuelve los bytes ya codificados, así FastAPI no vuelve a validar ni a serializar la
+    # respuesta; el response_model del decorador queda para el esquema OpenAPI.
+
+    def __init__(self, tipo, exclude_none: bool = False):
+        self.adaptador = TypeAdapter(tipo)
+        self.exclude_none = exclude_none
+
+    def codificar(self, datos) -> bytes:
+        valor = self.adaptador.validate_python(datos, from_attributes=True)
+        return self.adaptador.dump_json(valor, exclude_none=self.exclude_none)
+
+    def responder(self, datos, headers: Optional[dict] = None) -> Response:
+        # Una Response se envía tal cual: los headers (por ejemplo X-Next-Cursor) van en la misma respuesta
+        return Response(content=self.codificar(datos), media_type="application/json", headers=headers)
+
+
+def filas_a_dicts(filas) -> List[dict]:
+    # pydantic valida un dict bastante más rápido que los atributos de una Row: las claves se toman una vez
+    if not filas:
+        return []
+    claves = filas[0]._fields
+    return [dict(zip(claves, fila)) for fila in filas]
+
+
+# Un serializador por respuesta: el TypeAdapter se arma una sola vez al importar.
+# exclude_none coincide con el response_model_exclude_none de cada endpoint
+serializador_personas = Serializador(List[PersonaRespuesta])
+serializador_turnos = Serializador(List[TurnoRespuesta])
+serializador_turnos_por_fecha = Serializador(ReporteTurnosPorFecha, exclude_none=True)
+serializador_turnos_cancelados_mes = Serializador(ReporteTurnosCancelados, exclude_none=True)
+serializador_turnos_por_persona = Serializador(PersonaConTurnos, exclude_none=True)
+serializador_personas_con_cancelaciones = Serializador(ReportePersonasConCancelaciones, exclude_none=True)
+serializador_turnos_confirmados = Serializador(ReporteTurnosConfirmadosPaginado, exclude_none=True)
+serializador_turnos_confirmados_cursor = Serializador(ReporteTurnosConfirmadosCursor, exclude_none=True)
+serializador_estado_personas = Serializador(ReporteEstadoPersonas)
+serializador_ocupacion = Serializador(ReporteOcupacion)
@@ -0,0 +1,227 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time as reloj
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+
+from .config import (REPORTES_TRABAJOS_DIRECTORIO, REPORTES_TRABAJOS_TTL_SEGUNDOS, REPORTES_TRABAJOS_MAX_CONCURRENTES,
+                     REPORTES_TRABAJOS_MAX_PENDIENTES, REPORTES_TRABAJOS_REINTENTAR_SEGUNDOS)
+
+
+logger = logging.getLogger("uvicorn.error")
+
+TRABAJO_PENDIENTE = "pendiente"
+TRABAJO_EN_PROCESO = "en_proceso"
+TRABAJO_TERMINADO = "terminado"
+TRABAJO_ERROR = "error"
+
+# Progreso informado en cada etapa (el total de filas no se conoce hasta terminar)
+PROGRESO_CONSULTANDO = 10
+PROGRESO_ESCRIBIENDO = 50
+
+# Cada cuánto se actualiza el estado mientras se escribe un CSV
+SEGUNDOS_ENTRE_ACTUALIZACIONES = 1
+
+FORMATO_ID_TRABAJO = re.compile(r"[0-9a-f]{32}")
+
+
+class TrabajosReportes:
+    # Genera reportes en segundo plano y guarda el resultado en una carpeta local.
+    # El estado de cada trabajo se guarda junto al archivo ({id}.json), así cualquier worker
+    # puede informarlo y servir la descarga. Los trabajos se borran cuando pasan ttl_segundos sin
+    # cambios (terminados, con error o abandonados por un reinicio de la API).
+
+    def __init__(self, directorio: str, ttl_segundos: int, max_concurrentes: int, max_pendientes: int, reintentar_segundos: int):
+        self.directorio = directorio
+        self.ttl_segundos = ttl_segundos
+        self.max_pendientes = max_pendientes
+        self.reintentar_segundos = reintentar_segundos
+        self._concurrentes = None
+        self._max_concurrentes = max_concurrentes
+        self._pendientes = 0
+        self._tareas = set()
+        self._candado = threading.Lock()
+
+    # ---------- Archivos ----------
+
+    def _ruta(self, nombre: str) -> str:
+        return os.path.join(self.directorio, nombre)
+
+    def ruta_resultado(self, trabajo: dict) -> str:
+        return self._ruta(f"{trabajo['id']}.{trabajo['formato']}")
+
+    def _guardar(self, trabajo: dict) -> None:
+        # Se escribe en un temporal y se reemplaza para que nunca se lea un estado a medias
+        trabajo["actualizado"] = datetime.now().isoformat()
+        temporal = self._ruta(f"{trabajo['id']}.json.tmp")
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump(trabajo, archivo)
+        os.replace(temporal, self._ruta(f"{trabajo['id']}.json"))
+
+    def _leer(self, id_trabajo: str) -> Optional[dict]:
+        try:
+            with open(self._ruta(f"{id_trabajo}.json"), encoding="utf-8") as archivo:
+                return json.load(archivo)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _vencido(self, trabajo: dict) -> bool:
+        # Un trabajo en proceso se actualiza seguido; si no cambia en todo el TTL quedó abandonado
+        actualizado = datetime.fromisoformat(trabajo["actualizado"])
+        return datetime.now() - actualizado > timedelta(seconds=self.ttl_segundos)
+
+    def _eliminar(self, id_trabajo: str) -> None:
+        for nombre in os.listdir(self.directorio):
+            if nombre.startswith(id_trabajo):
+                try:
+                    os.remove(self._ruta(nombre))
+                except FileNotFoundError:
+                    pass
+
+    def limpiar_vencidos(self) -> int:
+        # Borra los trabajos terminados hace más del TTL y los archivos sueltos igual de viejos
+        # (por ejemplo, de un trabajo que quedó a medias al reiniciar la API)
+        os.makedirs(self.directorio, exist_ok=True)
+        limite = datetime.now().timestamp() - self.ttl_segundos
+        eliminados = 0
+        for nombre in os.listdir(self.directorio):
+            id_trabajo = nombre.split(".", 1)[0]
+            trabajo = self._leer(id_trabajo) if nombre.endswith(".json") else None
+            if trabajo is not None:
+                vencido = self._vencido(trabajo)
+            else:
+                try:
+                    vencido = os.path.getmtime(self._ruta(nombre)) < limite and not os.path.exists(self._ruta(f"{id_trabajo}.json"))
+                except FileNotFoundError:
+                    continue
+            if vencido:
+                self._eliminar(id_trabajo)
+                eliminados += 1
+        return eliminados
+
+    # ---------- Trabajos ----------
+
+    def obtener(self, id_trabajo: str) -> Optional[dict]:
+        if not FORMATO_ID_TRABAJO.fullmatch(id_trabajo):
+            return None
+        trabajo = self._leer(id_trabajo)
+        if trabajo is not None and self._vencido(trabajo):
+            self._eliminar(id_trabajo)
+            return None
+        return trabajo
+
+    def crear(self, formato: str, reporte: str, generar: Callable[[], Awaitable[Response]]) -> dict:
+        with self._candado:
+            if self._pendientes >= self.max_pendientes:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Hay demasiados reportes en espera, intente nuevamente más tarde",
+                    headers={"Retry-After": str(self.reintentar_segundos)}
+                )
+            self._pendientes += 1
+
+        os.makedirs(self.directorio, exist_ok=True)
+        trabajo = {
+            "id": uuid.uuid4().hex,
+            "formato": formato,
+            "reporte": reporte,
+            "estado": TRABAJO_PENDIENTE,
+            "progreso": 0,
+            "bytes_generados": 0,
+            "filename": None,
+            "codigo_error": None,
+            "error": None,
+            "creado": datetime.now().isoformat(),
+        }
+        self._guardar(trabajo)
+
+        # Se guarda la referencia a la tarea para que no la libere el recolector antes de terminar
+        tarea = asyncio.create_task(self._ejecutar(trabajo, generar))
+        self._tareas.add(tarea)
+        tarea.add_done_callback(self._tareas.discard)
+        return trabajo
+
+    async def _ejecutar(self, trabajo: dict, generar: Callable[[], Awaitable[Response]]) -> None:
+        if self._concurrentes is None:
+            self._concurrentes = asyncio.Semaphore(self._max_concurrentes)
+        try:
+            async with self._concurrentes:
+                trabajo.update(estado=TRABAJO_EN_PROCESO, progreso=PROGRESO_CONSULTANDO)
+                await run_in_threadpool(self._guardar, trabajo)
+                respuesta = await self._generar_con_reintentos(generar)
+                await self._escribir_resultado(trabajo, respuesta)
+                trabajo.update(estado=TRABAJO_TERMINADO, progreso=100)
+        except HTTPException as error:
+            trabajo.update(estado=TRABAJO_ERROR, codigo_error=error.status_code, error=error.detail)
+        except asyncio.CancelledError:
+            # La API se está cerrando: el trabajo queda como error para que no figure en proceso
+            trabajo.update(estado=TRABAJO_ERROR, codigo_error=503, error="El reporte se interrumpió al reiniciar la API")
+            self._guardar(trabajo)
+            raise
+        except Exception:
+            logger.exception("Error al generar el reporte %s (%s)", trabajo["id"], trabajo["reporte"])
+            trabajo.update(estado=TRABAJO_ERROR, codigo_error=500, error="Error al generar el reporte")
+        finally:
+            with self._candado:
+                self._pendientes -= 1
+        await run_in_threadpool(self._guardar, trabajo)
+
+    async def _generar_con_reintentos(self, generar: Callable[[], Awaitable[Response]]) -> Response:
+        # Si el pool de PDF está lleno (503) el trabajo espera y reintenta en vez de fallar
+        while True:
+            try:
+                return await generar()
+            except HTTPException as error:
+                if error.status_code != 503:
+                    raise
+                await asyncio.sleep(int((error.headers or {}).get("Retry-After", "1")))
+
+    async def _escribir_resultado(self, trabajo: dict, respuesta: Response) -> None:
+        trabajo.update(progreso=PROGRESO_ESCRIBIENDO, filename=nombre_archivo(respuesta))
+        await run_in_threadpool(self._guardar, trabajo)
+
+        parcial = self._ruta(f"{trabajo['id']}.parcial")
+        archivo = await run_in_threadpool(open, parcial, "wb")
+        try:
+            if hasattr(respuesta, "body_iterator"):
+                # CSV: se escribe a medida que se genera, de a bloques
+                ultima_actualizacion = reloj.monotonic()
+                async for bloque in respuesta.body_iterator:
+                    if isinstance(bloque, str):
+                        bloque = bloque.encode(respuesta.charset)
+                    await run_in_threadpool(archivo.write, bloque)
+                    trabajo["bytes_generados"] += len(bloque)
+                    if reloj.monotonic() - ultima_actualizacion >= SEGUNDOS_ENTRE_ACTUALIZACIONES:
+                        await run_in_threadpool(self._guardar, trabajo)
+                        ultima_actualizacion = reloj.monotonic()
+            else:
+                await run_in_threadpool(archivo.write, respuesta.body)
+                trabajo["bytes_generados"] = len(respuesta.body)
+        finally:
+            await run_in_threadpool(archivo.close)
+        os.replace(parcial, self.ruta_resultado(trabajo))
+
+    async def cerrar(self) -> None:
+        for tarea in list(self._tareas):
+            tarea.cancel()
+        await asyncio.gather(*self._tareas, return_exceptions=True)
+
+
+def nombre_archivo(respuesta: Response) -> Optional[str]:
+    disposicion = respuesta.headers.get("content-disposition", "")
+    _, separador, filename = disposicion.partition("filename=")
+    return filename.strip('"') if separador else None
+
+
+trabajos_reportes = TrabajosReportes(
+    REPORTES_TRABAJOS_DIRECTORIO, REPORTES_TRABAJOS_TTL_SEGUNDOS,
+    REPORTES_TRABAJOS_MAX_CONCURRENTES, REPORTES_TRABAJOS_MAX_PENDIENTES, REPORTES_TRABAJOS_REINTENTAR_SEGUNDOS
+)
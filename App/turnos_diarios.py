@@ -0,0 +1,112 @@
+import sys
+from collections import Counter
+from datetime import date
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as insert_sqlite
+from sqlalchemy.orm import Session
+
+from .models import Turno, TurnoDiario
+from .cache_reportes import cache_reportes
+from .config import ESTADO_CANCELADO, HORARIOS_DISPONIBLES
+
+
+def registrar_turnos_diarios(db: Session, anteriores=(), nuevos=()):
+
+    # anteriores y nuevos son (fecha, hora, estado) de los turnos antes y después del cambio
+    # Se llama antes del commit para que los contadores y los turnos se guarden juntos
+    diferencias = Counter(nuevos)
+    diferencias.subtract(anteriores)
+    filas = [
+        {"fecha": fecha, "hora": hora, "estado": estado, "cantidad": diferencia}
+        for (fecha, hora, estado), diferencia in diferencias.items() if diferencia
+    ]
+    if not filas:
+        return
+
+    consulta = insert_sqlite(TurnoDiario)
+    db.execute(consulta.on_conflict_do_update(
+        index_elements=[TurnoDiario.fecha, TurnoDiario.hora, TurnoDiario.estado],
+        set_={"cantidad": TurnoDiario.cantidad + consulta.excluded.cantidad}
+    ), filas)
+
+
+def contar_turnos_diarios(db: Session, fecha_desde: date, fecha_hasta: date, estado: str):
+
+    # Cantidad de turnos de un estado en el período, sin recorrer la tabla de turnos
+    return db.query(func.coalesce(func.sum(TurnoDiario.cantidad), 0)).filter(
+        TurnoDiario.fecha >= fecha_desde,
+        TurnoDiario.fecha <= fecha_hasta,
+        TurnoDiario.estado == estado
+    ).scalar()
+
+
+def contar_ocupados_por_fecha(db: Session, fecha_desde: date, fecha_hasta: date):
+
+    # Horarios de la grilla ocupados (turnos no cancelados) de cada fecha del período
+    return dict(db.query(TurnoDiario.fecha, func.sum(TurnoDiario.cantidad)).filter(
+        TurnoDiario.fecha >= fecha_desde,
+        TurnoDiario.fecha <= fecha_hasta,
+        TurnoDiario.estado != ESTADO_CANCELADO,
+        TurnoDiario.hora.in_(HORARIOS_DISPONIBLES)
+    ).group_by(TurnoDiario.fecha).all())
+
+
+def consulta_turnos_diarios(db: Session, fecha_desde: date, fecha_hasta: date):
+    # Contadores del período (estado, fecha, hora, cantidad), ordenados por estado
+    return db.query(TurnoDiario.estado, TurnoDiario.fecha, TurnoDiario.hora, TurnoDiario.cantidad).filter(
+        TurnoDiario.fecha >= fecha_desde,
+        TurnoDiario.fecha <= fecha_hasta,
+        TurnoDiario.cantidad != 0
+    ).order_by(TurnoDiario.estado, TurnoDiario.fecha, TurnoDiario.hora)
+
+
+def recuento_turnos():
+    # Los mismos contadores, calculados desde la tabla de turnos
+    return select(Turno.fecha, Turno.hora, Turno.estado, func.count(Turno.id)).group_by(Turno.fecha, Turno.hora, Turno.estado)
+
+
+def reconstruir_turnos_diarios(db: Session):
+
+    # Recalcula todos los contadores desde la tabla de turnos
+    db.execute(delete(TurnoDiario))
+    db.execute(insert(TurnoDiario).from_select(["fecha", "hora", "estado", "cantidad"], recuento_turnos()))
+    db.commit()
+    # La ocupación y los totales de turnos confirmados salen de este resumen
+    cache_reportes.invalidar()
+
+    return db.query(func.count()).select_from(TurnoDiario).scalar()
+
+
+def verificar_turnos_diarios(db: Session):
+
+    # Compara los contadores con un recuento de la tabla de turnos (la recorre completa).
+    # Devuelve (fecha, hora, estado, cantidad en turnos, cantidad registrada) de cada diferencia
+    esperados = {(fecha, hora, estado): cantidad for fecha, hora, estado, cantidad in db.execute(recuento_turnos())}
+    registrados = {
+        (fecha, hora, estado): cantidad
+        for fecha, hora, estado, cantidad in db.query(TurnoDiario.fecha, TurnoDiario.hora, TurnoDiario.estado, TurnoDiario.cantidad)
+        if cantidad != 0
+    }
+
+    return [
+        (*clave, esperados.get(clave, 0), registrados.get(clave, 0))
+        for clave in sorted(esperados.keys() | registrados.keys())
+        if esperados.get(clave, 0) != registrados.get(clave, 0)
+    ]
+
+
+if __name__ == "__main__":
+    # Reparación: python -m App.turnos_diarios    Verificación: python -m App.turnos_diarios --verificar
+    from .database import Base, engine, SesionLocal
+
+    Base.metadata.create_all(bind=engine)
+    with SesionLocal() as db:
+        if "--verificar" not in sys.argv[1:]:
+            print(f"Resumen diario de turnos reconstruido: {reconstruir_turnos_diarios(db)} filas (fecha, hora, estado)")
+            sys.exit(0)
+
+        diferencias = verificar_turnos_diarios(db)
+        for fecha, hora, estado, esperado, registrado in diferencias:
+            print(f"{fecha} {hora} {estado}: {esperado} turnos, {registrado} en el resumen")
+        print(f"Resumen diario de turnos: {len(diferencias)} diferencia(s)")
+        sys.exit(1 if diferencias else 0)
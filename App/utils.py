@@ -1,9 +1,14 @@
+from contextlib import asynccontextmanager
 from datetime import date, time, datetime, timedelta
+from functools import wraps
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+import base64
 import calendar
 
-from .config import ESTADO_ASISTIDO, ESTADO_CANCELADO, MAX_EDAD_PERMITIDA
-from .database import SesionLocal
+from .config import ESTADO_ASISTIDO, ESTADO_CANCELADO, MAX_EDAD_PERMITIDA, LIMIT_LISTADO_MAXIMO, MODO_ASYNC, FILAS_POR_BLOQUE
+from .database import SesionLocal, SesionAsync
 
 
 def generar_horarios_disponibles(horario_inicio: str, horario_fin: str, intervalo_minutos: int):
@@ -21,7 +26,7 @@ def generar_horarios_disponibles(horario_inicio: str, horario_fin: str, interval
     return horarios_disponibles
 
 #Acceder a la base de datos
-def get_db():
+def get_db_sync():
     db = SesionLocal()
     try:
         yield db
@@ -29,6 +34,76 @@ def get_db():
         db.close()
 
 
+async def get_db_async():
+    async with SesionAsync() as db:
+        yield db
+
+
+# Los endpoints dependen de get_db; el modo se elige con MODO_ASYNC
+get_db = get_db_async if MODO_ASYNC else get_db_sync
+
+
+@asynccontextmanager
+async def abrir_sesion():
+    # Sesión del mismo tipo que get_db, para código que corre fuera de un request (trabajos en segundo plano)
+    if MODO_ASYNC:
+        async with SesionAsync() as db:
+            yield db
+    else:
+        with SesionLocal() as db:
+            yield db
+
+
+def version_async(funcion):
+    # Versión async de una función CRUD: con AsyncSession corre sobre la conexión async (run_sync),
+    # con Session corre en el threadpool para no bloquear el event loop
+    @wraps(funcion)
+    async def funcion_async(db, *args, **kwargs):
+        if isinstance(db, AsyncSession):
+            return await db.run_sync(funcion, *args, **kwargs)
+        return await run_in_threadpool(funcion, db, *args, **kwargs)
+    return funcion_async
+
+
+def version_threadpool(funcion):
+    # Versión async de una función CRUD con mucho trabajo de CPU (miles de objetos del ORM, un CSV):
+    # corre siempre en el threadpool. Con AsyncSession, run_sync la correría en el hilo del event loop,
+    # así que usa una Session sync propia, que confirma o descarta sus propios cambios
+    @wraps(funcion)
+    async def funcion_async(db, *args, **kwargs):
+        if isinstance(db, AsyncSession):
+            return await run_in_threadpool(ejecutar_con_sesion_propia, funcion, *args, **kwargs)
+        return await run_in_threadpool(funcion, db, *args, **kwargs)
+    return funcion_async
+
+
+def ejecutar_con_sesion_propia(funcion, *args, **kwargs):
+    # expire_on_commit=False como SesionAsync: el resultado se usa después de cerrar la sesión
+    with SesionLocal(expire_on_commit=False) as db:
+        return funcion(db, *args, **kwargs)
+
+
+def deshacer_cambios(db):
+    db.rollback()
+
+
+deshacer_cambios_async = version_async(deshacer_cambios)
+
+
+def hay_resultados(db, construir_consulta, *args):
+    return construir_consulta(db, *args).first() is not None
+
+
+hay_resultados_async = version_async(hay_resultados)
+
+
+def iterar_consulta(construir_consulta, *args):
+    # Recorre la consulta de a bloques con un cursor abierto (yield_per), en una sesión propia
+    # porque se consume mientras se envía la respuesta, después de que termina el endpoint
+    with SesionLocal() as db:
+        yield from construir_consulta(db, *args).yield_per(FILAS_POR_BLOQUE)
+
+
 def validar_fecha_pasada(fecha_turno: date):
 
     fecha_actual = date.today()
@@ -84,3 +159,34 @@ def validar_rango_fechas(fecha_desde: date, fecha_hasta: date):
 def obtener_nombre_mes(fecha):
     
     return calendar.month_name[fecha.month].lower()
+
+
+def codificar_cursor(*valores):
+    # Cursor opaco para paginación por clave: valores separados por "|" en base64
+    texto = "|".join(valor.isoformat() if hasattr(valor, "isoformat") else str(valor) for valor in valores)
+    return base64.urlsafe_b64encode(texto.encode()).decode()
+
+
+def decodificar_cursor_turno(cursor: str):
+    # Devuelve (fecha, hora, id) a partir de un cursor generado por codificar_cursor
+    try:
+        fecha, hora, turno_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return date.fromisoformat(fecha), time.fromisoformat(hora), int(turno_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def decodificar_cursor_id(cursor: str):
+    # Devuelve el id a partir de un cursor generado por codificar_cursor(id)
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def validar_limite(limite: int):
+    if limite < 1 or limite > LIMIT_LISTADO_MAXIMO:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El límite debe estar entre 1 y {LIMIT_LISTADO_MAXIMO}"
+        )
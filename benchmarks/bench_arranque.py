@@ -0,0 +1,69 @@
+"""Arranque en frío de un worker: tiempo de import y memoria de App.main.
+
+Cada medición corre en un proceso nuevo (sin módulos en caché) y compara importar solo
+App.main contra importar además el backend de PDF, que es lo que antes pagaba cada
+worker al levantar. Con -X importtime lista además los módulos más caros de App.main.
+
+Uso: python -m benchmarks.bench_arranque [repeticiones]
+"""
+import statistics
+import subprocess
+import sys
+
+ESCENARIOS = (
+    ("App.main", "import App.main"),
+    ("App.main + PDF", "import App.main, App.pdf_borb"),
+)
+
+MEDIR = """
+import resource, time
+inicio = time.perf_counter()
+{importar}
+duracion = time.perf_counter() - inicio
+print(duracion, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def medir(importar: str):
+    salida = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", MEDIR.format(importar=importar)],
+        capture_output=True, text=True, check=True
+    ).stdout.split()
+    # ru_maxrss viene en KB en Linux
+    return float(salida[0]), int(salida[1]) / 1024
+
+
+def modulos_mas_caros(importar: str, cantidad: int = 10):
+    errores = subprocess.run(
+        [sys.executable, "-W", "ignore", "-X", "importtime", "-c", importar],
+        capture_output=True, text=True, check=True
+    ).stderr
+    modulos = []
+    for linea in errores.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        # Solo paquetes de primer nivel (el acumulado ya incluye sus submódulos)
+        nombre = nombre.strip()
+        if "." not in nombre and nombre != "App":
+            modulos.append((int(acumulado), nombre))
+    return sorted(modulos, reverse=True)[:cantidad]
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"{'escenario':<16} {'import ms':>10} {'RSS MB':>8}")
+    for nombre, importar in ESCENARIOS:
+        mediciones = [medir(importar) for _ in range(repeticiones)]
+        duracion = statistics.median(m[0] for m in mediciones)
+        rss = statistics.median(m[1] for m in mediciones)
+        print(f"{nombre:<16} {duracion * 1000:>10.1f} {rss:>8.1f}")
+
+    print("\npaquetes más caros al importar App.main (ms acumulados):")
+    for acumulado, nombre in modulos_mas_caros("import App.main"):
+        print(f"  {acumulado / 1000:>8.1f}  {nombre}")
+
+
+if __name__ == "__main__":
+    main()
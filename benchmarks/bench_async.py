@@ -0,0 +1,99 @@
+"""Prueba de carga: requests/seg y p99 con MODO_ASYNC=false y MODO_ASYNC=true.
+
+Levanta un uvicorn por modo sobre la base del benchmark y le envía una mezcla de
+consultas de disponibilidad, reportes y reservas desde varios hilos cliente.
+
+Uso: python -m benchmarks.bench_async [segundos] [clientes]
+"""
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time as reloj
+from datetime import date, timedelta
+
+from benchmarks.comun import preparar_base
+from App.database import engine
+
+PUERTO = 8765
+CANTIDAD_PERSONAS = 20_000
+
+
+def esperar_servidor():
+    for _ in range(100):
+        try:
+            conexion = http.client.HTTPConnection("127.0.0.1", PUERTO, timeout=1)
+            conexion.request("GET", "/")
+            conexion.getresponse().read()
+            return
+        except OSError:
+            reloj.sleep(0.1)
+    raise RuntimeError("El servidor no respondió")
+
+
+def cliente(semilla: int, fin: float, latencias: list):
+    aleatorio = random.Random(semilla)
+    conexion = http.client.HTTPConnection("127.0.0.1", PUERTO, timeout=60)
+    hoy = date.today()
+    while reloj.perf_counter() < fin:
+        opcion = aleatorio.random()
+        fecha = hoy + timedelta(days=aleatorio.randint(1, 365))
+        if opcion < 0.5:
+            metodo, ruta, cuerpo = "GET", f"/turnos-disponibles?fecha={fecha}", None
+        elif opcion < 0.8:
+            metodo, ruta, cuerpo = "GET", f"/reportes/turnos-por-fecha?fecha={fecha}", None
+        else:
+            metodo, ruta = "POST", "/turnos"
+            cuerpo = json.dumps({
+                "persona_id": aleatorio.randint(1, CANTIDAD_PERSONAS),
+                "fecha": str(hoy + timedelta(days=aleatorio.randint(400, 2000))),
+                "hora": f"{aleatorio.randint(9, 16):02d}:{aleatorio.choice(['00', '30'])}"
+            })
+        inicio = reloj.perf_counter()
+        conexion.request(metodo, ruta, body=cuerpo, headers={"Content-Type": "application/json"})
+        conexion.getresponse().read()
+        latencias.append(reloj.perf_counter() - inicio)
+
+
+def medir_modo(modo_async: bool, segundos: int, clientes: int):
+    entorno = dict(os.environ, MODO_ASYNC="true" if modo_async else "false")
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "App.main:app", "--port", str(PUERTO), "--log-level", "warning"],
+        env=entorno
+    )
+    try:
+        esperar_servidor()
+        fin = reloj.perf_counter() + segundos
+        latencias_por_hilo = [[] for _ in range(clientes)]
+        hilos = [threading.Thread(target=cliente, args=(i, fin, latencias_por_hilo[i])) for i in range(clientes)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+    latencias = sorted(latencia for lista in latencias_por_hilo for latencia in lista)
+    p99 = latencias[int(len(latencias) * 0.99) - 1] * 1000 if latencias else 0
+    return len(latencias) / segundos, p99
+
+
+def main():
+    segundos = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    clientes = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+    preparar_base(cantidad_personas=CANTIDAD_PERSONAS, cantidad_turnos=200_000)
+    engine.dispose()
+
+    print(f"{'modo':<8}{'req/s':>10}{'p99 (ms)':>12}")
+    for modo_async in (False, True):
+        rps, p99 = medir_modo(modo_async, segundos, clientes)
+        print(f"{'async' if modo_async else 'sync':<8}{rps:>10.1f}{p99:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Consultas SQL y tiempo de cada endpoint /reportes/* con dos tamaños de base.
+
+Con la estrategia de carga declarada en crudTurnos la cantidad de consultas no
+debe depender de la cantidad de filas; eso lo verifica tests/test_consultas_por_endpoint.py.
+Acá se muestran las cantidades junto al tiempo de cada endpoint con 2.000 y 20.000 turnos.
+
+Uso: python -m benchmarks.bench_consultas_reportes
+"""
+import asyncio
+import time as reloj
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from benchmarks.comun import preparar_base
+from App import main
+from App.config import MIN_CANCELADOS_DEFAULT
+from App.database import engine, SesionLocal
+
+HOY = date.today()
+DESDE = str(HOY - timedelta(days=365))
+HASTA = str(HOY + timedelta(days=365))
+HASTA_OCUPACION = str(HOY)
+FECHA = str(HOY)
+DNI = "10000001"
+
+
+def endpoints_reportes(db):
+    return {
+        "/reportes/turnos-por-fecha": lambda: main.obtener_turnos_por_fecha_endpoint(fecha=FECHA, db=db),
+        "/reportes/turnos-cancelados-por-mes": lambda: main.obtener_turnos_cancelados_mes_endpoint(db=db),
+        "/reportes/turnos-por-persona": lambda: main.obtener_turnos_por_persona_endpoint(dni=DNI, db=db),
+        "/reportes/turnos-cancelados": lambda: main.obtener_personas_con_cancelaciones_endpoint(min=MIN_CANCELADOS_DEFAULT, db=db),
+        "/reportes/turnos-confirmados": lambda: main.obtener_turnos_confirmados_endpoint(desde=DESDE, hasta=HASTA, pagina=1, cursor=None, db=db),
+        "/reportes/estado-personas": lambda: main.obtener_personas_por_estado_endpoint(habilitado=True, db=db),
+        "/reportes/ocupacion": lambda: main.obtener_ocupacion_endpoint(desde=DESDE, hasta=HASTA_OCUPACION, db=db),
+        "/reportes/pdf/turnos-por-fecha": lambda: main.obtener_pdf_turnos_por_fecha(fecha=FECHA, db=db),
+        "/reportes/pdf/turnos-cancelados-por-mes": lambda: main.obtener_pdf_turnos_cancelados_mes(db=db),
+        "/reportes/pdf/turnos-por-persona": lambda: main.obtener_pdf_turnos_por_persona(dni=DNI, db=db),
+        "/reportes/pdf/turnos-cancelados": lambda: main.obtener_pdf_personas_con_cancelaciones(min=MIN_CANCELADOS_DEFAULT, db=db),
+        "/reportes/pdf/turnos-confirmados": lambda: main.obtener_pdf_turnos_confirmados(desde=FECHA, hasta=str(HOY + timedelta(days=7)), db=db),
+        "/reportes/pdf/estado-personas": lambda: main.obtener_pdf_estado_personas(habilitado=False, db=db),
+        "/reportes/csv/turnos-por-fecha": lambda: main.obtener_csv_turnos_por_fecha(fecha=FECHA, db=db),
+        "/reportes/csv/turnos-cancelados-por-mes": lambda: main.obtener_csv_turnos_cancelados_mes(db=db),
+        "/reportes/csv/turnos-por-persona": lambda: main.obtener_csv_turnos_por_persona(dni=DNI, db=db),
+        "/reportes/csv/turnos-cancelados": lambda: main.obtener_csv_personas_con_cancelaciones(min=MIN_CANCELADOS_DEFAULT, db=db),
+        "/reportes/csv/turnos-confirmados": lambda: main.obtener_csv_turnos_confirmados(desde=DESDE, hasta=HASTA, db=db),
+        "/reportes/csv/estado-personas": lambda: main.obtener_csv_estado_personas(habilitado=True, db=db),
+    }
+
+
+async def ejecutar_endpoint(endpoint):
+    respuesta = await endpoint()
+    # Los reportes PDF y CSV pueden generar el contenido recién al enviarlo
+    if hasattr(respuesta, "body_iterator"):
+        async for _ in respuesta.body_iterator:
+            pass
+
+
+def contar_consultas(cantidad_personas: int, cantidad_turnos: int):
+    preparar_base(cantidad_personas=cantidad_personas, cantidad_turnos=cantidad_turnos)
+    contador = {"consultas": 0}
+
+    def contar(*args):
+        contador["consultas"] += 1
+
+    resultados = {}
+    event.listen(engine, "before_cursor_execute", contar)
+    try:
+        for ruta in endpoints_reportes(None):
+            with SesionLocal() as db:
+                contador["consultas"] = 0
+                inicio = reloj.perf_counter()
+                asyncio.run(ejecutar_endpoint(endpoints_reportes(db)[ruta]))
+                resultados[ruta] = (contador["consultas"], (reloj.perf_counter() - inicio) * 1000)
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+    return resultados
+
+
+def main_benchmark():
+    chica = contar_consultas(cantidad_personas=200, cantidad_turnos=2_000)
+    grande = contar_consultas(cantidad_personas=2_000, cantidad_turnos=20_000)
+
+    print(f"{'endpoint':<44}{'consultas 2k':>14}{'ms 2k':>10}{'consultas 20k':>15}{'ms 20k':>10}")
+    for ruta in chica:
+        marca = "" if chica[ruta][0] == grande[ruta][0] else "  <- VARÍA"
+        print(f"{ruta:<44}{chica[ruta][0]:>14}{chica[ruta][1]:>10.1f}{grande[ruta][0]:>15}{grande[ruta][1]:>10.1f}{marca}")
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,51 @@
+"""Compara las consultas de turnos con y sin los índices compuestos.
+
+Uso: python -m benchmarks.bench_indices [cantidad_turnos]
+"""
+import sys
+from datetime import date, timedelta
+
+from benchmarks.comun import preparar_base, medir
+from App.config import DIAS_LIMITE_CANCELACIONES
+from App.database import engine, SesionLocal, crear_indices_faltantes
+from App.models import Turno
+from App.crudTurnos import (obtener_turnos_disponibles, obtener_turnos_cancelados_mes_actual,
+                            obtener_turnos_confirmados_por_periodo, contar_turnos_cancelados,
+                            verificar_indices_turnos)
+
+
+def ejecutar_consultas(db):
+    hoy = date.today()
+    return {
+        "obtener_turnos_disponibles": medir(lambda: obtener_turnos_disponibles(db, hoy + timedelta(days=7))),
+        "obtener_turnos_cancelados_mes_actual": medir(lambda: obtener_turnos_cancelados_mes_actual(db)),
+        "obtener_turnos_confirmados_por_periodo": medir(lambda: obtener_turnos_confirmados_por_periodo(db, hoy, hoy + timedelta(days=30))),
+        "contar_turnos_cancelados": medir(lambda: contar_turnos_cancelados(db, 1, DIAS_LIMITE_CANCELACIONES)),
+    }
+
+
+def main():
+    cantidad_turnos = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    preparar_base(cantidad_personas=50_000, cantidad_turnos=cantidad_turnos)
+
+    for indice in Turno.__table__.indexes:
+        indice.drop(bind=engine, checkfirst=True)
+    with SesionLocal() as db:
+        antes = ejecutar_consultas(db)
+
+    crear_indices_faltantes()
+    with SesionLocal() as db:
+        db.connection().exec_driver_sql("ANALYZE")
+        despues = ejecutar_consultas(db)
+        planes = verificar_indices_turnos(db)
+
+    print(f"{'consulta':<42}{'sin índice (ms)':>18}{'con índice (ms)':>18}")
+    for consulta in antes:
+        print(f"{consulta:<42}{antes[consulta]:>18.2f}{despues[consulta]:>18.2f}")
+    print()
+    for consulta, plan in planes.items():
+        print(f"{consulta}: {' | '.join(plan)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Reserva de un lote de turnos: crear_turnos_lote contra un bucle de crear_turno.
+
+Arma un lote con horarios libres (y algunos repetidos, que deben rechazarse) y lo
+reserva de las dos formas sobre una base recién creada. Informa turnos/seg y verifica
+que ambos caminos creen y rechacen los mismos ítems.
+
+Uso: python -m benchmarks.bench_lote [cantidad_turnos] [cantidad_personas]
+"""
+import random
+import sys
+import time as reloj
+from datetime import date, timedelta
+
+from fastapi import HTTPException
+
+from benchmarks.comun import preparar_base
+from App.config import HORARIOS_DISPONIBLES
+from App.crudTurnos import crear_turno, crear_turnos_lote
+from App.database import SesionLocal
+from App.ocupacion import indice_ocupacion
+from App.schemas import turno_base
+
+
+def armar_lote(cantidad_turnos: int, cantidad_personas: int, semilla: int = 7):
+    aleatorio = random.Random(semilla)
+    lote = []
+    for i in range(cantidad_turnos):
+        # Uno de cada diez ítems repite un horario ya pedido en el lote
+        if lote and i % 10 == 9:
+            repetido = aleatorio.choice(lote)
+            lote.append(turno_base(persona_id=aleatorio.randint(1, cantidad_personas), fecha=repetido.fecha, hora=repetido.hora))
+            continue
+        dia, horario = divmod(i, len(HORARIOS_DISPONIBLES))
+        lote.append(turno_base(
+            persona_id=aleatorio.randint(1, cantidad_personas),
+            fecha=date.today() + timedelta(days=1 + dia),
+            hora=HORARIOS_DISPONIBLES[horario]
+        ))
+    return lote
+
+
+def reservar_en_bucle(lote):
+    creados = 0
+    with SesionLocal() as db:
+        for turno_data in lote:
+            try:
+                crear_turno(db, turno_data)
+                creados += 1
+            except HTTPException:
+                pass
+    return creados
+
+
+def reservar_en_lote(lote):
+    with SesionLocal() as db:
+        resultados = crear_turnos_lote(db, lote)
+    return sum(1 for turno, _ in resultados if turno is not None)
+
+
+def main():
+    cantidad_turnos = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    cantidad_personas = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    mediciones = {}
+    for nombre, reservar in (("bucle crear_turno", reservar_en_bucle), ("crear_turnos_lote", reservar_en_lote)):
+        preparar_base(cantidad_personas=cantidad_personas, cantidad_turnos=0)
+        indice_ocupacion.limpiar()
+        lote = armar_lote(cantidad_turnos, cantidad_personas)
+
+        inicio = reloj.perf_counter()
+        creados = reservar(lote)
+        duracion = reloj.perf_counter() - inicio
+        mediciones[nombre] = (creados, duracion)
+
+    print(f"{'modo':<20} {'creados':>8} {'seg':>8} {'turnos/seg':>11}")
+    for nombre, (creados, duracion) in mediciones.items():
+        print(f"{nombre:<20} {creados:>8} {duracion:>8.3f} {cantidad_turnos / duracion:>11.1f}")
+
+    (creados_bucle, duracion_bucle), (creados_lote, duracion_lote) = mediciones.values()
+    print(f"aceleración: {duracion_bucle / duracion_lote:.1f}x")
+    sys.exit(0 if creados_bucle == creados_lote else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Reservas por segundo mientras otros hilos leen reportes, con y sin el perfil de SQLite.
+
+Uso: python -m benchmarks.bench_motor [segundos] [hilos_reserva] [hilos_reporte]
+"""
+import random
+import sys
+import threading
+import time as reloj
+from datetime import date, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.comun import preparar_base, RUTA_DB_BENCHMARK
+from App.config import HORARIOS_DISPONIBLES
+from App.crudTurnos import crear_turno, obtener_todos_turnos_confirmados_por_periodo
+from App.database import crear_motor, engine
+from App.schemas import turno_base
+
+CANTIDAD_PERSONAS = 20_000
+
+
+def correr_carga(motor, segundos: int, hilos_reserva: int, hilos_reporte: int):
+    Sesion = sessionmaker(bind=motor, autoflush=False, autocommit=False, future=True)
+    fin = reloj.perf_counter() + segundos
+    resultados = {"reservas": 0, "rechazos": 0, "bloqueos": 0, "reportes": 0}
+    candado = threading.Lock()
+
+    def sumar(clave):
+        with candado:
+            resultados[clave] += 1
+
+    def reservar(semilla):
+        aleatorio = random.Random(semilla)
+        with Sesion() as db:
+            while reloj.perf_counter() < fin:
+                turno = turno_base(
+                    persona_id=aleatorio.randint(1, CANTIDAD_PERSONAS),
+                    fecha=date.today() + timedelta(days=aleatorio.randint(400, 2000)),
+                    hora=aleatorio.choice(HORARIOS_DISPONIBLES)
+                )
+                try:
+                    crear_turno(db, turno)
+                    sumar("reservas")
+                except HTTPException:
+                    db.rollback()
+                    sumar("rechazos")
+                except OperationalError:
+                    db.rollback()
+                    sumar("bloqueos")
+
+    def leer_reportes():
+        hoy = date.today()
+        with Sesion() as db:
+            while reloj.perf_counter() < fin:
+                obtener_todos_turnos_confirmados_por_periodo(db, hoy - timedelta(days=60), hoy)
+                db.rollback()
+                sumar("reportes")
+
+    hilos = [threading.Thread(target=reservar, args=(i,)) for i in range(hilos_reserva)]
+    hilos += [threading.Thread(target=leer_reportes) for _ in range(hilos_reporte)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    return {clave: valor / segundos for clave, valor in resultados.items()}
+
+
+def main():
+    segundos = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    hilos_reserva = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    hilos_reporte = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    url = f"sqlite:///{RUTA_DB_BENCHMARK}"
+
+    preparar_base(cantidad_personas=CANTIDAD_PERSONAS, cantidad_turnos=200_000)
+    engine.dispose()
+
+    # Motor con valores por defecto: journal en modo DELETE y sin PRAGMAs
+    motor_base = create_engine(url, future=True)
+    with motor_base.connect() as conexion:
+        conexion.exec_driver_sql("PRAGMA journal_mode=DELETE")
+    antes = correr_carga(motor_base, segundos, hilos_reserva, hilos_reporte)
+    motor_base.dispose()
+
+    motor_perfil = crear_motor(url)
+    despues = correr_carga(motor_perfil, segundos, hilos_reserva, hilos_reporte)
+    motor_perfil.dispose()
+
+    print(f"{'por segundo':<14}{'por defecto':>14}{'perfil':>14}")
+    for clave in antes:
+        print(f"{clave:<14}{antes[clave]:>14.1f}{despues[clave]:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
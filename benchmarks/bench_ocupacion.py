@@ -0,0 +1,54 @@
+"""Reporte de ocupación sobre una tabla de turnos grande.
+
+Puebla la base con un millón de turnos repartidos en dos años y mide
+GET /reportes/ocupacion con rangos de un mes, un trimestre y un año, junto con
+el plan de la consulta al resumen diario (turnos_diarios). Termina con código 1 si el rango de un año
+tarda un segundo o más.
+
+Uso: python -m benchmarks.bench_ocupacion [cantidad_turnos] [repeticiones]   (por defecto 1000000 5)
+"""
+import asyncio
+import json
+import sys
+from datetime import date, timedelta
+
+from benchmarks.comun import preparar_base, medir
+from App import main
+from App.database import SesionLocal, explicar_consulta
+from App.turnos_diarios import consulta_turnos_diarios
+
+HOY = date.today()
+RANGOS = {"mes": 30, "trimestre": 91, "año": 366}
+LIMITE_ANIO_MS = 1000
+
+
+def main_benchmark():
+    cantidad_turnos = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    preparar_base(cantidad_personas=10_000, cantidad_turnos=cantidad_turnos)
+
+    with SesionLocal() as db:
+        plan = explicar_consulta(db, consulta_turnos_diarios(db, HOY - timedelta(days=365), HOY))
+        print("plan:", " | ".join(plan))
+
+    print(f"{'rango':<12}{'días':>6}{'turnos':>10}{'ms':>9}{'ocupación %':>13}{'cancelación':>13}{'ausentismo':>12}")
+    tiempos = {}
+    for nombre, dias in RANGOS.items():
+        # Rango centrado en hoy: días pasados (con ausentismo) y futuros
+        desde = HOY - timedelta(days=dias // 2)
+        hasta = desde + timedelta(days=dias - 1)
+
+        def pedir():
+            with SesionLocal() as db:
+                return asyncio.run(main.obtener_ocupacion_endpoint(desde=str(desde), hasta=str(hasta), db=db))
+
+        reporte = json.loads(pedir().body)
+        tiempos[nombre] = medir(pedir, repeticiones)
+        print(f"{nombre:<12}{dias:>6}{reporte['total_turnos']:>10}{tiempos[nombre]:>9.0f}{reporte['porcentaje_ocupacion']:>13}"
+              f"{reporte['tasa_cancelacion']!s:>13}{reporte['tasa_ausentismo']!s:>12}")
+
+    sys.exit(1 if tiempos["año"] >= LIMITE_ANIO_MS else 0)
+
+
+if __name__ == "__main__":
+    main_benchmark()
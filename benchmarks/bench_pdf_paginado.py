@@ -0,0 +1,93 @@
+"""Reportes PDF grandes: tiempo y memoria pico según la cantidad de filas.
+
+Arma filas de turnos en memoria (sin base de datos) y genera con el renderizador de borb,
+cada tamaño en un proceso nuevo, el PDF de turnos confirmados (agrupado por persona) y el
+historial de una persona (una sola tabla que ocupa muchas páginas). Informa por separado los
+segundos de layout (armar las tablas página por página) y de escritura (PDF.write), el RSS
+pico por encima del que tiene el proceso antes de generar, las páginas y ms / KB por fila.
+El layout y la memoria deberían crecer de forma lineal; la escritura de borb arma la tabla xref
+comparando cada objeto con los ya agregados y crece más rápido con la cantidad de páginas.
+
+Uso: python -m benchmarks.bench_pdf_paginado [filas ...]   (por defecto 10000 100000)
+"""
+import re
+import resource
+import subprocess
+import sys
+import time as reloj
+from datetime import date, time, timedelta
+
+from App.procesos_pdf import FilaPersona, FilaTurno
+
+REPORTES = ("turnos-confirmados", "turnos-por-persona")
+TURNOS_POR_PERSONA = 20
+
+
+def armar_filas(cantidad: int):
+    personas = [
+        FilaPersona(i, f"Persona {i}", str(20000000 + i), f"persona{i}@mail.com", "1155550000", date(1990, 1, 1), True)
+        for i in range(cantidad // TURNOS_POR_PERSONA + 1)
+    ]
+    turnos = [
+        FilaTurno(i, i // TURNOS_POR_PERSONA, date(2025, 1, 1) + timedelta(days=i % 365), time(9 + i % 8, 0),
+                  "confirmado", personas[i // TURNOS_POR_PERSONA])
+        for i in range(cantidad)
+    ]
+    return personas, turnos
+
+
+def generar(reporte: str, personas, turnos, renderizador: str = "borb") -> bytes:
+    from App import reportes_pdf
+    if reporte == "turnos-confirmados":
+        contenido, _ = reportes_pdf.generar_pdf_turnos_confirmados(date(2025, 1, 1), date(2025, 12, 31), turnos, renderizador=renderizador)
+    else:
+        # Todos los turnos en el historial de una misma persona: una tabla de cantidad filas
+        contenido, _ = reportes_pdf.generar_pdf_turnos_por_persona(personas[0], turnos, renderizador=renderizador)
+    return contenido
+
+
+def medir(reporte: str, cantidad: int) -> None:
+    # Corre en un proceso aparte: ru_maxrss es el pico de todo el proceso
+    personas, turnos = armar_filas(cantidad)
+    from App import pdf_borb
+    
+    # Se mide aparte cuánto tarda PDF.write (finalizar_pdf) del resto de la generación
+    escritura = []
+    finalizar_pdf = pdf_borb.finalizar_pdf
+    def finalizar_pdf_medido(doc, filename):
+        inicio = reloj.perf_counter()
+        resultado = finalizar_pdf(doc, filename)
+        escritura.append(reloj.perf_counter() - inicio)
+        return resultado
+    pdf_borb.finalizar_pdf = finalizar_pdf_medido
+    
+    rss_inicial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = reloj.perf_counter()
+    contenido = generar(reporte, personas, turnos)
+    duracion = reloj.perf_counter() - inicio
+    rss_pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    paginas = len(re.findall(rb"/Type\s*/Page\b(?!s)", contenido))
+    print(duracion - escritura[0], escritura[0], (rss_pico - rss_inicial) / 1024, paginas, len(contenido))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--medir":
+        medir(sys.argv[2], int(sys.argv[3]))
+        return
+
+    tamanios = [int(valor) for valor in sys.argv[1:]] or [10_000, 100_000]
+    print(f"{'reporte':<20} {'filas':>8} {'layout s':>9} {'write s':>8} {'RSS MB':>8} {'páginas':>8} {'ms/fila':>8} {'KB/fila':>8}")
+    for reporte in REPORTES:
+        for cantidad in tamanios:
+            salida = subprocess.run(
+                [sys.executable, "-W", "ignore", "-m", "benchmarks.bench_pdf_paginado", "--medir", reporte, str(cantidad)],
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            layout, escritura, rss, paginas = float(salida[0]), float(salida[1]), float(salida[2]), int(salida[3])
+            # ms/fila es del layout, que es la parte que debería ser lineal
+            print(f"{reporte:<20} {cantidad:>8} {layout:>9.2f} {escritura:>8.2f} {rss:>8.1f} {paginas:>8} "
+                  f"{layout * 1000 / cantidad:>8.3f} {rss * 1024 / cantidad:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Renderizadores de PDF: borb contra el rápido con los mismos reportes y filas.
+
+Arma las mismas filas en memoria que bench_pdf_paginado y genera, cada combinación en un
+proceso nuevo, el PDF de turnos confirmados (agrupado por persona, una tabla chica por
+persona) y el historial de una persona (una sola tabla larga) con cada renderizador.
+Informa segundos totales (layout y escritura), RSS pico por encima del que tiene el proceso
+antes de generar, páginas, tamaño del archivo y cuántas veces más rápido es el renderizador
+rápido que borb.
+
+Uso: python -m benchmarks.bench_pdf_renderizadores [filas ...]   (por defecto 2000 20000)
+"""
+import re
+import resource
+import subprocess
+import sys
+import time as reloj
+
+from benchmarks.bench_pdf_paginado import REPORTES, armar_filas, generar
+
+RENDERIZADORES = ("borb", "rapido")
+
+
+def medir(reporte: str, renderizador: str, cantidad: int) -> None:
+    # Corre en un proceso aparte: ru_maxrss es el pico de todo el proceso
+    personas, turnos = armar_filas(cantidad)
+    rss_inicial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = reloj.perf_counter()
+    contenido = generar(reporte, personas, turnos, renderizador)
+    duracion = reloj.perf_counter() - inicio
+    rss_pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    paginas = len(re.findall(rb"/Type\s*/Page\b(?!s)", contenido))
+    print(duracion, (rss_pico - rss_inicial) / 1024, paginas, len(contenido))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--medir":
+        medir(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+
+    tamanios = [int(valor) for valor in sys.argv[1:]] or [2_000, 20_000]
+    print(f"{'reporte':<20} {'filas':>8} {'renderizador':>12} {'segundos':>9} {'RSS MB':>8} {'páginas':>8} {'KB':>8} {'ms/fila':>8} {'x borb':>7}")
+    for reporte in REPORTES:
+        for cantidad in tamanios:
+            duracion_borb = None
+            for renderizador in RENDERIZADORES:
+                salida = subprocess.run(
+                    [sys.executable, "-W", "ignore", "-m", "benchmarks.bench_pdf_renderizadores",
+                     "--medir", reporte, renderizador, str(cantidad)],
+                    capture_output=True, text=True, check=True
+                ).stdout.split()
+                duracion, rss, paginas, tamanio = float(salida[0]), float(salida[1]), int(salida[2]), int(salida[3])
+                duracion_borb = duracion_borb or duracion
+                print(f"{reporte:<20} {cantidad:>8} {renderizador:>12} {duracion:>9.2f} {rss:>8.1f} {paginas:>8} "
+                      f"{tamanio / 1024:>8.0f} {duracion * 1000 / cantidad:>8.3f} {duracion_borb / duracion:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Reservas concurrentes sobre pocos horarios: cuenta reservas dobles y reservas/seg.
+
+Varios hilos intentan reservar al azar los mismos horarios de un conjunto chico de
+fechas. Al final verifica en la base que no haya dos turnos activos en el mismo horario.
+
+Uso: python -m benchmarks.bench_reservas_concurrentes [hilos] [intentos_por_hilo] [fechas]
+"""
+import random
+import sys
+import threading
+import time as reloj
+from datetime import date, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import func
+
+from benchmarks.comun import preparar_base
+from App.config import HORARIOS_DISPONIBLES, ESTADO_CANCELADO
+from App.crudTurnos import crear_turno
+from App.database import SesionLocal
+from App.models import Turno
+from App.schemas import turno_base
+
+CANTIDAD_PERSONAS = 5_000
+
+
+def main():
+    hilos_cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    intentos = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    fechas = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+
+    preparar_base(cantidad_personas=CANTIDAD_PERSONAS, cantidad_turnos=0)
+    resultados = {"reservas": 0, "ocupados": 0}
+    candado = threading.Lock()
+
+    def reservar(semilla):
+        aleatorio = random.Random(semilla)
+        with SesionLocal() as db:
+            for _ in range(intentos):
+                turno = turno_base(
+                    persona_id=aleatorio.randint(1, CANTIDAD_PERSONAS),
+                    fecha=date.today() + timedelta(days=aleatorio.randint(1, fechas)),
+                    hora=aleatorio.choice(HORARIOS_DISPONIBLES)
+                )
+                try:
+                    crear_turno(db, turno)
+                    clave = "reservas"
+                except HTTPException:
+                    clave = "ocupados"
+                with candado:
+                    resultados[clave] += 1
+
+    inicio = reloj.perf_counter()
+    hilos = [threading.Thread(target=reservar, args=(i,)) for i in range(hilos_cantidad)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    duracion = reloj.perf_counter() - inicio
+
+    with SesionLocal() as db:
+        reservas_dobles = db.query(Turno.fecha, Turno.hora).filter(
+            Turno.estado != ESTADO_CANCELADO
+        ).group_by(Turno.fecha, Turno.hora).having(func.count(Turno.id) > 1).count()
+
+    print(f"intentos:         {hilos_cantidad * intentos}")
+    print(f"reservas:         {resultados['reservas']}")
+    print(f"rechazos ocupado: {resultados['ocupados']}")
+    print(f"reservas/seg:     {resultados['reservas'] / duracion:.1f}")
+    print(f"intentos/seg:     {hilos_cantidad * intentos / duracion:.1f}")
+    print(f"reservas dobles:  {reservas_dobles}")
+    sys.exit(1 if reservas_dobles else 0)
+
+
+if __name__ == "__main__":
+    main()
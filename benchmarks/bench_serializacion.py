@@ -0,0 +1,129 @@
+"""Serialización de respuestas JSON grandes: camino anterior contra serializacion.py.
+
+Puebla la base con una sola fecha de muchos turnos y mide, con la misma cantidad de filas,
+GET /turnos (una sola página con todos los turnos) y GET /reportes/turnos-por-fecha:
+- anterior: objetos del ORM, modelos Pydantic armados campo por campo y la validación y
+  serialización del response_model de FastAPI (serialize_response), como antes del cambio
+- actual: el endpoint tal como está (filas Row validadas una sola vez y bytes ya codificados)
+Informa milisegundos por request, filas/seg y verifica que ambos caminos generen los mismos bytes.
+
+Uso: python -m benchmarks.bench_serializacion [filas] [repeticiones]   (por defecto 100000 3)
+"""
+import asyncio
+import os
+import sys
+from datetime import date, timedelta
+
+# El listado de turnos se pide en una sola página: el límite máximo se fija antes de importar App
+CANTIDAD_FILAS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+os.environ["LIMIT_LISTADO_MAXIMO"] = str(max(CANTIDAD_FILAS, int(os.getenv("LIMIT_LISTADO_MAXIMO", "1000"))))
+
+from fastapi.routing import serialize_response
+
+from benchmarks.comun import preparar_base, medir
+from App import main
+from App.config import HORARIOS_DISPONIBLES, ESTADO_CANCELADO, ESTADO_CONFIRMADO
+from App.crudTurnos import consulta_turnos_por_fecha
+from App.database import engine, SesionLocal
+from App.models import Turno
+from App.schemas import TurnoRespuesta, TurnoReporte, PersonaConTurnos, ReporteTurnosPorFecha
+
+CANTIDAD_PERSONAS = 2_000
+TAMANIO_LOTE = 10_000
+FECHA = date.today() + timedelta(days=400)
+
+
+def poblar_fecha(cantidad: int):
+    # Todos los turnos en FECHA: uno activo por horario (ux_turnos_fecha_hora_activos), el resto cancelados
+    with engine.begin() as conexion:
+        for inicio in range(0, cantidad, TAMANIO_LOTE):
+            conexion.execute(Turno.__table__.insert(), [
+                {
+                    "persona_id": 1 + i % CANTIDAD_PERSONAS,
+                    "fecha": FECHA,
+                    "hora": HORARIOS_DISPONIBLES[i % len(HORARIOS_DISPONIBLES)],
+                    "estado": ESTADO_CONFIRMADO if i < len(HORARIOS_DISPONIBLES) else ESTADO_CANCELADO,
+                }
+                for i in range(inicio, min(inicio + TAMANIO_LOTE, cantidad))
+            ])
+
+
+def campo_respuesta(ruta: str):
+    return next(r.response_field for r in main.app.routes if getattr(r, "path", None) == ruta and "GET" in r.methods)
+
+
+def turnos_anterior(db, campo):
+    turnos = db.query(Turno).order_by(Turno.id).limit(CANTIDAD_FILAS).all()
+    contenido = [
+        TurnoRespuesta(id=turno.id, persona_id=turno.persona_id, fecha=turno.fecha, hora=turno.hora, estado=turno.estado)
+        for turno in turnos
+    ]
+    return asyncio.run(serialize_response(field=campo, response_content=contenido, dump_json=True))
+
+
+def turnos_actual(db):
+    respuesta = asyncio.run(main.listar_turnos_endpoint(
+        limite=CANTIDAD_FILAS, cursor=None, desde=None, hasta=None, estado=None, persona_id=None, db=db
+    ))
+    return respuesta.body
+
+
+def turnos_por_fecha_anterior(db, campo):
+    turnos = consulta_turnos_por_fecha(db, FECHA).all()
+    personas = {}
+    for turno in turnos:
+        if turno.persona_id not in personas:
+            personas[turno.persona_id] = PersonaConTurnos(
+                id=turno.persona.id, nombre=turno.persona.nombre, dni=turno.persona.dni, cantidad_turnos=0, turnos=[]
+            )
+        personas[turno.persona_id].turnos.append(TurnoReporte(id=turno.id, hora=turno.hora, estado=turno.estado))
+    for persona in personas.values():
+        persona.cantidad_turnos = len(persona.turnos)
+    contenido = ReporteTurnosPorFecha(
+        fecha=FECHA, cantidad_turnos=len(turnos), cantidad_personas=len(personas), personas=list(personas.values())
+    )
+    return asyncio.run(serialize_response(field=campo, response_content=contenido, exclude_none=True, dump_json=True))
+
+
+def turnos_por_fecha_actual(db):
+    return asyncio.run(main.obtener_turnos_por_fecha_endpoint(fecha=str(FECHA), db=db)).body
+
+
+def main_benchmark():
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    preparar_base(cantidad_personas=CANTIDAD_PERSONAS, cantidad_turnos=0)
+    poblar_fecha(CANTIDAD_FILAS)
+
+    casos = {
+        "/turnos": (turnos_anterior, turnos_actual),
+        "/reportes/turnos-por-fecha": (turnos_por_fecha_anterior, turnos_por_fecha_actual),
+    }
+
+    distintos = False
+    print(f"{'endpoint':<30}{'filas':>9}{'anterior ms':>13}{'actual ms':>11}{'filas/seg':>12}{'x':>6}{'MB':>7}")
+    for ruta, (anterior, actual) in casos.items():
+        campo = campo_respuesta(ruta)
+        # Una sesión nueva por request, como get_db
+        with SesionLocal() as db:
+            iguales = anterior(db, campo) == actual(db)
+        distintos = distintos or not iguales
+        with SesionLocal() as db:
+            tamanio = len(actual(db))
+
+        def con_sesion(funcion, *args):
+            def ejecutar():
+                with SesionLocal() as db:
+                    funcion(db, *args)
+            return ejecutar
+
+        ms_anterior = medir(con_sesion(anterior, campo), repeticiones)
+        ms_actual = medir(con_sesion(actual), repeticiones)
+        marca = "" if iguales else "  <- BYTES DISTINTOS"
+        print(f"{ruta:<30}{CANTIDAD_FILAS:>9}{ms_anterior:>13.0f}{ms_actual:>11.0f}"
+              f"{CANTIDAD_FILAS * 1000 / ms_actual:>12.0f}{ms_anterior / ms_actual:>6.1f}{tamanio / 1e6:>7.1f}{marca}")
+
+    sys.exit(1 if distintos else 0)
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,81 @@
+import os
+import random
+import time as reloj
+from datetime import date, time, timedelta
+
+# Los benchmarks usan su propia base: hay que fijar la URL antes de importar App
+RUTA_DB_BENCHMARK = os.getenv("BENCHMARK_DB", "./benchmarks/benchmark.db")
+os.environ["URL_BASE_DATOS"] = f"sqlite:///{RUTA_DB_BENCHMARK}"
+
+from App.config import HORARIO_INICIO, HORARIO_FIN, INTERVALO_TURNOS_MINUTOS, HORARIOS_DISPONIBLES, ESTADO_PENDIENTE, ESTADO_CONFIRMADO, ESTADO_CANCELADO, ESTADO_ASISTIDO
+from App.cancelaciones import reconstruir_contadores_cancelaciones
+from App.turnos_diarios import reconstruir_turnos_diarios
+from App.database import Base, engine, SesionLocal
+from App.models import Persona, Turno
+from App.utils import generar_horarios_disponibles
+
+ESTADOS = [ESTADO_PENDIENTE, ESTADO_CONFIRMADO, ESTADO_CANCELADO, ESTADO_ASISTIDO]
+TAMANIO_LOTE = 10_000
+
+
+def preparar_base(cantidad_personas: int, cantidad_turnos: int, semilla: int = 42):
+    # Recrea la base del benchmark y la puebla con datos aleatorios reproducibles
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    if not HORARIOS_DISPONIBLES:
+        HORARIOS_DISPONIBLES.extend(generar_horarios_disponibles(HORARIO_INICIO, HORARIO_FIN, INTERVALO_TURNOS_MINUTOS))
+
+    aleatorio = random.Random(semilla)
+    hoy = date.today()
+
+    personas = [
+        {
+            "id": i,
+            "nombre": f"Persona {i}",
+            "email": f"persona{i}@mail.com",
+            "dni": str(10_000_000 + i),
+            "telefono": str(1_100_000_000 + i),
+            "fecha_nacimiento": date(1950 + i % 50, 1 + i % 12, 1 + i % 28),
+            "habilitado": True,
+        }
+        for i in range(1, cantidad_personas + 1)
+    ]
+
+    with engine.begin() as conexion:
+        for inicio in range(0, len(personas), TAMANIO_LOTE):
+            conexion.execute(Persona.__table__.insert(), personas[inicio:inicio + TAMANIO_LOTE])
+
+        # Solo puede haber un turno activo por horario (ux_turnos_fecha_hora_activos): los repetidos quedan cancelados
+        horarios_activos = set()
+        lote = []
+        for _ in range(cantidad_turnos):
+            turno = {
+                "persona_id": aleatorio.randint(1, cantidad_personas),
+                "fecha": hoy + timedelta(days=aleatorio.randint(-365, 365)),
+                "hora": aleatorio.choice(HORARIOS_DISPONIBLES),
+                "estado": aleatorio.choice(ESTADOS),
+            }
+            if turno["estado"] != ESTADO_CANCELADO:
+                horario = (turno["fecha"], turno["hora"])
+                if horario in horarios_activos:
+                    turno["estado"] = ESTADO_CANCELADO
+                else:
+                    horarios_activos.add(horario)
+            lote.append(turno)
+            if len(lote) == TAMANIO_LOTE:
+                conexion.execute(Turno.__table__.insert(), lote)
+                lote = []
+        if lote:
+            conexion.execute(Turno.__table__.insert(), lote)
+
+    with SesionLocal() as db:
+        reconstruir_contadores_cancelaciones(db)
+        reconstruir_turnos_diarios(db)
+
+
+def medir(funcion, repeticiones: int = 20):
+    # Devuelve el tiempo promedio en milisegundos
+    inicio = reloj.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (reloj.perf_counter() - inicio) * 1000 / repeticiones
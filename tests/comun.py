@@ -0,0 +1,39 @@
+"""Configuración común de las pruebas.
+
+Cada módulo de prueba importa este antes que App: App lee la configuración al importarse,
+así que la base temporal y el modo se fijan acá una sola vez para toda la corrida.
+"""
+import os
+import tempfile
+from datetime import date
+
+DIRECTORIO_PRUEBA = tempfile.TemporaryDirectory()
+os.environ["URL_BASE_DATOS"] = f"sqlite:///{os.path.join(DIRECTORIO_PRUEBA.name, 'prueba.db')}"
+# Sin cache de reportes (una respuesta cacheada no consulta la base); test_cache_reportes lo activa
+os.environ["CACHE_REPORTES_MAX_ENTRADAS"] = "0"
+os.environ["CACHE_REPORTES_ARCHIVO_VERSION"] = os.path.join(DIRECTORIO_PRUEBA.name, "version_reportes")
+os.environ["MODO_ASYNC"] = "false"
+
+from App.database import Base, engine
+from App.models import Persona
+
+
+def recrear_base():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def insertar_personas(conexion, cantidad_personas: int):
+    # Personas habilitadas con ids 1..cantidad_personas
+    conexion.execute(Persona.__table__.insert(), [
+        {
+            "id": persona_id,
+            "nombre": f"Persona {persona_id}",
+            "dni": str(10_000_000 + persona_id),
+            "email": f"persona{persona_id}@ejemplo.com",
+            "telefono": str(1_100_000_000 + persona_id),
+            "fecha_nacimiento": date(1990, 1, 1),
+            "habilitado": True,
+        }
+        for persona_id in range(1, cantidad_personas + 1)
+    ])
@@ -0,0 +1,85 @@
+"""Cache de reportes JSON con ETag / If-None-Match.
+
+Un If-None-Match con la ETag vigente recibe 304 sin consultar la base; una escritura renueva la
+versión de los datos y el mismo pedido vuelve a generar el reporte. El 304 se decide dentro del
+endpoint, después de validar los parámetros.
+
+Uso: python -m unittest discover tests
+"""
+import unittest
+from datetime import date, time, timedelta
+
+from comun import engine, insertar_personas, recrear_base
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from App.main import app
+from App.cache_reportes import cache_reportes
+
+RUTA = "/reportes/turnos-por-fecha"
+
+
+class TestCacheReportes(unittest.TestCase):
+
+    def setUp(self):
+        recrear_base()
+        with engine.begin() as conexion:
+            insertar_personas(conexion, 1)
+        self.fecha = date.today() + timedelta(days=7)
+        cache_reportes.max_entradas = 16
+
+    def tearDown(self):
+        cache_reportes.max_entradas = 0
+
+    def pedir(self, cliente: TestClient, parametros: dict, if_none_match: str = None):
+        contador = {"consultas": 0}
+
+        def contar(*args):
+            contador["consultas"] += 1
+
+        headers = {"If-None-Match": if_none_match} if if_none_match else {}
+        event.listen(engine, "before_cursor_execute", contar)
+        try:
+            respuesta = cliente.get(RUTA, params=parametros, headers=headers)
+        finally:
+            event.remove(engine, "before_cursor_execute", contar)
+        return respuesta, contador["consultas"]
+
+    def test_304_sin_consultas_hasta_la_proxima_escritura(self):
+        parametros = {"fecha": str(self.fecha)}
+        with TestClient(app) as cliente:
+            primera, _ = self.pedir(cliente, parametros)
+            self.assertEqual(primera.status_code, 200)
+            self.assertEqual(primera.json()["cantidad_turnos"], 0)
+            etag = primera.headers["ETag"]
+
+            repetida, consultas = self.pedir(cliente, parametros, etag)
+            self.assertEqual(repetida.status_code, 304)
+            self.assertEqual(consultas, 0)
+
+            reserva = cliente.post("/turnos", json={"persona_id": 1, "fecha": str(self.fecha), "hora": time(10, 0).strftime("%H:%M")})
+            self.assertEqual(reserva.status_code, 200, reserva.text)
+
+            nueva, _ = self.pedir(cliente, parametros, etag)
+            self.assertEqual(nueva.status_code, 200)
+            self.assertNotEqual(nueva.headers["ETag"], etag)
+            self.assertEqual(nueva.json()["cantidad_turnos"], 1)
+
+    def test_parametros_invalidos_no_responden_304(self):
+        with TestClient(app) as cliente:
+            falta_fecha, _ = self.pedir(cliente, {}, "*")
+            self.assertEqual(falta_fecha.status_code, 422)
+
+            fecha_invalida, _ = self.pedir(cliente, {"fecha": "no-es-fecha"}, "*")
+            self.assertEqual(fecha_invalida.status_code, 400)
+
+            # "*" solo coincide cuando ya hay una respuesta generada con los datos actuales
+            sin_respuesta, _ = self.pedir(cliente, {"fecha": str(self.fecha)}, "*")
+            self.assertEqual(sin_respuesta.status_code, 200)
+            con_respuesta, _ = self.pedir(cliente, {"fecha": str(self.fecha)}, "*")
+            self.assertEqual(con_respuesta.status_code, 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
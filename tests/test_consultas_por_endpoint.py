@@ -0,0 +1,122 @@
+"""Cantidad de consultas SQL de cada endpoint /reportes/*.
+
+Con la estrategia de carga declarada en crudTurnos (la persona de cada turno viene en la
+misma consulta) y los resúmenes precalculados, la cantidad de consultas de cada reporte
+JSON, PDF y CSV no debe depender de la cantidad de filas.
+
+Uso: python -m unittest discover tests
+"""
+import unittest
+from datetime import date, timedelta
+
+from comun import engine, insertar_personas, recrear_base
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, update
+
+from App.main import app
+from App.config import (
+    HORARIO_INICIO, HORARIO_FIN, INTERVALO_TURNOS_MINUTOS, MIN_CANCELADOS_DEFAULT,
+    ESTADO_PENDIENTE, ESTADO_CONFIRMADO, ESTADO_CANCELADO, ESTADO_ASISTIDO
+)
+from App.cancelaciones import reconstruir_contadores_cancelaciones
+from App.turnos_diarios import reconstruir_turnos_diarios
+from App.database import SesionLocal
+from App.models import Persona, Turno
+from App.utils import generar_horarios_disponibles
+
+HOY = date.today()
+DESDE = str(HOY - timedelta(days=365))
+HASTA = str(HOY + timedelta(days=365))
+FECHA = str(HOY)
+DNI = "10000001"
+
+ENDPOINTS = {
+    "/reportes/turnos-por-fecha": {"fecha": FECHA},
+    "/reportes/turnos-cancelados-por-mes": {},
+    "/reportes/turnos-por-persona": {"dni": DNI},
+    "/reportes/turnos-cancelados": {"min": MIN_CANCELADOS_DEFAULT},
+    "/reportes/turnos-confirmados": {"desde": DESDE, "hasta": HASTA, "pagina": 1},
+    "/reportes/estado-personas": {"habilitado": True},
+    "/reportes/ocupacion": {"desde": DESDE, "hasta": FECHA},
+    "/reportes/pdf/turnos-por-fecha": {"fecha": FECHA},
+    "/reportes/pdf/turnos-cancelados-por-mes": {},
+    "/reportes/pdf/turnos-por-persona": {"dni": DNI},
+    "/reportes/pdf/turnos-cancelados": {"min": MIN_CANCELADOS_DEFAULT},
+    "/reportes/pdf/turnos-confirmados": {"desde": FECHA, "hasta": str(HOY + timedelta(days=7))},
+    "/reportes/pdf/estado-personas": {"habilitado": False},
+    "/reportes/csv/turnos-por-fecha": {"fecha": FECHA},
+    "/reportes/csv/turnos-cancelados-por-mes": {},
+    "/reportes/csv/turnos-por-persona": {"dni": DNI},
+    "/reportes/csv/turnos-cancelados": {"min": MIN_CANCELADOS_DEFAULT},
+    "/reportes/csv/turnos-confirmados": {"desde": DESDE, "hasta": HASTA},
+    "/reportes/csv/estado-personas": {"habilitado": True},
+}
+CANTIDADES_PERSONAS = (20, 200)
+TURNOS_POR_PERSONA = 10
+ESTADOS = (ESTADO_PENDIENTE, ESTADO_CONFIRMADO, ESTADO_CANCELADO, ESTADO_ASISTIDO)
+
+
+def poblar_base(cantidad_personas: int):
+    # Turnos de todos los estados entre un mes antes y un mes después de hoy. Las personas múltiplo de 5
+    # cancelaron todos sus turnos y las pares quedan deshabilitadas
+    recrear_base()
+    horarios = generar_horarios_disponibles(HORARIO_INICIO, HORARIO_FIN, INTERVALO_TURNOS_MINUTOS)
+    horarios_activos = set()
+    turnos = []
+    for persona_id in range(1, cantidad_personas + 1):
+        for numero in range(TURNOS_POR_PERSONA):
+            turno = {
+                "persona_id": persona_id,
+                "fecha": HOY + timedelta(days=(persona_id * 7 + numero) % 61 - 30),
+                "hora": horarios[(persona_id + numero * 3) % len(horarios)],
+                "estado": ESTADO_CANCELADO if persona_id % 5 == 0 else ESTADOS[(persona_id + numero) % len(ESTADOS)],
+            }
+            # Un solo turno activo por horario (ux_turnos_fecha_hora_activos): los repetidos quedan cancelados
+            if turno["estado"] != ESTADO_CANCELADO:
+                if (turno["fecha"], turno["hora"]) in horarios_activos:
+                    turno["estado"] = ESTADO_CANCELADO
+                else:
+                    horarios_activos.add((turno["fecha"], turno["hora"]))
+            turnos.append(turno)
+
+    with engine.begin() as conexion:
+        insertar_personas(conexion, cantidad_personas)
+        conexion.execute(update(Persona).where(Persona.id % 2 == 0).values(habilitado=False))
+        conexion.execute(Turno.__table__.insert(), turnos)
+    with SesionLocal() as db:
+        reconstruir_contadores_cancelaciones(db)
+        reconstruir_turnos_diarios(db)
+
+
+class TestConsultasPorEndpoint(unittest.TestCase):
+
+    def contar_consultas(self, cliente: TestClient, ruta: str, parametros: dict):
+        contador = {"consultas": 0}
+
+        def contar(*args):
+            contador["consultas"] += 1
+
+        event.listen(engine, "before_cursor_execute", contar)
+        try:
+            respuesta = cliente.get(ruta, params=parametros)
+        finally:
+            event.remove(engine, "before_cursor_execute", contar)
+        self.assertEqual(respuesta.status_code, 200, f"{ruta}: {respuesta.text[:200]}")
+        return contador["consultas"]
+
+    def test_cantidad_de_consultas_no_depende_de_las_filas(self):
+        consultas = {ruta: [] for ruta in ENDPOINTS}
+        with TestClient(app) as cliente:
+            for cantidad_personas in CANTIDADES_PERSONAS:
+                poblar_base(cantidad_personas)
+                for ruta, parametros in ENDPOINTS.items():
+                    consultas[ruta].append(self.contar_consultas(cliente, ruta, parametros))
+
+        for ruta, cantidades in consultas.items():
+            with self.subTest(ruta=ruta):
+                self.assertEqual(len(set(cantidades)), 1, f"{ruta}: {cantidades} consultas con {CANTIDADES_PERSONAS} personas")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""Cantidad de consultas SQL del reporte de personas con turnos cancelados.
+
+El reporte se resuelve con una consulta agrupada (GROUP BY ... HAVING), así que la cantidad
+de consultas de /reportes/turnos-cancelados y de sus versiones PDF y CSV no debe crecer con
+la cantidad de personas.
+
+Uso: python -m unittest discover tests
+"""
+import unittest
+from datetime import date, time, timedelta
+
+from comun import engine, insertar_personas, recrear_base
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from App.main import app
+from App.config import MIN_CANCELADOS_DEFAULT, ESTADO_CANCELADO, ESTADO_PENDIENTE
+from App.models import Turno
+
+ENDPOINTS = ("/reportes/turnos-cancelados", "/reportes/pdf/turnos-cancelados", "/reportes/csv/turnos-cancelados")
+CANTIDADES_PERSONAS = (5, 50, 200)
+MAX_CONSULTAS = 3
+
+
+def poblar_base(cantidad_personas: int):
+    # La mitad de las personas supera el mínimo de cancelaciones; todas tienen además un turno pendiente
+    recrear_base()
+    fecha_base = date.today() - timedelta(days=30)
+    with engine.begin() as conexion:
+        insertar_personas(conexion, cantidad_personas)
+        turnos = []
+        for persona_id in range(1, cantidad_personas + 1):
+            cancelados = MIN_CANCELADOS_DEFAULT if persona_id % 2 else MIN_CANCELADOS_DEFAULT - 1
+            for dia in range(cancelados):
+                turnos.append({"persona_id": persona_id, "fecha": fecha_base + timedelta(days=dia),
+                               "hora": time(10, 0), "estado": ESTADO_CANCELADO})
+            turnos.append({"persona_id": persona_id, "fecha": date.today() + timedelta(days=1 + persona_id),
+                           "hora": time(11, 0), "estado": ESTADO_PENDIENTE})
+        conexion.execute(Turno.__table__.insert(), turnos)
+
+
+class TestConsultasTurnosCancelados(unittest.TestCase):
+
+    def contar_consultas(self, cliente: TestClient, ruta: str):
+        contador = {"consultas": 0}
+
+        def contar(*args):
+            contador["consultas"] += 1
+
+        event.listen(engine, "before_cursor_execute", contar)
+        try:
+            respuesta = cliente.get(ruta, params={"min": MIN_CANCELADOS_DEFAULT})
+        finally:
+            event.remove(engine, "before_cursor_execute", contar)
+        self.assertEqual(respuesta.status_code, 200, ruta)
+        return contador["consultas"]
+
+    def test_cantidad_de_consultas_no_depende_de_las_personas(self):
+        consultas = {ruta: [] for ruta in ENDPOINTS}
+        with TestClient(app) as cliente:
+            for cantidad_personas in CANTIDADES_PERSONAS:
+                poblar_base(cantidad_personas)
+                for ruta in ENDPOINTS:
+                    consultas[ruta].append(self.contar_consultas(cliente, ruta))
+
+        for ruta, cantidades in consultas.items():
+            with self.subTest(ruta=ruta):
+                self.assertEqual(len(set(cantidades)), 1, f"{ruta}: {cantidades} consultas con {CANTIDADES_PERSONAS} personas")
+                self.assertLessEqual(cantidades[0], MAX_CONSULTAS, ruta)
+
+    def test_reporte_incluye_solo_personas_con_el_minimo(self):
+        with TestClient(app) as cliente:
+            poblar_base(10)
+            reporte = cliente.get("/reportes/turnos-cancelados", params={"min": MIN_CANCELADOS_DEFAULT}).json()
+        self.assertEqual(sorted(persona["id"] for persona in reporte["personas"]), [1, 3, 5, 7, 9])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""Reserva de un horario ya ocupado.
+
+crear_turno no consulta la disponibilidad: inserta directo y el índice único de horarios
+activos (ux_turnos_fecha_hora_activos) rechaza el horario repetido. validar_horario_libre
+convierte ese IntegrityError en un 400, y al cancelar el turno el horario vuelve a quedar libre.
+
+Uso: python -m unittest discover tests
+"""
+import unittest
+from datetime import date, time, timedelta
+
+from comun import engine, insertar_personas, recrear_base
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from App.main import app
+from App.config import ESTADO_CANCELADO, ESTADO_PENDIENTE
+from App.models import Turno
+
+HORA = time(10, 0)
+
+
+class TestReservaHorarioOcupado(unittest.TestCase):
+
+    def setUp(self):
+        recrear_base()
+        with engine.begin() as conexion:
+            insertar_personas(conexion, 2)
+        self.fecha = date.today() + timedelta(days=7)
+
+    def reservar(self, cliente: TestClient, persona_id: int):
+        return cliente.post("/turnos", json={"persona_id": persona_id, "fecha": str(self.fecha), "hora": HORA.strftime("%H:%M")})
+
+    def test_horario_ocupado_se_rechaza_hasta_cancelar(self):
+        with TestClient(app) as cliente:
+            primera = self.reservar(cliente, 1)
+            self.assertEqual(primera.status_code, 200, primera.text)
+
+            repetida = self.reservar(cliente, 2)
+            self.assertEqual(repetida.status_code, 400, repetida.text)
+            self.assertEqual(repetida.json()["detail"], f"El horario 10:00 del día {self.fecha} ya está ocupado")
+
+            cancelada = cliente.put(f"/turnos/{primera.json()['id']}/cancelar")
+            self.assertEqual(cancelada.status_code, 200, cancelada.text)
+
+            nueva = self.reservar(cliente, 2)
+            self.assertEqual(nueva.status_code, 200, nueva.text)
+
+        with engine.connect() as conexion:
+            estados = conexion.scalars(
+                select(Turno.estado).where(Turno.fecha == self.fecha, Turno.hora == HORA).order_by(Turno.id)
+            ).all()
+        self.assertEqual(estados, [ESTADO_CANCELADO, ESTADO_PENDIENTE])
+
+
+if __name__ == "__main__":
+    unittest.main()